@@ -0,0 +1,39 @@
+# Benchmark PDF Jurnal Umum: waktu per 10.000 baris
+# Jalankan dari root repo: python -m benchmarks.bench_pdf_jurnal [jumlah_baris ...]
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from bumdes.pdf import buat_pdf
+
+
+def jurnal_sintetis(n, seed=0):
+    rng = np.random.default_rng(seed)
+    tanggal = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+    debit = rng.integers(1, 50_000, n) * 1000
+    sisi_debit = rng.random(n) < 0.5
+    return pd.DataFrame({
+        "Tanggal": tanggal.strftime("%Y-%m-%d"),
+        "Keterangan": pd.Series(rng.integers(1, 200, n)).map(lambda i: f"Transaksi akun nomor {i}"),
+        "Ref": rng.choice(["101", "102", "121", "201", "301", "401", "501", "502"], n),
+        "Debit (Rp)": np.where(sisi_debit, debit, 0),
+        "Kredit (Rp)": np.where(sisi_debit, 0, debit),
+    })
+
+
+def main(ukuran):
+    # __wrapped__: lewati memo agar setiap ukuran benar-benar dirender
+    render = buat_pdf.__wrapped__
+    print(f"{'baris':>8} {'detik':>8} {'detik/10k':>10} {'ukuran KB':>10}")
+    for n in ukuran:
+        df = jurnal_sintetis(n)
+        mulai = time.perf_counter()
+        hasil = render(df)
+        lama = time.perf_counter() - mulai
+        print(f"{n:>8} {lama:>8.2f} {lama / n * 10_000:>10.2f} {len(hasil) / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1_000, 10_000, 20_000])
@@ -0,0 +1,180 @@
+# Benchmark pipeline Jurnal -> Buku Besar -> Neraca Saldo -> Laporan, waktu per tahap dalam JSON
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_pipeline [--baris 1000 10000 ...] [--akun 50 500 ...] [--keluaran hasil.json]
+#   python -m benchmarks.bench_pipeline --penuh   (1k-1M baris x 50-5.000 akun)
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from bumdes.bagan_akun import BaganAkun, KATEGORI
+from bumdes.buku_besar import BukuBesar
+from bumdes.engine import jurnal_periode
+from bumdes.format import format_rupiah_kolom
+from bumdes.klasifikasi import klasifikasi_neraca, susun_laporan
+from bumdes.laporan import susun_arus_kas, susun_jurnal, susun_labarugi, susun_neraca_lap, susun_neraca_saldo
+from bumdes.pdf import buat_pdf, buat_pdf_ak, buat_pdf_labarugi, buat_pdf_neraca, buat_pdf_neraca_lap
+from bumdes.perubahan import terapkan_edit
+from bumdes.pipeline import pipeline_bumdes
+from bumdes.store import JurnalStore
+
+BARIS_DEFAULT = [1_000, 10_000, 100_000]
+AKUN_DEFAULT = [50, 500]
+BARIS_PENUH = [1_000, 10_000, 100_000, 1_000_000]
+AKUN_PENUH = [50, 500, 5_000]
+PERIODE = "2025-06"
+# Sama dengan streamlit.py: tabel lebih besar ditampilkan tanpa Styler
+BATAS_STYLER = 5000
+
+
+def bagan_sintetis(n_akun):
+    # Kategori eksplisit sehingga jumlah akun tidak dibatasi rentang Ref 100-599
+    kategori = np.resize(KATEGORI, n_akun)
+    ref = [f"{KATEGORI.index(k) + 1}{i:05d}" for i, k in enumerate(kategori)]
+    return pd.DataFrame({"Ref": ref, "Nama Akun": [f"{k} {i}" for i, k in enumerate(kategori)], "Kategori": kategori})
+
+
+def jurnal_sintetis(n, bagan, seed=0):
+    rng = np.random.default_rng(seed)
+    tanggal = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, n), unit="D")
+    pilih = rng.integers(0, len(bagan), n)
+    jumlah = rng.integers(1, 50_000, n) * 1000
+    sisi_debit = rng.random(n) < 0.5
+    return pd.DataFrame({
+        "Tanggal": tanggal.strftime("%Y-%m-%d"),
+        "Keterangan": bagan["Nama Akun"].to_numpy()[pilih],
+        "Ref": bagan["Ref"].to_numpy()[pilih],
+        "Debit (Rp)": np.where(sisi_debit, jumlah, 0),
+        "Kredit (Rp)": np.where(sisi_debit, 0, jumlah),
+    })
+
+
+def _styler_html(df, kolom_angka):
+    # Seperti tampilkan_laporan: format angka per kolom, lalu Styler (bila di bawah batas)
+    df = df.drop(columns="Tebal", errors="ignore").copy()
+    for col in kolom_angka:
+        df[col] = format_rupiah_kolom(df[col]).astype(str)
+    if len(df) > BATAS_STYLER:
+        return len(df)
+    return len(df.style.set_properties(**{"text-align": "right"}, subset=kolom_angka).to_html())
+
+
+def jalankan(n_baris, n_akun, ulang, maks_pdf_jurnal):
+    tahap = {}
+
+    def ukur(nama, fungsi, *args, sekali=False):
+        # Waktu terbaik dari `ulang` kali; memo_laporan dilewati lewat __wrapped__ oleh pemanggil
+        terbaik, hasil = None, None
+        for _ in range(1 if sekali else ulang):
+            mulai = time.perf_counter()
+            hasil = fungsi(*args)
+            lama = time.perf_counter() - mulai
+            terbaik = lama if terbaik is None else min(terbaik, lama)
+        tahap[nama] = {"detik": round(terbaik, 6)}
+        return hasil
+
+    df_bagan = bagan_sintetis(n_akun)
+    df = jurnal_sintetis(n_baris, df_bagan)
+    bagan = BaganAkun(df_bagan)
+
+    store = JurnalStore(":memory:")
+    store.simpan_bagan_akun(df_bagan)
+    ukur("simpan_store", store.tambah, df, sekali=True)
+    jurnal = ukur("muat_store", store.muat)
+
+    # Grid: data dikirim sebagai JSON baris per baris, edit sel diterapkan kembali ke frame
+    halaman = jurnal.iloc[:500]
+    ukur("grid_ke_json", lambda: json.loads(halaman.to_json(orient="records")))
+    label = {str(i): idx for i, idx in zip(halaman["id"], halaman.index)}
+    edit = [{"baris": str(i), "kolom": "Debit (Rp)", "baru": str(j * 1000)} for j, i in enumerate(halaman["id"][:100])]
+    ukur("grid_terapkan_edit", lambda: terapkan_edit(halaman.copy(), edit, label))
+
+    bb = ukur("posting_buku_besar", BukuBesar.dari_jurnal, jurnal)
+    berubah = jurnal.iloc[:100].assign(**{"Debit (Rp)": 1000})
+    ukur("posting_inkremental", bb.perbarui, berubah)
+
+    pl = pipeline_bumdes(store)
+    pl.sumber("jurnal", bb)
+    pl.sumber("bagan_akun", bagan)
+    pl.sumber("periode_neraca", PERIODE)
+
+    def neraca_saldo():
+        # Periode ditandai berubah agar tahap benar-benar dihitung ulang, bukan diambil dari cache
+        pl.tandai("periode_neraca")
+        return pl.ambil("neraca_saldo")
+
+    neraca = ukur("neraca_saldo_dari_buku_besar", neraca_saldo)
+    df_neraca_saldo = ukur("susun_neraca_saldo", susun_neraca_saldo.__wrapped__, neraca)
+
+    laporan = ukur("klasifikasi_tab4", lambda: susun_laporan(neraca, klasifikasi_neraca(neraca, bagan)))
+    df_jurnal_periode = jurnal_periode(store, PERIODE)
+    df_jurnal = ukur("susun_jurnal", susun_jurnal.__wrapped__, df_jurnal_periode)
+    df_labarugi, laba = ukur("susun_labarugi", susun_labarugi.__wrapped__, laporan["pendapatan"], laporan["beban"])
+    df_neraca_lap = ukur("susun_neraca_lap", susun_neraca_lap.__wrapped__, laporan["aktiva_lancar"], laporan["aktiva_tetap"],
+                         laporan["kewajiban"], laporan["modal_data"]["modal_awal"], laba)
+    df_ak = ukur("susun_arus_kas", susun_arus_kas.__wrapped__, laporan["arus_kas_operasi"], laporan["arus_kas_investasi"],
+                 laporan["arus_kas_pendanaan"])
+
+    ukur("styler_jurnal", _styler_html, df_jurnal, ["Debit (Rp)", "Kredit (Rp)"])
+    ukur("styler_neraca_saldo", _styler_html, df_neraca_saldo, ["Debit (Rp)", "Kredit (Rp)"])
+    ukur("styler_labarugi", _styler_html, df_labarugi, ["Debit", "Kredit"])
+    ukur("styler_neraca_lap", _styler_html, df_neraca_lap, ["Jumlah1", "Jumlah2"])
+    ukur("styler_arus_kas", _styler_html, df_ak, ["Jumlah"])
+
+    bulan, tahun = PERIODE[5:], int(PERIODE[:4])
+    if len(df_jurnal_periode) <= maks_pdf_jurnal:
+        ukur("pdf_jurnal", buat_pdf.__wrapped__, df_jurnal_periode)
+    else:
+        tahap["pdf_jurnal"] = {"detik": None, "dilewati": f"lebih dari {maks_pdf_jurnal} baris"}
+    ukur("pdf_neraca_saldo", buat_pdf_neraca.__wrapped__, df_neraca_saldo, bulan, tahun)
+    ukur("pdf_labarugi", buat_pdf_labarugi.__wrapped__, df_labarugi, bulan, tahun)
+    ukur("pdf_neraca_lap", buat_pdf_neraca_lap.__wrapped__, df_neraca_lap, bulan, tahun)
+    ukur("pdf_arus_kas", buat_pdf_ak.__wrapped__, df_ak, bulan, tahun)
+
+    return {"baris": n_baris, "akun": n_akun, "baris_periode": len(df_jurnal_periode), "tahap": tahap}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tahap pipeline laporan BUMDes.")
+    parser.add_argument("--baris", type=int, nargs="+", help=f"jumlah baris jurnal (default: {BARIS_DEFAULT})")
+    parser.add_argument("--akun", type=int, nargs="+", help=f"jumlah akun (default: {AKUN_DEFAULT})")
+    parser.add_argument("--penuh", action="store_true", help=f"baris {BARIS_PENUH} x akun {AKUN_PENUH}")
+    parser.add_argument("--ulang", type=int, default=3, help="pengulangan per tahap, diambil yang tercepat (default: 3)")
+    parser.add_argument("--maks-pdf-jurnal", type=int, default=200_000, help="lewati PDF jurnal di atas jumlah baris ini")
+    parser.add_argument("--keluaran", help="tulis hasil JSON ke file ini (default: stdout)")
+    args = parser.parse_args(argv)
+
+    ukuran_baris = args.baris or (BARIS_PENUH if args.penuh else BARIS_DEFAULT)
+    ukuran_akun = args.akun or (AKUN_PENUH if args.penuh else AKUN_DEFAULT)
+    hasil = []
+    for n_baris in ukuran_baris:
+        for n_akun in ukuran_akun:
+            mulai = time.perf_counter()
+            hasil.append(jalankan(n_baris, n_akun, max(1, args.ulang), args.maks_pdf_jurnal))
+            print(f"{n_baris:>9,} baris x {n_akun:>5,} akun: {time.perf_counter() - mulai:.1f} s", file=sys.stderr, flush=True)
+
+    laporan = {
+        "waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "ulang": args.ulang,
+        "periode": PERIODE,
+        "hasil": hasil,
+    }
+    teks = json.dumps(laporan, indent=2)
+    if args.keluaran:
+        with open(args.keluaran, "w") as f:
+            f.write(teks + "\n")
+    else:
+        print(teks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Paket logika akuntansi BUMDes (tanpa ketergantungan ke Streamlit)
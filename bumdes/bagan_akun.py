@@ -0,0 +1,78 @@
+import bisect
+import hashlib
+
+import pandas as pd
+
+KATEGORI = ["Aktiva Lancar", "Aktiva Tetap", "Kewajiban", "Modal", "Pendapatan", "Beban"]
+
+# Rentang nomor Ref -> kategori (awal, akhir inklusif); bisa diganti per BUMDes
+ATURAN_REF_DEFAULT = [
+    (100, 119, "Aktiva Lancar"),
+    (120, 199, "Aktiva Tetap"),
+    (200, 299, "Kewajiban"),
+    (300, 399, "Modal"),
+    (400, 499, "Pendapatan"),
+    (500, 599, "Beban"),
+]
+
+KOLOM_BAGAN = ["Ref", "Nama Akun", "Kategori"]
+
+
+def _nomor_ref(ref):
+    ref = str(ref).strip()
+    return int(ref) if ref.isdigit() else None
+
+
+class BaganAkun:
+    def __init__(self, df=None, aturan=None):
+        # df: tabel bagan akun dengan kolom Ref, Nama Akun, Kategori (Kategori boleh kosong)
+        self.aturan = sorted(aturan or ATURAN_REF_DEFAULT)
+        self._awal = [a for a, _, _ in self.aturan]
+        if df is None:
+            df = pd.DataFrame(columns=KOLOM_BAGAN)
+        df = df[df["Ref"].astype(str).str.strip() != ""]
+
+        refs = df["Ref"].astype(str).str.strip().tolist()
+        self.nama = dict(zip(refs, df["Nama Akun"].fillna("").astype(str)))
+        self.kategori_eksplisit = dict(zip(refs, df["Kategori"].fillna("").astype(str)))
+
+        # Dihitung sekali per versi bagan akun; lookup berikutnya O(1)
+        self._kategori = {
+            ref: self.kategori_eksplisit[ref] or self._dari_aturan(ref) for ref in refs
+        }
+
+        sidik = repr((self.aturan, sorted(self.nama.items()), sorted(self.kategori_eksplisit.items())))
+        self.versi = hashlib.sha1(sidik.encode()).hexdigest()[:12]
+
+    def _dari_aturan(self, ref):
+        nomor = _nomor_ref(ref)
+        if nomor is None:
+            return ""
+        i = bisect.bisect_right(self._awal, nomor) - 1
+        if i >= 0:
+            awal, akhir, kategori = self.aturan[i]
+            if awal <= nomor <= akhir:
+                return kategori
+        return ""
+
+    def kategori(self, ref):
+        ref = str(ref).strip()
+        if ref not in self._kategori:
+            self._kategori[ref] = self._dari_aturan(ref)
+        return self._kategori[ref]
+
+    def klasifikasi(self, refs):
+        # Lookup per Ref unik, lalu dipetakan ke seluruh kolom
+        refs = refs.fillna("").astype(str).str.strip()
+        peta = {ref: self.kategori(ref) for ref in refs.unique()}
+        return refs.map(peta).rename("Kategori")
+
+    def daftar_nama(self):
+        return [nama for nama in self.nama.values() if nama]
+
+    def ke_dataframe(self):
+        return pd.DataFrame({
+            "Ref": list(self.nama.keys()),
+            "Nama Akun": list(self.nama.values()),
+            "Kategori": [self.kategori_eksplisit[ref] for ref in self.nama],
+        }, columns=KOLOM_BAGAN)
@@ -0,0 +1,124 @@
+from collections import deque
+
+import pandas as pd
+
+
+def _isi_kosong(kolom):
+    if pd.api.types.is_datetime64_dtype(kolom):
+        return pd.NaT
+    if pd.api.types.is_numeric_dtype(kolom) and not isinstance(kolom.dtype, pd.CategoricalDtype):
+        return 0
+    return ""
+
+
+def baris_kosong(df, n, mulai=0):
+    # n baris kosong dengan kolom & dtype yang sama dengan df: teks "" dan angka 0 (tanggal: NaT)
+    isi = {col: _isi_kosong(df[col]) for col in df.columns}
+    kosong = pd.DataFrame(isi, index=pd.RangeIndex(mulai, mulai + n))
+    return _gabung(df.iloc[0:0], kosong)
+
+
+def _gabung(df, *lain):
+    # concat dengan dtype df; kolom categorical digabung kategorinya (concat biasa -> object)
+    hasil = pd.concat([df, *lain])
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            hasil[col] = hasil[col].astype("category")
+        elif hasil[col].dtype != df[col].dtype and hasil[col].notna().all():
+            hasil[col] = hasil[col].astype(df[col].dtype)
+    return hasil
+
+
+class OperasiBaris:
+    # Tambah/hapus baris tabel (di session_state) secara massal, dengan urungkan (undo).
+    # Label index tidak di-reset setelah hapus, jadi urungkan cukup mengembalikan baris
+    # yang dihapus lalu mengurutkan index. `versi` per tabel ikut kunci grid agar grid
+    # dipasang ulang hanya setelah struktur tabel berubah.
+    def __init__(self, maks_urungkan=20):
+        self._riwayat = deque(maxlen=maks_urungkan)
+        self.versi = {}
+
+    def _catat(self, tabel, nama, sebelum, ditambah, dihapus):
+        self.versi[nama] = self.versi.get(nama, 0) + 1
+        # `sebelum`/`setelah` = objek DataFrame; tabel yang diganti utuh di luar OperasiBaris
+        # (mis. reload) tidak bisa di-urungkan lagi karena objeknya sudah berbeda
+        self._riwayat.append({
+            "nama": nama, "sebelum": sebelum, "setelah": tabel[nama],
+            "ditambah": list(ditambah), "dihapus": dihapus,
+        })
+
+    def _label_baru(self, df, n):
+        mulai = int(df.index.max()) + 1 if len(df) else 0
+        return mulai, mulai + n
+
+    def tambah(self, tabel, nama, n=1, isi=None, catat=True):
+        # Tambahkan n baris kosong, atau baris `isi` (DataFrame), dalam satu operasi;
+        # catat=False untuk tabel yang tidak bisa di-urungkan (mis. jurnal, barisnya sudah di database)
+        df = tabel[nama]
+        baru = baris_kosong(df, n) if isi is None else isi.reindex(columns=df.columns)
+        if baru.empty:
+            return 0
+        mulai, akhir = self._label_baru(df, len(baru))
+        baru.index = pd.RangeIndex(mulai, akhir)
+        tabel[nama] = _gabung(df, baru)
+        if catat:
+            self._catat(tabel, nama, df, baru.index, df.iloc[0:0])
+        else:
+            self.versi[nama] = self.versi.get(nama, 0) + 1
+        return len(baru)
+
+    def hapus(self, tabel, nama, label):
+        # Hapus baris berlabel `label`; tabel tidak pernah dibiarkan kosong (disisakan 1 baris kosong)
+        df = tabel[nama]
+        label = df.index.intersection(pd.Index(list(label)))
+        if label.empty:
+            return 0
+        sisa = df.drop(index=label)
+        ditambah = []
+        if sisa.empty:
+            mulai, _ = self._label_baru(df, 1)
+            sisa = baris_kosong(df, 1, mulai)
+            ditambah = list(sisa.index)
+        tabel[nama] = sisa
+        self._catat(tabel, nama, df, ditambah, df.loc[label])
+        return len(label)
+
+    def ganti(self, tabel, nama, df, catat=True):
+        # Ganti seluruh isi tabel (mis. disalin ulang dari pipeline); catat=False untuk
+        # sinkronisasi otomatis agar tidak memenuhi riwayat urungkan
+        lama = tabel[nama]
+        tabel[nama] = df
+        if catat:
+            self._catat(tabel, nama, lama, df.index, lama)
+        else:
+            self.versi[nama] = self.versi.get(nama, 0) + 1
+
+    def hapus_kosong(self, tabel, nama, kolom):
+        df = tabel[nama]
+        return self.hapus(tabel, nama, df.index[df[kolom].astype(str).str.strip() == ""])
+
+    def _terakhir(self, tabel, nama):
+        for op in reversed(self._riwayat):
+            if op["nama"] == nama:
+                return op if op["setelah"] is tabel.get(nama) else None
+        return None
+
+    def bisa_urungkan(self, tabel, nama):
+        return self._terakhir(tabel, nama) is not None
+
+    def urungkan(self, tabel, nama):
+        # Batalkan operasi baris terakhir pada tabel `nama`; edit sel sesudahnya tetap dipertahankan
+        op = self._terakhir(tabel, nama)
+        if op is None:
+            return False
+        del self._riwayat[next(i for i, x in enumerate(self._riwayat) if x is op)]
+        df = op["setelah"].drop(index=op["ditambah"], errors="ignore")
+        if not op["dihapus"].empty:
+            df = _gabung(df, op["dihapus"]).sort_index()
+        tabel[nama] = df
+        self.versi[nama] = self.versi.get(nama, 0) + 1
+        # Operasi sebelumnya berakhir di objek `sebelum`; kini digantikan objek hasil urungkan
+        for lama in self._riwayat:
+            if lama["nama"] == nama and lama["setelah"] is op["sebelum"]:
+                lama["setelah"] = df
+        return True
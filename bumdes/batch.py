@@ -0,0 +1,127 @@
+# Batch laporan akhir bulan untuk banyak unit BUMDes, paralel di semua core.
+# Jalankan dari root repo:
+#   python -m bumdes.batch DIREKTORI_JURNAL 2025-01 [-o hasil_laporan] [-j JUMLAH_PROSES]
+# Setiap file di DIREKTORI_JURNAL adalah satu unit: database workspace (.db) atau jurnal CSV/Excel
+# (diimpor ke database sementara di memori). PDF ditulis ke <keluaran>/<unit>/.
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bumdes.engine import laporan_periode, pdf_laporan
+from bumdes.impor import impor_jurnal
+from bumdes.store import JurnalStore
+
+EKSTENSI_UNIT = (".db", ".sqlite", ".csv", ".xlsx")
+
+
+def daftar_file_unit(direktori):
+    return sorted(
+        os.path.join(direktori, f) for f in os.listdir(direktori)
+        if f.lower().endswith(EKSTENSI_UNIT) and os.path.isfile(os.path.join(direktori, f))
+    )
+
+
+def buka_unit(path):
+    # Database dibuka baca-saja (input tidak dimigrasi/diubah); CSV/Excel diimpor sekali ke SQLite di memori
+    if path.lower().endswith((".db", ".sqlite")):
+        return JurnalStore(path, baca_saja=True), None
+    store = JurnalStore(":memory:")
+    return store, impor_jurnal(store, path, path)
+
+
+def nama_unit(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def unit_ganda(files):
+    # Nama unit = nama file tanpa ekstensi (= folder keluaran); x.db & x.csv akan saling menimpa.
+    # Dibandingkan tanpa huruf besar/kecil karena sebagian filesystem tidak membedakannya.
+    per_nama = {}
+    for f in files:
+        per_nama.setdefault(nama_unit(f).lower(), []).append(os.path.basename(f))
+    return [nama for nama in per_nama.values() if len(nama) > 1]
+
+
+def proses_unit(path, periode, keluaran):
+    # Dijalankan di proses pekerja; kesalahan dikembalikan sebagai teks agar unit lain tetap jalan
+    unit = nama_unit(path)
+    hasil = {"unit": unit, "baris": 0, "pdf": 0, "detik": {}, "error": None}
+    mulai = waktu = time.perf_counter()
+    try:
+        store, impor = buka_unit(path)
+        hasil["baris"] = store.jumlah_baris()
+        if impor is not None and impor["ditolak"]:
+            hasil["ditolak"] = impor["ditolak"]
+        hasil["detik"]["muat"] = time.perf_counter() - waktu
+
+        waktu = time.perf_counter()
+        laporan = laporan_periode(store, periode)
+        hasil["detik"]["laporan"] = time.perf_counter() - waktu
+
+        waktu = time.perf_counter()
+        folder = os.path.join(keluaran, unit)
+        os.makedirs(folder, exist_ok=True)
+        for nama_file, isi in pdf_laporan(laporan, periode).items():
+            with open(os.path.join(folder, nama_file), "wb") as f:
+                f.write(isi)
+            hasil["pdf"] += 1
+        hasil["detik"]["pdf"] = time.perf_counter() - waktu
+    except Exception as e:
+        hasil["error"] = f"{type(e).__name__}: {e}"
+    hasil["detik"]["total"] = time.perf_counter() - mulai
+    return hasil
+
+
+def cetak_ringkasan(semua, lama):
+    print()
+    print(f"{'unit':<24} {'baris':>9} {'pdf':>4} {'muat':>7} {'laporan':>8} {'pdf (s)':>8} {'total':>7}")
+    for h in sorted(semua, key=lambda h: -h["detik"]["total"]):
+        d = h["detik"]
+        if h["error"]:
+            print(f"{h['unit']:<24} {h['baris']:>9,} {'-':>4} {'':>7} {'':>8} {'':>8} {d['total']:>7.2f}  GAGAL: {h['error']}")
+        else:
+            print(f"{h['unit']:<24} {h['baris']:>9,} {h['pdf']:>4} {d['muat']:>7.2f} {d['laporan']:>8.2f} {d['pdf']:>8.2f} {d['total']:>7.2f}")
+    gagal = sum(1 for h in semua if h["error"])
+    total_cpu = sum(h["detik"]["total"] for h in semua)
+    print(f"\n{len(semua) - gagal} unit berhasil, {gagal} gagal, "
+          f"{sum(h['pdf'] for h in semua)} PDF dalam {lama:.1f} s (waktu kerja total {total_cpu:.1f} s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Buat semua laporan PDF untuk banyak unit BUMDes sekaligus.")
+    parser.add_argument("direktori", help="folder berisi satu file per unit (.db, .csv, .xlsx)")
+    parser.add_argument("periode", help="periode laporan, format YYYY-MM")
+    parser.add_argument("-o", "--keluaran", default="hasil_laporan", help="folder keluaran (default: hasil_laporan)")
+    parser.add_argument("-j", "--proses", type=int, default=os.cpu_count(), help="jumlah proses pekerja (default: semua core)")
+    args = parser.parse_args(argv)
+
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", args.periode):
+        parser.error("periode harus berformat YYYY-MM, mis. 2025-01")
+    files = daftar_file_unit(args.direktori)
+    if not files:
+        parser.error(f"tidak ada file unit ({', '.join(EKSTENSI_UNIT)}) di {args.direktori}")
+    ganda = unit_ganda(files)
+    if ganda:
+        parser.error("nama unit ganda (folder keluaran akan saling menimpa): " + "; ".join(", ".join(g) for g in ganda))
+
+    mulai = time.perf_counter()
+    semua = []
+    with ProcessPoolExecutor(max_workers=max(1, args.proses)) as pool:
+        tugas = [pool.submit(proses_unit, f, args.periode, args.keluaran) for f in files]
+        for i, selesai in enumerate(as_completed(tugas), 1):
+            h = selesai.result()
+            semua.append(h)
+            status = f"GAGAL ({h['error']})" if h["error"] else f"{h['pdf']} PDF"
+            if h.get("ditolak"):
+                status += f", {h['ditolak']:,} baris impor ditolak"
+            print(f"[{i}/{len(files)}] {h['unit']}: {status}, {h['detik']['total']:.2f} s", flush=True)
+
+    cetak_ringkasan(semua, time.perf_counter() - mulai)
+    return 1 if any(h["error"] for h in semua) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
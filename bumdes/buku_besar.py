@@ -0,0 +1,120 @@
+import pandas as pd
+
+from bumdes.store import normalisasi_jurnal
+
+_KOLOM_SALDO = ["nama_akun", "debit", "kredit", "jumlah"]
+
+
+def _baris_valid(df):
+    # Hanya baris jurnal yang punya Ref yang diposting ke Buku Besar
+    df = normalisasi_jurnal(df)
+    df = df[(df["Ref"] != "") & df["id"].notna()]
+    return df.set_index("id")
+
+
+def _agregasi(baris):
+    # Satu groupby ter-vektorisasi per Ref
+    if baris.empty:
+        return pd.DataFrame(columns=_KOLOM_SALDO, index=pd.Index([], name="Ref"))
+    ket = baris["Keterangan"].where(baris["Keterangan"] != "")
+    grup = baris.assign(_ket=ket).groupby("Ref", sort=True)
+    return pd.DataFrame({
+        "nama_akun": grup["_ket"].first(),
+        "debit": grup["Debit (Rp)"].sum(),
+        "kredit": grup["Kredit (Rp)"].sum(),
+        "jumlah": grup.size(),
+    })
+
+
+class BukuBesar:
+    def __init__(self):
+        self._baris = _baris_valid(pd.DataFrame(columns=["id", "Tanggal", "Keterangan", "Ref", "Debit (Rp)", "Kredit (Rp)"]))
+        self.saldo = _agregasi(self._baris)
+
+    @classmethod
+    def dari_jurnal(cls, df):
+        bb = cls()
+        bb._baris = _baris_valid(df)
+        bb.saldo = _agregasi(bb._baris)
+        return bb
+
+    def perbarui(self, berubah=None, dihapus=()):
+        # Update saldo dari selisih baris lama vs baru, tanpa menghitung ulang seluruh jurnal
+        # id lama diambil sebelum _baris_valid: baris yang Ref-nya dikosongkan harus ikut dikurangi
+        if berubah is not None and not berubah.empty:
+            id_berubah = pd.Index(normalisasi_jurnal(berubah)["id"].dropna())
+            baru = _baris_valid(berubah)
+        else:
+            id_berubah = pd.Index([], dtype="Int64")
+            baru = self._baris.iloc[0:0]
+        id_lama = id_berubah.union(pd.Index(list(dihapus), dtype="Int64"))
+        lama = self._baris.loc[self._baris.index.intersection(id_lama)]
+        if lama.empty and baru.empty:
+            return
+
+        self._baris = pd.concat([self._baris.drop(lama.index), baru])
+
+        delta_lama = _agregasi(lama)
+        delta_baru = _agregasi(baru)
+        angka = ["debit", "kredit", "jumlah"]
+        saldo = self.saldo[angka].add(delta_baru[angka], fill_value=0).sub(delta_lama[angka], fill_value=0)
+        saldo = saldo[saldo["jumlah"] > 0].astype("int64")
+
+        # Nama akun lama dipertahankan; akun baru mengambil Keterangan pertamanya
+        nama = self.saldo["nama_akun"].combine_first(delta_baru["nama_akun"])
+        saldo.insert(0, "nama_akun", nama.reindex(saldo.index))
+        self.saldo = saldo.sort_index()
+
+    def _nama(self, nama_akun=None):
+        # nama_akun (opsional): {ref: nama} dari bagan akun, diutamakan atas Keterangan jurnal
+        nama = self.saldo["nama_akun"].fillna("")
+        if nama_akun:
+            nama = pd.Series(nama_akun).reindex(nama.index).replace("", pd.NA).fillna(nama)
+        return nama
+
+    def ke_dict(self, nama_akun=None):
+        # Struktur yang dipakai tab Neraca Saldo: {ref: {"nama_akun", "debit", "kredit"}}
+        nama = self._nama(nama_akun)
+        return {
+            ref: {
+                "nama_akun": nama[ref] or f"Akun {ref}",
+                "debit": int(self.saldo.at[ref, "debit"]),
+                "kredit": int(self.saldo.at[ref, "kredit"]),
+            }
+            for ref in self.saldo.index
+        }
+
+    def ringkasan(self, nama_akun=None):
+        # Nama akun sama dengan Neraca Saldo & laporan: bagan akun dulu, Keterangan jurnal bila Ref tidak ada
+        df = self.saldo[["debit", "kredit"]].assign(nama_akun=self._nama(nama_akun)).reset_index()
+        df = df[["Ref", "nama_akun", "debit", "kredit"]]
+        df.columns = ["Ref", "Akun", "Debit (Rp)", "Kredit (Rp)"]
+        df["Saldo (Rp)"] = df["Debit (Rp)"] - df["Kredit (Rp)"]
+        return df
+
+    def mutasi(self, ref):
+        # Rincian transaksi satu akun beserta saldo berjalan
+        df = self._baris[self._baris["Ref"] == ref].reset_index()
+        df = df.sort_values(["Tanggal", "id"], kind="stable")
+        df["Saldo (Rp)"] = (df["Debit (Rp)"] - df["Kredit (Rp)"]).cumsum()
+        return df[["Tanggal", "Keterangan", "Debit (Rp)", "Kredit (Rp)", "Saldo (Rp)"]].reset_index(drop=True)
+
+
+def saldo_awal(store, periode):
+    # Saldo awal = snapshot tutup buku terakhir + mutasi periode terbuka sebelum `periode`
+    return store.saldo_sebelum(periode)
+
+
+def saldo_periode(store, periode):
+    # Saldo awal dibawa ke depan + mutasi periode berjalan, per Ref
+    awal = saldo_awal(store, periode)
+    mutasi = store.agregat_akun(periode=periode)
+    df = pd.DataFrame({
+        "awal_debit": awal["debit"],
+        "awal_kredit": awal["kredit"],
+        "debit": mutasi["debit"],
+        "kredit": mutasi["kredit"],
+    }).fillna(0).astype("int64")
+    df["akhir_debit"] = df["awal_debit"] + df["debit"]
+    df["akhir_kredit"] = df["awal_kredit"] + df["kredit"]
+    return df.sort_index()
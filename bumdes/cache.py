@@ -0,0 +1,77 @@
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def sidik_jari(*args, **kwargs):
+    # Fingerprint isi argumen; DataFrame/Series di-hash per baris secara ter-vektorisasi
+    h = hashlib.blake2b(digest_size=16)
+    for nilai in list(args) + sorted(kwargs.items()):
+        if isinstance(nilai, (pd.DataFrame, pd.Series)):
+            h.update(type(nilai).__name__.encode())
+            if isinstance(nilai, pd.DataFrame):
+                h.update(repr(list(nilai.columns)).encode())
+            h.update(pd.util.hash_pandas_object(nilai, index=True).to_numpy().tobytes())
+        elif isinstance(nilai, dict):
+            h.update(sidik_jari(*sorted(nilai.items())).encode())
+        elif isinstance(nilai, tuple) and any(isinstance(v, (pd.DataFrame, pd.Series)) for v in nilai):
+            h.update(sidik_jari(*nilai).encode())
+        else:
+            h.update(repr(nilai).encode())
+        h.update(b"|")
+    return h.hexdigest()
+
+
+class CacheLRU:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hit = 0
+        self.miss = 0
+
+    def get(self, kunci, default=None):
+        with self._lock:
+            if kunci in self._data:
+                self._data.move_to_end(kunci)
+                self.hit += 1
+                return self._data[kunci]
+            self.miss += 1
+            return default
+
+    def set(self, kunci, nilai):
+        with self._lock:
+            self._data[kunci] = nilai
+            self._data.move_to_end(kunci)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def memo(self, fungsi):
+        # Hasil fungsi disimpan per sidik jari argumen; hasil jangan diubah in-place
+        _kosong = object()
+
+        @functools.wraps(fungsi)
+        def pembungkus(*args, **kwargs):
+            kunci = (fungsi.__module__, fungsi.__qualname__, sidik_jari(*args, **kwargs))
+            hasil = self.get(kunci, _kosong)
+            if hasil is _kosong:
+                hasil = fungsi(*args, **kwargs)
+                self.set(kunci, hasil)
+            return hasil
+
+        return pembungkus
+
+
+# Dipakai bersama oleh semua sesi; kunci berbasis isi sehingga aman dibagi
+cache_laporan = CacheLRU(maxsize=256)
+memo_laporan = cache_laporan.memo
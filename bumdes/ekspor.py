@@ -0,0 +1,70 @@
+import importlib.util
+import io
+
+import pandas as pd
+
+from bumdes.cache import memo_laporan
+
+# Nama format -> (ekstensi file, MIME)
+FORMAT_EKSPOR = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+# Engine opsional untuk tiap format
+_ENGINE = {"Parquet": "pyarrow", "Excel": "openpyxl"}
+
+
+# Kolom nominal di tabel laporan (selain kolom "... (Rp)"); kolom teks lain seperti Ref
+# tidak pernah dijadikan angka agar kode "0101" tidak menjadi 101
+KOLOM_NOMINAL = {"Debit", "Kredit", "Jumlah", "Jumlah1", "Jumlah2"}
+
+
+def _kolom_nominal(col):
+    return "(Rp)" in str(col) or str(col) in KOLOM_NOMINAL
+
+
+def format_tersedia():
+    return [f for f in FORMAT_EKSPOR if f not in _ENGINE or importlib.util.find_spec(_ENGINE[f]) is not None]
+
+
+def rapikan_untuk_ekspor(df):
+    # Tabel laporan mencampur angka dan "" (sel kosong); untuk mesin, kolom nominal seperti itu
+    # dijadikan numerik nullable. Kolom bantu tampilan (Tebal) dibuang, index bernama ikut diekspor.
+    df = df.drop(columns="Tebal", errors="ignore")
+    if df.index.name is not None:
+        df = df.reset_index()
+    else:
+        df = df.reset_index(drop=True)
+    hasil = {}
+    for col in df.columns:
+        nilai = df[col]
+        if nilai.dtype == object and _kolom_nominal(col):
+            kosong = nilai.isna() | (nilai.astype(str).str.strip() == "")
+            angka = pd.to_numeric(nilai.where(~kosong), errors="coerce")
+            if angka.notna().any() and (angka.notna() | kosong).all():
+                bulat = angka.dropna()
+                nilai = angka.astype("Int64") if (bulat == bulat.round()).all() else angka.astype("Float64")
+            else:
+                nilai = nilai.fillna("").astype(str)
+        elif nilai.dtype == object:
+            nilai = nilai.fillna("").astype(str)
+        hasil[str(col)] = nilai
+    return pd.DataFrame(hasil)
+
+
+@memo_laporan
+def ekspor_bytes(df, format_ekspor, nama_sheet="Data"):
+    df = rapikan_untuk_ekspor(df)
+    buf = io.BytesIO()
+    if format_ekspor == "CSV":
+        # utf-8-sig agar Excel membaca huruf non-ASCII dengan benar
+        buf.write(df.to_csv(index=False).encode("utf-8-sig"))
+    elif format_ekspor == "Parquet":
+        df.to_parquet(buf, index=False, engine="pyarrow")
+    elif format_ekspor == "Excel":
+        df.to_excel(buf, index=False, sheet_name=nama_sheet[:31], engine="openpyxl")
+    else:
+        raise ValueError(f"Format ekspor tidak dikenal: {format_ekspor}")
+    return buf.getvalue()
@@ -0,0 +1,65 @@
+from bumdes.bagan_akun import BaganAkun
+from bumdes.buku_besar import BukuBesar
+from bumdes.laporan import susun_jurnal
+from bumdes.pdf import buat_pdf, buat_pdf_ak, buat_pdf_labarugi, buat_pdf_neraca, buat_pdf_neraca_lap
+from bumdes.pipeline import TABEL_LAPORAN, pipeline_bumdes
+from bumdes.store import KOLOM_JURNAL
+
+# Mesin laporan tanpa Streamlit: tahap yang sama dengan UI, tetapi setiap tabel yang di UI bisa
+# diedit manual di sini langsung diisi dari tahap sebelumnya (seperti UI tanpa edit sama sekali).
+# Untuk proses batch/CLI; UI memakai tahap yang sama lewat pipeline_bumdes.
+
+
+def pipeline_otomatis(store):
+    pl = pipeline_bumdes(store)
+    pl.tahap("tabel:neraca_saldo", ["neraca_saldo"], lambda df: df)
+    for nama in TABEL_LAPORAN:
+        pl.tahap(f"tabel:{nama}", ["laporan"], lambda laporan, nama=nama: laporan[nama])
+    pl.tahap("modal_awal", ["laporan"], lambda laporan: laporan["modal_data"]["modal_awal"])
+    return pl
+
+
+def jurnal_periode(store, periode):
+    # Baris jurnal bertanggal di `periode` saja (sama dengan Neraca Saldo), hanya yang ber-Keterangan
+    df = store.muat(periode, tanpa_tanggal=False)
+    return df[df["Keterangan"].astype(str).str.strip() != ""][KOLOM_JURNAL]
+
+
+def laporan_periode(store, periode, buku_besar=None, bagan_akun=None):
+    # Semua laporan satu periode "YYYY-MM". buku_besar/bagan_akun boleh diberikan bila sudah
+    # ada (mis. dari Workspace), selain itu dibangun dari store.
+    if bagan_akun is None:
+        bagan_akun = BaganAkun(store.muat_bagan_akun())
+    if buku_besar is None:
+        buku_besar = BukuBesar.dari_jurnal(store.muat())
+    pl = pipeline_otomatis(store)
+    pl.sumber("jurnal", buku_besar)
+    pl.sumber("bagan_akun", bagan_akun)
+    pl.sumber("periode_neraca", periode)
+
+    jurnal = jurnal_periode(store, periode)
+    df_labarugi, laba_bersih = pl.ambil("labarugi")
+    return {
+        "jurnal": jurnal,
+        "jurnal_final": susun_jurnal(jurnal) if not jurnal.empty else None,
+        "neraca_saldo": pl.ambil("hasil_neraca_saldo"),
+        "labarugi": df_labarugi,
+        "laba_bersih": laba_bersih,
+        "neraca": pl.ambil("neraca"),
+        "arus_kas": pl.ambil("arus_kas"),
+    }
+
+
+def pdf_laporan(laporan, periode):
+    # {nama file: isi PDF} dengan builder & nama file yang sama seperti tombol unduh di UI
+    tahun, bulan = int(periode[:4]), periode[5:7]
+    hasil = {}
+    if not laporan["jurnal"].empty:
+        hasil[f"jurnal_umum_{bulan}_{tahun}.pdf"] = buat_pdf(laporan["jurnal"])
+    if laporan["neraca_saldo"] is not None:
+        hasil[f"neraca_saldo_{bulan}_{tahun}.pdf"] = buat_pdf_neraca(laporan["neraca_saldo"], bulan, tahun)
+    hasil[f"laporan_labarugi_{bulan}_{tahun}.pdf"] = buat_pdf_labarugi(laporan["labarugi"], bulan, tahun)
+    hasil[f"laporan_neraca_{bulan}_{tahun}.pdf"] = buat_pdf_neraca_lap(laporan["neraca"], bulan, tahun)
+    if laporan["arus_kas"] is not None:
+        hasil[f"arus_kas_{bulan}_{tahun}.pdf"] = buat_pdf_ak(laporan["arus_kas"], bulan, tahun)
+    return hasil
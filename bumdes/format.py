@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+BULAN = {
+    "01": "Januari", "02": "Februari", "03": "Maret",
+    "04": "April", "05": "Mei", "06": "Juni",
+    "07": "Juli", "08": "Agustus", "09": "September",
+    "10": "Oktober", "11": "November", "12": "Desember"
+}
+
+
+# === Fungsi format rupiah ===
+def format_rupiah(x):
+    try:
+        if x < 0:
+            return f"({abs(x):,.0f})".replace(",", ".")
+        return f"{x:,.0f}".replace(",", ".")
+    except Exception:
+        return x
+
+
+def _titik_ribuan(bulat):
+    # int64 >= 0 -> "1.234.567" dengan kernel string pyarrow (tanpa loop Python per nilai):
+    # pad ke 21 digit, potong per 3 digit, gabung dengan ".", lalu buang "0"/"." di depan
+    angka = pa.array(bulat, type=pa.int64())
+    teks = pc.utf8_lpad(pc.cast(angka, pa.string()), 21, "0")
+    grup = [pc.utf8_slice_codeunits(teks, i, i + 3) for i in range(0, 21, 3)]
+    teks = pc.utf8_ltrim(pc.binary_join_element_wise(*grup, "."), "0.")
+    return pc.if_else(pc.equal(angka, 0), "0", teks)
+
+
+def format_rupiah_kolom(nilai):
+    # Versi ter-vektorisasi format_rupiah untuk satu kolom: 1234567 -> "1.234.567", -1234 -> "(1.234)".
+    # Seperti format_rupiah, sel yang bukan angka (mis. "" di laporan) dikembalikan apa adanya.
+    nilai = pd.Series(nilai)
+    if pd.api.types.is_bool_dtype(nilai) or pd.api.types.is_numeric_dtype(nilai):
+        mask = pd.Series(True, index=nilai.index)
+        angka = nilai.astype("float64")
+    else:
+        mask = nilai.map(lambda v: isinstance(v, (int, float, np.number)))
+        angka = pd.to_numeric(nilai.where(mask), errors="coerce").astype("float64")
+    hingga = (mask & np.isfinite(angka)).to_numpy()
+
+    # Pembulatan sama dengan f"{x:,.0f}" (round half to even)
+    teks = _titik_ribuan(np.rint(np.abs(angka.to_numpy()[hingga])).astype("int64"))
+    negatif = pa.array(angka.to_numpy()[hingga] < 0)
+    teks = pc.if_else(negatif, pc.binary_join_element_wise("(", teks, ")", ""), teks)
+
+    if hingga.all():
+        return pd.Series(teks.to_numpy(zero_copy_only=False), index=nilai.index, dtype=object)
+    hasil = nilai.astype(object).copy()
+    hasil[hingga] = teks.to_numpy(zero_copy_only=False)
+    # NaN/inf jarang; diserahkan ke versi skalar agar hasilnya identik
+    sisa = mask & ~hingga
+    if sisa.any():
+        hasil[sisa] = nilai[sisa].map(format_rupiah)
+    return hasil
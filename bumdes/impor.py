@@ -0,0 +1,148 @@
+import io
+import itertools
+
+import pandas as pd
+
+from bumdes.skema import ke_tanggal
+from bumdes.store import KOLOM_JURNAL
+
+UKURAN_CHUNK = 5000
+MAKS_CONTOH_DITOLAK = 1000
+
+# Header file yang dikenali (huruf kecil) -> kolom jurnal
+_ALIAS_KOLOM = {
+    "tanggal": "Tanggal",
+    "tgl": "Tanggal",
+    "keterangan": "Keterangan",
+    "uraian": "Keterangan",
+    "ref": "Ref",
+    "kode akun": "Ref",
+    "debit (rp)": "Debit (Rp)",
+    "debit": "Debit (Rp)",
+    "kredit (rp)": "Kredit (Rp)",
+    "kredit": "Kredit (Rp)",
+}
+
+
+def _seragamkan_kolom(df):
+    df = df.rename(columns=lambda c: _ALIAS_KOLOM.get(str(c).strip().lower(), str(c).strip()))
+    hilang = [c for c in ["Tanggal", "Ref", "Debit (Rp)", "Kredit (Rp)"] if c not in df.columns]
+    if hilang:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(hilang)}")
+    if "Keterangan" not in df.columns:
+        df["Keterangan"] = ""
+    return df[KOLOM_JURNAL]
+
+
+def _baca_csv(sumber, ukuran_chunk):
+    # Semua kolom dibaca sebagai teks; konversi dilakukan saat validasi
+    for chunk in pd.read_csv(sumber, dtype=str, keep_default_na=False, chunksize=ukuran_chunk):
+        chunk.index = chunk.index + 2  # nomor baris di file (baris 1 = header)
+        yield _seragamkan_kolom(chunk)
+
+
+def _baca_xlsx(sumber, ukuran_chunk):
+    # openpyxl mode read_only membaca baris demi baris, tidak memuat seluruh workbook
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("Impor Excel membutuhkan paket 'openpyxl' (pip install openpyxl)") from e
+
+    wb = load_workbook(sumber, read_only=True, data_only=True)
+    try:
+        baris = wb.active.iter_rows(values_only=True)
+        header = next(baris, None)
+        if header is None:
+            return
+        header = ["" if h is None else str(h) for h in header]
+        nomor = 2
+        while True:
+            isi = list(itertools.islice(baris, ukuran_chunk))
+            if not isi:
+                break
+            chunk = pd.DataFrame(isi, columns=header, index=range(nomor, nomor + len(isi)))
+            nomor += len(isi)
+            yield _seragamkan_kolom(chunk)
+    finally:
+        wb.close()
+
+
+def baca_bertahap(sumber, nama_file, ukuran_chunk=UKURAN_CHUNK):
+    # sumber: path atau file-like (mis. hasil st.file_uploader)
+    if isinstance(sumber, bytes):
+        sumber = io.BytesIO(sumber)
+    if str(nama_file).lower().endswith((".xlsx", ".xlsm")):
+        return _baca_xlsx(sumber, ukuran_chunk)
+    return _baca_csv(sumber, ukuran_chunk)
+
+
+def _ke_angka(nilai):
+    # "1.500.000" / "1500000" / 1500000.0 -> 1500000; kosong -> 0
+    teks = nilai.astype(str).str.strip().str.replace(r"^(Rp\.?\s*)", "", regex=True)
+    teks = teks.where(~teks.str.fullmatch(r"-?\d{1,3}(\.\d{3})+"), teks.str.replace(".", "", regex=False))
+    teks = teks.mask(teks.isin(["", "None", "nan"]), "0")
+    return pd.to_numeric(teks, errors="coerce")
+
+
+def validasi_chunk(chunk, refs_dikenal=None, tutup_sampai=None):
+    # Validasi ter-vektorisasi; kembalikan (baris valid, baris ditolak + kolom Alasan).
+    # tutup_sampai: periode tutup buku terakhir "YYYY-MM"; periode itu & sebelumnya dikunci di store
+    tanggal = ke_tanggal(chunk["Tanggal"].fillna(""))
+    ref = chunk["Ref"].fillna("").astype(str).str.strip().str.replace(r"\.0$", "", regex=True)
+    debit = _ke_angka(chunk["Debit (Rp)"].fillna(""))
+    kredit = _ke_angka(chunk["Kredit (Rp)"].fillna(""))
+
+    # Urutan = prioritas alasan yang dilaporkan
+    aturan = [
+        (tanggal.isna(), "Tanggal tidak valid"),
+        (ref == "", "Ref kosong"),
+        (debit.isna() | kredit.isna(), "Debit/Kredit bukan angka"),
+        ((debit < 0) | (kredit < 0), "Debit/Kredit negatif"),
+        ((debit.fillna(0) > 0) & (kredit.fillna(0) > 0), "Debit dan Kredit terisi bersamaan"),
+        ((debit.fillna(0) == 0) & (kredit.fillna(0) == 0), "Debit dan Kredit kosong"),
+    ]
+    if tutup_sampai:
+        batas = pd.Timestamp(f"{tutup_sampai}-01") + pd.offsets.MonthBegin(1)
+        aturan.append((tanggal < batas, "Periode sudah ditutup"))
+    if refs_dikenal:
+        aturan.append((~ref.isin(set(refs_dikenal)), "Ref tidak ada di bagan akun"))
+
+    alasan = pd.Series("", index=chunk.index)
+    for mask, pesan in reversed(aturan):
+        alasan = alasan.mask(mask, pesan)
+    ok = alasan == ""
+
+    valid = pd.DataFrame({
+        "Tanggal": tanggal[ok].dt.strftime("%Y-%m-%d"),
+        "Keterangan": chunk.loc[ok, "Keterangan"].fillna("").astype(str).str.strip(),
+        "Ref": ref[ok],
+        "Debit (Rp)": debit[ok].round().astype("int64"),
+        "Kredit (Rp)": kredit[ok].round().astype("int64"),
+    })
+    ditolak = chunk.loc[~ok].assign(Alasan=alasan[~ok])
+    ditolak.index.name = "Baris"
+    return valid, ditolak
+
+
+def impor_jurnal(store, sumber, nama_file, refs_dikenal=None, ukuran_chunk=UKURAN_CHUNK):
+    # Baca & validasi per chunk, tulis semua baris valid dalam satu transaksi.
+    # Memori dibatasi ukuran chunk + contoh baris ditolak (maks MAKS_CONTOH_DITOLAK).
+    hasil = {"diterima": 0, "ditolak": 0, "contoh_ditolak": []}
+    tutup = store.daftar_periode_tutup()
+
+    def chunk_valid():
+        for chunk in baca_bertahap(sumber, nama_file, ukuran_chunk):
+            valid, ditolak = validasi_chunk(chunk, refs_dikenal, tutup[-1] if tutup else None)
+            hasil["diterima"] += len(valid)
+            hasil["ditolak"] += len(ditolak)
+            sisa = MAKS_CONTOH_DITOLAK - sum(len(d) for d in hasil["contoh_ditolak"])
+            if sisa > 0 and not ditolak.empty:
+                hasil["contoh_ditolak"].append(ditolak.head(sisa))
+            yield valid
+
+    store.tambah_bertahap(chunk_valid())
+    contoh = hasil["contoh_ditolak"]
+    hasil["contoh_ditolak"] = (
+        pd.concat(contoh).reset_index() if contoh else pd.DataFrame(columns=["Baris"] + KOLOM_JURNAL + ["Alasan"])
+    )
+    return hasil
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# Urutan = prioritas, sama seperti rantai if/elif lama di tab Laporan Keuangan
+POLA_KATEGORI = [
+    ("Pendapatan", r"pendapatan|penjualan|penerimaan"),
+    ("Beban", r"beban|biaya|gaji|sewa|pembayaran"),
+    ("Aktiva Lancar", r"kas|perlengkapan|piutang"),
+    ("Aktiva Tetap", r"peralatan|gedung|kendaraan"),
+    ("Modal", r"modal"),
+    ("Kewajiban", r"hutang|utang"),
+]
+
+
+def klasifikasi_akun(nama_akun):
+    # Satu pass ter-vektorisasi: satu mask per kategori, lalu np.select
+    nama = nama_akun.fillna("").astype(str).str.lower()
+    masks = [nama.str.contains(pola, regex=True).to_numpy() for _, pola in POLA_KATEGORI]
+    kategori = np.select(masks, [k for k, _ in POLA_KATEGORI], default="")
+    return pd.Series(kategori, index=nama_akun.index, name="Kategori")
+
+
+def klasifikasi_neraca(df_neraca, bagan_akun):
+    # Kategori dari Ref (bagan akun); kata kunci nama akun hanya untuk baris tanpa Ref dikenal
+    kategori = bagan_akun.klasifikasi(df_neraca["Ref"])
+    tanpa_ref = kategori == ""
+    if tanpa_ref.any():
+        kategori = kategori.mask(tanpa_ref, klasifikasi_akun(df_neraca.loc[tanpa_ref, "Akun"]))
+    return kategori
+
+
+def _frame(baris_kosong, **kolom):
+    # Baris kosong di atas tetap dipertahankan sebagai baris input
+    return pd.concat([pd.DataFrame([baris_kosong]), pd.DataFrame(kolom)], ignore_index=True)
+
+
+def susun_laporan(df_neraca, kategori=None):
+    # Bangun semua tabel Laporan Keuangan dari Neraca Saldo, masing-masing sekali
+    akun = df_neraca["Akun"].reset_index(drop=True)
+    debit = pd.to_numeric(df_neraca["Debit (Rp)"], errors="coerce").fillna(0).reset_index(drop=True)
+    kredit = pd.to_numeric(df_neraca["Kredit (Rp)"], errors="coerce").fillna(0).reset_index(drop=True)
+    if kategori is None:
+        kategori = klasifikasi_akun(df_neraca["Akun"])
+    kategori = kategori.reset_index(drop=True)
+
+    is_pendapatan = kategori == "Pendapatan"
+    is_beban = kategori == "Beban"
+    is_lancar = kategori == "Aktiva Lancar"
+    is_tetap = kategori == "Aktiva Tetap"
+    is_modal = kategori == "Modal"
+    is_kewajiban = kategori == "Kewajiban"
+
+    # Arus kas operasi: penerimaan pendapatan (+kredit) dan pembayaran beban (-debit), urutan asli
+    mask_operasi = (is_pendapatan & (kredit > 0)) | (is_beban & (debit > 0))
+    jumlah_operasi = kredit.where(is_pendapatan, -debit)
+    mask_investasi = is_tetap & (debit > 0)
+    mask_pendanaan = is_modal & (kredit > 0)
+
+    return {
+        "pendapatan": _frame(
+            {"Jenis Pendapatan": "", "Debit (Rp)": 0, "Kredit (Rp)": 0},
+            **{"Jenis Pendapatan": akun[is_pendapatan], "Debit (Rp)": debit[is_pendapatan], "Kredit (Rp)": kredit[is_pendapatan]},
+        ),
+        "beban": _frame(
+            {"Jenis Beban": "", "Debit (Rp)": 0, "Kredit (Rp)": 0},
+            **{"Jenis Beban": akun[is_beban], "Debit (Rp)": debit[is_beban], "Kredit (Rp)": kredit[is_beban]},
+        ),
+        "aktiva_lancar": _frame({"Item": "", "Jumlah (Rp)": 0}, **{"Item": akun[is_lancar], "Jumlah (Rp)": debit[is_lancar]}),
+        "aktiva_tetap": _frame({"Item": "", "Jumlah (Rp)": 0}, **{"Item": akun[is_tetap], "Jumlah (Rp)": debit[is_tetap]}),
+        "kewajiban": _frame({"Item": "", "Jumlah (Rp)": 0}, **{"Item": akun[is_kewajiban], "Jumlah (Rp)": kredit[is_kewajiban]}),
+        # Jika ada beberapa akun modal, yang terakhir dipakai (perilaku lama)
+        "modal_data": {"modal_awal": int(kredit[is_modal].iloc[-1]) if is_modal.any() else 0},
+        "arus_kas_operasi": _frame(
+            {"Aktivitas": "", "Jumlah (Rp)": 0},
+            **{"Aktivitas": akun[mask_operasi], "Jumlah (Rp)": jumlah_operasi[mask_operasi]},
+        ),
+        "arus_kas_investasi": _frame(
+            {"Aktivitas": "", "Jumlah (Rp)": 0},
+            **{"Aktivitas": "Pembelian " + akun[mask_investasi].astype(str), "Jumlah (Rp)": -debit[mask_investasi]},
+        ),
+        "arus_kas_pendanaan": _frame(
+            {"Aktivitas": "", "Jumlah (Rp)": 0},
+            **{"Aktivitas": pd.Series("Setoran Modal", index=akun[mask_pendanaan].index), "Jumlah (Rp)": kredit[mask_pendanaan]},
+        ),
+    }
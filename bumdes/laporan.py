@@ -0,0 +1,169 @@
+import pandas as pd
+
+from bumdes.cache import memo_laporan
+
+
+# Semua fungsi di sini di-memo berdasarkan isi input: hasilnya jangan diubah in-place.
+# Kolom "Tebal" menandai baris yang ditebalkan di tampilan & PDF (dihitung sekali di sini).
+
+
+@memo_laporan
+def susun_jurnal(df_clean):
+    total_row = pd.DataFrame({
+        "Tanggal": [""],
+        "Keterangan": ["TOTAL"],
+        "Ref": [""],
+        "Debit (Rp)": [df_clean["Debit (Rp)"].sum()],
+        "Kredit (Rp)": [df_clean["Kredit (Rp)"].sum()],
+    })
+    return pd.concat([df_clean, total_row], ignore_index=True)
+
+
+@memo_laporan
+def susun_neraca_saldo(df_neraca_clean):
+    total_row = pd.DataFrame({
+        "Ref": [""],
+        "Akun": ["Jumlah"],
+        "Debit (Rp)": [df_neraca_clean["Debit (Rp)"].sum()],
+        "Kredit (Rp)": [df_neraca_clean["Kredit (Rp)"].sum()]
+    })
+    df_neraca_final = pd.concat([df_neraca_clean, total_row], ignore_index=True)
+    df_neraca_final["Tebal"] = False
+    df_neraca_final.loc[len(df_neraca_final) - 1, "Tebal"] = True
+    df_neraca_final.index = range(1, len(df_neraca_final) + 1)
+    df_neraca_final.index.name = "No"
+    return df_neraca_final
+
+
+def _blok(baris):
+    # Baris tetap (judul, total, pemisah) -> DataFrame
+    return pd.DataFrame(baris)
+
+
+def _kosongkan_nol(nilai):
+    # 0 ditampilkan sebagai sel kosong, seperti di laporan manual
+    return nilai.astype(object).where(nilai != 0, "")
+
+
+def _rincian_debit_kredit(df, kolom_nama):
+    return pd.DataFrame({
+        "Keterangan": "  " + (df.index.to_series() + 1).astype(str).to_numpy() + ". " + df[kolom_nama].astype(str).to_numpy(),
+        "Debit": _kosongkan_nol(df["Debit (Rp)"]).to_numpy(),
+        "Kredit": _kosongkan_nol(df["Kredit (Rp)"]).to_numpy(),
+        "Tebal": False,
+    })
+
+
+@memo_laporan
+def susun_labarugi(df_pendapatan_clean, df_beban_clean):
+    # Total Pendapatan = (Kredit - Debit)
+    total_pendapatan_debit = df_pendapatan_clean["Debit (Rp)"].sum() if not df_pendapatan_clean.empty else 0
+    total_pendapatan_kredit = df_pendapatan_clean["Kredit (Rp)"].sum() if not df_pendapatan_clean.empty else 0
+    total_pendapatan = total_pendapatan_kredit - total_pendapatan_debit
+
+    # Total Beban = (Debit - Kredit)
+    total_beban_debit = df_beban_clean["Debit (Rp)"].sum() if not df_beban_clean.empty else 0
+    total_beban_kredit = df_beban_clean["Kredit (Rp)"].sum() if not df_beban_clean.empty else 0
+    total_beban = total_beban_debit - total_beban_kredit
+
+    # Laba Bersih = Total Pendapatan - Total Beban
+    laba_bersih = total_pendapatan - total_beban
+
+    kosong = {"Keterangan": "", "Debit": "", "Kredit": "", "Tebal": False}
+    if total_pendapatan >= 0:
+        baris_total_pendapatan = {"Keterangan": "Total Pendapatan", "Debit": "", "Kredit": total_pendapatan, "Tebal": True}
+    else:
+        baris_total_pendapatan = {"Keterangan": "Total Pendapatan", "Debit": abs(total_pendapatan), "Kredit": "", "Tebal": True}
+    if total_beban >= 0:
+        baris_total_beban = {"Keterangan": "Total Beban", "Debit": total_beban, "Kredit": "", "Tebal": True}
+    else:
+        baris_total_beban = {"Keterangan": "Total Beban", "Debit": "", "Kredit": abs(total_beban), "Tebal": True}
+    if laba_bersih >= 0:
+        baris_laba = {"Keterangan": "Laba Bersih", "Debit": "", "Kredit": laba_bersih, "Tebal": True}
+    else:
+        baris_laba = {"Keterangan": "Rugi Bersih", "Debit": abs(laba_bersih), "Kredit": "", "Tebal": True}
+
+    df_labarugi = pd.concat([
+        _blok([{"Keterangan": "Pendapatan:", "Debit": "", "Kredit": "", "Tebal": False}]),
+        _rincian_debit_kredit(df_pendapatan_clean, "Jenis Pendapatan"),
+        _blok([kosong, baris_total_pendapatan, kosong, {"Keterangan": "Beban-Beban:", "Debit": "", "Kredit": "", "Tebal": False}]),
+        _rincian_debit_kredit(df_beban_clean, "Jenis Beban"),
+        _blok([kosong, baris_total_beban, kosong, baris_laba]),
+    ], ignore_index=True)
+    return df_labarugi, laba_bersih
+
+
+@memo_laporan
+def susun_neraca_lap(df_aktiva_lancar_clean, df_aktiva_tetap_clean, df_kewajiban_clean, modal_awal, laba_bersih):
+    total_aktiva_lancar = df_aktiva_lancar_clean["Jumlah (Rp)"].sum() if not df_aktiva_lancar_clean.empty else 0
+    total_aktiva_tetap = df_aktiva_tetap_clean["Jumlah (Rp)"].sum() if not df_aktiva_tetap_clean.empty else 0
+    total_aktiva = total_aktiva_lancar + total_aktiva_tetap
+
+    total_kewajiban = df_kewajiban_clean["Jumlah (Rp)"].sum() if not df_kewajiban_clean.empty else 0
+
+    modal_akhir = modal_awal + laba_bersih
+    total_passiva = total_kewajiban + modal_akhir
+
+    total_aktiva = 0 if pd.isna(total_aktiva) else float(total_aktiva)
+    total_passiva = 0 if pd.isna(total_passiva) else float(total_passiva)
+
+    # Aktiva lancar dan kewajiban berdampingan; sisi yang lebih pendek diisi kosong
+    max_rows = max(len(df_aktiva_lancar_clean), len(df_kewajiban_clean))
+    lancar = df_aktiva_lancar_clean.reset_index(drop=True).astype(object).reindex(range(max_rows))
+    kewajiban = df_kewajiban_clean.reset_index(drop=True).astype(object).reindex(range(max_rows))
+    berdampingan = pd.DataFrame({
+        "Aktiva": "  " + lancar["Item"].fillna("").astype(str),
+        "Jumlah1": lancar["Jumlah (Rp)"].astype(object).where(lancar["Jumlah (Rp)"].notna(), ""),
+        "Passiva": "  " + kewajiban["Item"].fillna("").astype(str),
+        "Jumlah2": kewajiban["Jumlah (Rp)"].astype(object).where(kewajiban["Jumlah (Rp)"].notna(), ""),
+        "Tebal": False,
+    })
+    tetap = pd.DataFrame({
+        "Aktiva": "  " + df_aktiva_tetap_clean["Item"].astype(str).to_numpy(),
+        "Jumlah1": df_aktiva_tetap_clean["Jumlah (Rp)"].to_numpy(),
+        "Passiva": "",
+        "Jumlah2": "",
+        "Tebal": False,
+    })
+
+    kosong = {"Aktiva": "", "Jumlah1": "", "Passiva": "", "Jumlah2": "", "Tebal": False}
+    return pd.concat([
+        _blok([
+            {"Aktiva": "Aktiva", "Jumlah1": "", "Passiva": "Passiva", "Jumlah2": "", "Tebal": False},
+            kosong,
+            {"Aktiva": "Aktiva Lancar:", "Jumlah1": "", "Passiva": "Kewajiban:", "Jumlah2": "", "Tebal": False},
+        ]),
+        berdampingan,
+        _blok([
+            kosong,
+            {"Aktiva": "Jml aktiva lancar", "Jumlah1": total_aktiva_lancar, "Passiva": "Ekuitas:", "Jumlah2": "", "Tebal": True},
+            {"Aktiva": "", "Jumlah1": "", "Passiva": "  Modal", "Jumlah2": modal_awal, "Tebal": False},
+            {"Aktiva": "Aktiva Tetap:", "Jumlah1": "", "Passiva": "  Laba", "Jumlah2": laba_bersih, "Tebal": False},
+        ]),
+        tetap,
+        _blok([
+            kosong,
+            {"Aktiva": "Jml Aktiva", "Jumlah1": total_aktiva, "Passiva": "Jml Kewajiban & Ekuitas", "Jumlah2": total_passiva, "Tebal": True},
+        ]),
+    ], ignore_index=True)
+
+
+def _rincian_arus_kas(df):
+    return pd.DataFrame({
+        "Aktivitas": "  " + df["Aktivitas"].astype(str).to_numpy(),
+        "Jumlah": df["Jumlah (Rp)"].to_numpy(),
+        "Tebal": False,
+    })
+
+
+@memo_laporan
+def susun_arus_kas(df_op, df_inv, df_pend):
+    kosong = {"Aktivitas": "", "Jumlah": "", "Tebal": False}
+    return pd.concat([
+        _blok([{"Aktivitas": "Arus Kas Operasi:", "Jumlah": "", "Tebal": True}]),
+        _rincian_arus_kas(df_op),
+        _blok([kosong, {"Aktivitas": "Arus Kas Investasi:", "Jumlah": "", "Tebal": True}]),
+        _rincian_arus_kas(df_inv),
+        _blok([kosong, {"Aktivitas": "Arus Kas Pendanaan:", "Jumlah": "", "Tebal": True}]),
+        _rincian_arus_kas(df_pend),
+    ], ignore_index=True)
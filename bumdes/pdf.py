@@ -0,0 +1,306 @@
+import re
+
+import pandas as pd
+from fpdf import FPDF
+
+from bumdes.cache import memo_laporan
+from bumdes.format import BULAN, format_rupiah, format_rupiah_kolom
+
+
+def pdf_ke_bytes(pdf):
+    # Render langsung ke memori; tidak ada file sementara di /tmp
+    return bytes(pdf.output())
+
+
+# Tata letak Jurnal Umum (A4 portrait, lebar isi 190 mm)
+_KOLOM_PDF_JURNAL = [
+    # (judul, lebar mm, perataan)
+    ("No", 12, "R"),
+    ("Tanggal", 24, "L"),
+    ("Keterangan", 74, "L"),
+    ("Ref", 16, "L"),
+    ("Debit (Rp)", 32, "R"),
+    ("Kredit (Rp)", 32, "R"),
+]
+_TINGGI_BARIS = 6
+_PADDING = 1.5
+_MAKS_KETERANGAN = 42
+
+
+def _teks_latin1(nilai):
+    # Font bawaan FPDF hanya mendukung latin-1; karakter lain diganti "?"
+    return nilai.astype(str).str.encode("latin-1", errors="replace").str.decode("latin-1")
+
+
+def _teks_angka(kolom, kosong=""):
+    # Kolom angka (boleh campur "") -> teks rupiah sekali per kolom; sel bukan angka -> `kosong`
+    angka = pd.to_numeric(kolom, errors="coerce")
+    return format_rupiah_kolom(angka).where(angka.notna(), kosong).astype(str)
+
+
+def _potong(kolom, maks, sisa):
+    # Teks lebih dari `maks` karakter dipotong menjadi `sisa` karakter + "..."
+    teks = kolom.fillna("").astype(str)
+    return teks.where(teks.str.len() <= maks, teks.str.slice(0, sisa) + "...")
+
+
+def _lebar_angka(teks, pdf):
+    # Lebar (mm) teks angka per kolom dari tabel lebar glyph font, tanpa get_string_width per sel
+    cw = pdf.current_font.cw
+    teks = teks.astype(str)
+    satuan = sum(teks.str.count(re.escape(c)) * cw[c] for c in "0123456789.()")
+    return satuan * pdf.font_size / 1000
+
+
+def _siapkan_jurnal(df, pdf):
+    # Semua teks & posisi x sel dihitung sekali per kolom; per baris tinggal menggambar
+    debit = pd.to_numeric(df["Debit (Rp)"], errors="coerce").fillna(0)
+    kredit = pd.to_numeric(df["Kredit (Rp)"], errors="coerce").fillna(0)
+    ket = _teks_latin1(df["Keterangan"].fillna(""))
+    ket = ket.where(ket.str.len() <= _MAKS_KETERANGAN, ket.str.slice(0, _MAKS_KETERANGAN - 3) + "...")
+    teks = {
+        "No": pd.Series(pd.RangeIndex(1, len(df) + 1).astype(str)),
+        "Tanggal": _teks_latin1(df["Tanggal"].fillna("")).reset_index(drop=True),
+        "Keterangan": ket.reset_index(drop=True),
+        "Ref": _teks_latin1(df["Ref"].fillna("")).reset_index(drop=True),
+        "Debit (Rp)": format_rupiah_kolom(debit).where(debit != 0, "").reset_index(drop=True),
+        "Kredit (Rp)": format_rupiah_kolom(kredit).where(kredit != 0, "").reset_index(drop=True),
+    }
+
+    kolom = []
+    x = pdf.l_margin
+    for judul, w, perataan in _KOLOM_PDF_JURNAL:
+        if perataan == "R":
+            posisi = (x + w - _PADDING - _lebar_angka(teks[judul], pdf)).round(2)
+        else:
+            posisi = pd.Series(x + _PADDING, index=teks[judul].index)
+        kolom += [teks[judul], posisi]
+        x += w
+    # Per baris: (teks1, x1, teks2, x2, ...)
+    return list(zip(*kolom)), debit.to_numpy(), kredit.to_numpy()
+
+
+@memo_laporan
+def buat_pdf(df):
+    # df: baris jurnal (tanpa baris TOTAL). Ditulis per halaman dengan judul kolom berulang,
+    # subtotal per halaman, dan jumlah yang dipindahkan ke halaman berikutnya.
+    lebar = [w for _, w, _ in _KOLOM_PDF_JURNAL]
+    lebar_label = sum(lebar[:4])
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(False)
+    pdf.set_margins(10, 10, 10)
+    pdf.set_font("Arial", '', 8)
+    baris_teks, debit, kredit = _siapkan_jurnal(df, pdf)
+
+    def judul_kolom():
+        pdf.set_font("Arial", 'B', 9)
+        for judul, w, _ in _KOLOM_PDF_JURNAL:
+            pdf.cell(w, 8, judul, border=1, align="C")
+        pdf.ln()
+
+    def baris_jumlah(label, d, k):
+        pdf.set_font("Arial", 'B', 8)
+        pdf.cell(lebar_label, _TINGGI_BARIS, label, border=1, align="R")
+        pdf.cell(lebar[4], _TINGGI_BARIS, format_rupiah(d), border=1, align="R")
+        pdf.cell(lebar[5], _TINGGI_BARIS, format_rupiah(k), border=1, align="R")
+        pdf.ln()
+
+    def isi_halaman(baris):
+        # Teks digambar langsung (pdf.text), garis tabel sekali per halaman
+        pdf.set_font("Arial", '', 8)
+        y0 = pdf.get_y()
+        baseline = _TINGGI_BARIS / 2 + 0.3 * pdf.font_size
+        for i, isi in enumerate(baris):
+            y = y0 + i * _TINGGI_BARIS + baseline
+            for j in range(0, len(isi), 2):
+                if isi[j]:
+                    pdf.text(isi[j + 1], y, isi[j])
+        y1 = y0 + len(baris) * _TINGGI_BARIS
+        x = pdf.l_margin
+        for w in [0] + lebar:
+            x += w
+            pdf.line(x, y0, x, y1)
+        for i in range(len(baris) + 1):
+            y = y0 + i * _TINGGI_BARIS
+            pdf.line(pdf.l_margin, y, pdf.l_margin + sum(lebar), y)
+        pdf.set_y(y1)
+
+    # Ruang per halaman: judul laporan (hal. 1), judul kolom, pindahan, subtotal, dipindahkan, nomor halaman
+    tinggi_isi = 297 - 20 - 8 - 3 * _TINGGI_BARIS - 8
+    per_halaman_pertama = int((tinggi_isi - 18) // _TINGGI_BARIS)
+    per_halaman = int(tinggi_isi // _TINGGI_BARIS)
+    batas = [0, min(per_halaman_pertama, len(baris_teks))]
+    while batas[-1] < len(baris_teks):
+        batas.append(min(batas[-1] + per_halaman, len(baris_teks)))
+    jumlah_halaman = len(batas) - 1
+
+    pindahan_d = pindahan_k = 0
+    for hal in range(jumlah_halaman):
+        awal, akhir = batas[hal], batas[hal + 1]
+        pdf.add_page()
+        if hal == 0:
+            pdf.set_font("Arial", 'B', 14)
+            pdf.cell(0, 10, "Jurnal Umum BUMDes", align="C")
+            pdf.ln(18)
+        judul_kolom()
+        if hal > 0:
+            baris_jumlah("Pindahan", pindahan_d, pindahan_k)
+
+        isi_halaman(baris_teks[awal:akhir])
+
+        sub_d = int(debit[awal:akhir].sum())
+        sub_k = int(kredit[awal:akhir].sum())
+        pindahan_d += sub_d
+        pindahan_k += sub_k
+        baris_jumlah("Jumlah halaman ini", sub_d, sub_k)
+        if hal < jumlah_halaman - 1:
+            baris_jumlah("Dipindahkan", pindahan_d, pindahan_k)
+        else:
+            baris_jumlah("TOTAL", pindahan_d, pindahan_k)
+
+        pdf.set_y(-12)
+        pdf.set_font("Arial", 'I', 8)
+        pdf.cell(0, 5, f"Halaman {hal + 1} dari {jumlah_halaman}", align="C")
+
+    return pdf_ke_bytes(pdf)
+
+
+@memo_laporan
+def buat_pdf_neraca(df, bulan, tahun):
+    pdf = FPDF()
+    pdf.add_page()
+    
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(0, 10, txt="Neraca Saldo BUMDes", ln=True, align="C")
+    pdf.set_font("Arial", '', 12)
+    pdf.cell(0, 8, txt=f"Periode: {BULAN[bulan]} {tahun}", ln=True, align="C")
+    pdf.ln(5)
+
+    pdf.set_font("Arial", 'B', 10)
+    col_widths = [15, 25, 70, 40, 40]
+    headers = ["No", "Ref", "Akun", "Debit (Rp)", "Kredit (Rp)"]
+    
+    for i, header in enumerate(headers):
+        pdf.cell(col_widths[i], 10, header, border=1, align="C")
+    pdf.ln()
+
+    pdf.set_font("Arial", '', 9)
+    # Teks setiap kolom disiapkan sekali; per baris tinggal menggambar
+    akun = _potong(df["Akun"], 35, 32)
+    debit = _teks_angka(df["Debit (Rp)"].where(pd.to_numeric(df["Debit (Rp)"], errors="coerce") != 0, ""), "-")
+    kredit = _teks_angka(df["Kredit (Rp)"].where(pd.to_numeric(df["Kredit (Rp)"], errors="coerce") != 0, ""), "-")
+    for idx, ref, a, d, k in zip(df.index, df["Ref"].astype(str), akun, debit, kredit):
+        pdf.cell(col_widths[0], 8, str(idx), border=1, align="C")
+        pdf.cell(col_widths[1], 8, ref, border=1, align="C")
+        pdf.cell(col_widths[2], 8, a, border=1, align="L")
+        pdf.cell(col_widths[3], 8, d, border=1, align="R")
+        pdf.cell(col_widths[4], 8, k, border=1, align="R")
+        pdf.ln()
+
+    pdf.ln(5)
+    pdf.set_font("Arial", 'I', 8)
+    pdf.cell(0, 5, txt="Dicetak dari Sistem Akuntansi BUMDes", ln=True, align="C")
+
+    return pdf_ke_bytes(pdf)
+
+
+@memo_laporan
+def buat_pdf_labarugi(df, bulan, tahun):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(0, 10, txt="Laporan Laba/Rugi", ln=True, align="C")
+    pdf.set_font("Arial", '', 12)
+    pdf.cell(0, 8, txt="BUMDes", ln=True, align="C")
+    pdf.cell(0, 8, txt=f"Periode: {BULAN[bulan]} {tahun}", ln=True, align="C")
+    pdf.ln(5)
+    pdf.set_font("Arial", 'B', 10)
+    pdf.cell(90, 10, "Keterangan", border=1, align="C")
+    pdf.cell(45, 10, "Debit (Rp)", border=1, align="C")
+    pdf.cell(45, 10, "Kredit (Rp)", border=1, align="C")
+    pdf.ln()
+    pdf.set_font("Arial", '', 9)
+    
+    # ✅ Tampilkan SEMUA nilai (termasuk yang di Total); teks disiapkan sekali per kolom
+    ket = _potong(df["Keterangan"], 43, 40)
+    debit = _teks_angka(df["Debit"])
+    kredit = _teks_angka(df["Kredit"])
+    for is_bold, k_text, debit_text, kredit_text in zip(df["Tebal"].astype(bool), ket, debit, kredit):
+        pdf.set_font("Arial", 'B' if is_bold else '', 9)
+        pdf.cell(90, 8, k_text, border=1, align="L")
+        pdf.cell(45, 8, debit_text, border=1, align="R")
+        pdf.cell(45, 8, kredit_text, border=1, align="R")
+        pdf.ln()
+    
+    pdf.ln(5)
+    pdf.set_font("Arial", 'I', 8)
+    pdf.cell(0, 5, txt="Dicetak dari Sistem Akuntansi BUMDes", ln=True, align="C")
+    
+    return pdf_ke_bytes(pdf)
+
+
+@memo_laporan
+def buat_pdf_neraca_lap(df, bulan, tahun):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(0, 10, txt="Laporan Neraca", ln=True, align="C")
+    pdf.set_font("Arial", '', 12)
+    pdf.cell(0, 8, txt="BUMDes", ln=True, align="C")
+    pdf.cell(0, 8, txt=f"Periode: {BULAN[bulan]} {tahun}", ln=True, align="C")
+    pdf.ln(5)
+    pdf.set_font("Arial", 'B', 10)
+    
+    col_widths = [60, 30, 60, 30]
+    headers = ["Aktiva", "Jumlah (Rp)", "Passiva", "Jumlah (Rp)"]
+    
+    for i, header in enumerate(headers):
+        pdf.cell(col_widths[i], 10, header, border=1, align="C")
+    pdf.ln()
+    
+    # ✅ Tampilkan SEMUA nilai; teks disiapkan sekali per kolom
+    aktiva = _potong(df["Aktiva"], 30, 28)
+    jumlah1 = _teks_angka(df["Jumlah1"])
+    passiva = _potong(df["Passiva"], 30, 28)
+    jumlah2 = _teks_angka(df["Jumlah2"])
+    for is_bold, a, j1, p, j2 in zip(df["Tebal"].astype(bool), aktiva, jumlah1, passiva, jumlah2):
+        pdf.set_font("Arial", 'B' if is_bold else '', 9)
+        pdf.cell(col_widths[0], 8, a, border=1, align="L")
+        pdf.cell(col_widths[1], 8, j1, border=1, align="R")
+        pdf.cell(col_widths[2], 8, p, border=1, align="L")
+        pdf.cell(col_widths[3], 8, j2, border=1, align="R")
+        pdf.ln()
+    
+    pdf.ln(5)
+    pdf.set_font("Arial", 'I', 8)
+    pdf.cell(0, 5, txt="Dicetak dari Sistem Akuntansi BUMDes", ln=True, align="C")
+    
+    return pdf_ke_bytes(pdf)
+
+
+@memo_laporan
+def buat_pdf_ak(df, b, t):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 14)
+    pdf.cell(0, 10, "Laporan Arus Kas", ln=True, align="C")
+    pdf.set_font("Arial", '', 12)
+    pdf.cell(0, 8, "BUMDes", ln=True, align="C")
+    pdf.cell(0, 8, f"Periode: {BULAN[b]} {t}", ln=True, align="C")
+    pdf.ln(5)
+    pdf.set_font("Arial", 'B', 10)
+    pdf.cell(120, 10, "Aktivitas", border=1, align="C")
+    pdf.cell(60, 10, "Jumlah (Rp)", border=1, align="C")
+    pdf.ln()
+    aktivitas = df["Aktivitas"].astype(str).str.slice(0, 47)
+    jumlah = _teks_angka(df["Jumlah"])
+    for is_bold, a, j in zip(df["Tebal"].astype(bool), aktivitas, jumlah):
+        pdf.set_font("Arial", 'B' if is_bold else '', 9)
+        pdf.cell(120, 8, a, border=1, align="L")
+        pdf.cell(60, 8, j, border=1, align="R")
+        pdf.ln()
+    pdf.ln(5)
+    pdf.set_font("Arial", 'I', 8)
+    pdf.cell(0, 5, "Dicetak dari Sistem Akuntansi BUMDes", ln=True, align="C")
+    return pdf_ke_bytes(pdf)
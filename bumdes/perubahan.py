@@ -0,0 +1,126 @@
+import time
+from collections import deque
+
+import pandas as pd
+
+from bumdes.skema import ke_tanggal, nilai_teks, siapkan_kategori
+
+# Dipasang sebagai custom_jscode_for_grid_return (DataReturnMode.CUSTOM): grid hanya mengirim
+# daftar edit sel sejak grid dipasang dan id baris yang sedang dipilih, bukan seluruh isi tabel.
+# `sesi` berganti setiap grid dipasang ulang sehingga nomor urut `seq` bisa dimulai dari 1 lagi.
+JS_AMBIL_EDIT = """
+function({streamlitRerunEventTriggerName, eventData}) {
+    const api = eventData.api;
+    if (!api.__bumdesEdit) {
+        api.__bumdesEdit = [];
+        api.__bumdesSesi = Date.now() + "-" + Math.random().toString(36).slice(2);
+    }
+    if (streamlitRerunEventTriggerName === "cellValueChanged") {
+        api.__bumdesEdit.push({
+            seq: api.__bumdesEdit.length + 1,
+            baris: String(eventData.node.id),
+            kolom: eventData.colDef.field,
+            lama: eventData.oldValue === undefined ? null : eventData.oldValue,
+            baru: eventData.newValue === undefined ? null : eventData.newValue
+        });
+    }
+    const pilih = api.getSelectedNodes().map(node => String(node.id));
+    return {sesi: api.__bumdesSesi, edit: api.__bumdesEdit, pilih: pilih};
+}
+"""
+
+
+def edit_baru(respons, status):
+    # Ambil edit yang belum diterapkan; `status` (dict per grid) menyimpan sesi & seq terakhir
+    data = respons.raw_data if hasattr(respons, "raw_data") else respons
+    if not data or not data.get("edit"):
+        return []
+    if data.get("sesi") != status.get("sesi"):
+        status["sesi"] = data.get("sesi")
+        status["seq"] = 0
+    baru = [e for e in data["edit"] if e["seq"] > status.get("seq", 0)]
+    if baru:
+        status["seq"] = baru[-1]["seq"]
+    return baru
+
+
+def baris_terpilih(respons):
+    # Id baris grid (str) yang sedang dipilih (checkbox seleksi)
+    data = respons.raw_data if hasattr(respons, "raw_data") else respons
+    return list(data.get("pilih") or []) if data else []
+
+
+def _angka(nilai):
+    # Kosong = 0; teks bukan angka (mis. "1.5jt") ditolak, bukan diam-diam menjadi 0
+    teks = "" if nilai is None else str(nilai).strip()
+    if not teks:
+        return 0
+    angka = pd.to_numeric(pd.Series([teks]), errors="coerce").iloc[0]
+    if pd.isna(angka):
+        raise ValueError(f"Angka tidak valid: {teks}")
+    return angka
+
+
+def _nilai_kolom(kolom, nilai):
+    # Samakan nilai dari grid (sering berupa string) dengan dtype kolom tujuan
+    if isinstance(kolom.dtype, pd.CategoricalDtype):
+        return "" if nilai is None else str(nilai)
+    if pd.api.types.is_datetime64_dtype(kolom):
+        # Kosong = tanggal dihapus (NaT); teks yang tidak bisa dibaca ditolak, bukan dianggap kosong
+        teks = "" if nilai is None else str(nilai).strip()
+        tanggal = ke_tanggal([teks]).iloc[0]
+        if teks and pd.isna(tanggal):
+            raise ValueError(f"Tanggal tidak valid: {teks}")
+        return tanggal
+    if pd.api.types.is_integer_dtype(kolom):
+        return int(round(_angka(nilai)))
+    if pd.api.types.is_float_dtype(kolom):
+        return float(_angka(nilai))
+    if pd.api.types.is_string_dtype(kolom) and not pd.api.types.is_object_dtype(kolom):
+        return "" if nilai is None else str(nilai)
+    return nilai
+
+
+def terapkan_edit(df, edit, label, ditolak=None):
+    # Terapkan edit sel ke `df` di tempat. label: {baris grid (str) -> label index df}.
+    # Kembalikan daftar (label, kolom, lama, baru) yang benar-benar mengubah isi.
+    # Nilai yang tidak bisa dibaca (tanggal/angka) dilewati; bila `ditolak` (list) diberikan,
+    # dicatat di sana sebagai (label, kolom, nilai, pesan).
+    hasil = []
+    for e in edit:
+        idx = label.get(e["baris"])
+        kolom = e["kolom"]
+        if idx is None or idx not in df.index or kolom not in df.columns:
+            continue
+        lama = df.at[idx, kolom]
+        try:
+            baru = _nilai_kolom(df[kolom], e["baru"])
+        except ValueError as err:
+            if ditolak is not None:
+                ditolak.append((idx, kolom, e["baru"], str(err)))
+            continue
+        if lama == baru or (pd.isna(lama) and pd.isna(baru)):
+            continue
+        siapkan_kategori(df, kolom, [baru])
+        df.at[idx, kolom] = baru
+        hasil.append((idx, kolom, lama, baru))
+    return hasil
+
+
+class LogPerubahan:
+    # Riwayat edit sel terakhir (dibatasi) untuk ditampilkan di UI
+    def __init__(self, maks=1000):
+        self._log = deque(maxlen=maks)
+
+    def catat(self, tabel, perubahan):
+        waktu = time.strftime("%H:%M:%S")
+        for idx, kolom, lama, baru in perubahan:
+            self._log.append({"Waktu": waktu, "Tabel": tabel, "Baris": idx, "Kolom": kolom, "Lama": nilai_teks(lama), "Baru": nilai_teks(baru)})
+
+    def __len__(self):
+        return len(self._log)
+
+    def ke_dataframe(self):
+        # Terbaru di atas; nilai dijadikan teks agar kolom campuran aman ditampilkan
+        df = pd.DataFrame(list(reversed(self._log)), columns=["Waktu", "Tabel", "Baris", "Kolom", "Lama", "Baru"])
+        return df.astype({"Baris": str, "Lama": str, "Baru": str})
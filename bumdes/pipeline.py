@@ -0,0 +1,134 @@
+import pandas as pd
+
+from bumdes.buku_besar import saldo_periode
+from bumdes.klasifikasi import klasifikasi_neraca, susun_laporan
+from bumdes.laporan import susun_arus_kas, susun_labarugi, susun_neraca_lap, susun_neraca_saldo
+
+_BELUM = object()
+_SKALAR = (str, int, float, bool, tuple, type(None))
+
+# Tabel Laporan Keuangan hasil klasifikasi Neraca Saldo (tahap "laporan")
+TABEL_LAPORAN = [
+    "pendapatan", "beban", "aktiva_lancar", "aktiva_tetap", "kewajiban",
+    "arus_kas_operasi", "arus_kas_investasi", "arus_kas_pendanaan",
+]
+
+
+class Pipeline:
+    # Pipeline reaktif kecil: setiap tahap mendeklarasikan inputnya (sumber atau tahap lain),
+    # hasilnya di-cache, dan hanya dihitung ulang bila versi salah satu input berubah.
+    def __init__(self):
+        self._nilai = {}    # sumber -> nilai terakhir
+        self._versi = {}    # sumber/tahap -> nomor versi
+        self._tahap = {}    # tahap -> (input, fungsi)
+        self._cache = {}    # tahap -> (versi input, hasil)
+        self._sinkron = {}  # tabel turunan -> versi tahap saat terakhir disalin
+        self.diedit = set()  # tabel turunan yang sudah diedit manual (tidak ditimpa otomatis)
+        self.hitung = {}    # tahap -> berapa kali dihitung
+
+    def sumber(self, nama, nilai):
+        # Versi naik bila objeknya berganti (skalar: bila nilainya berbeda).
+        # Perubahan in-place pada objek yang sama ditandai sendiri lewat tandai().
+        lama = self._nilai.get(nama, _BELUM)
+        sama = lama is nilai or (isinstance(nilai, _SKALAR) and type(lama) is type(nilai) and lama == nilai)
+        self._nilai[nama] = nilai
+        if not sama:
+            self.tandai(nama)
+
+    def tandai(self, *nama):
+        for n in nama:
+            self._versi[n] = self._versi.get(n, 0) + 1
+
+    def tahap(self, nama, input, fungsi):
+        # fungsi(*nilai_input) -> hasil tahap
+        self._tahap[nama] = (tuple(input), fungsi)
+
+    def versi(self, nama):
+        if nama in self._tahap:
+            self.ambil(nama)
+        return self._versi.get(nama, 0)
+
+    def ambil(self, nama):
+        if nama not in self._tahap:
+            return self._nilai.get(nama)
+        input, fungsi = self._tahap[nama]
+        nilai_input = [self.ambil(i) for i in input]
+        versi_input = tuple(self._versi.get(i, 0) for i in input)
+        tersimpan = self._cache.get(nama)
+        if tersimpan is not None and tersimpan[0] == versi_input:
+            return tersimpan[1]
+        hasil = fungsi(*nilai_input)
+        self._cache[nama] = (versi_input, hasil)
+        self.hitung[nama] = self.hitung.get(nama, 0) + 1
+        self.tandai(nama)
+        return hasil
+
+    # --- Tabel turunan yang bisa diedit (disalin dari hasil tahap) ---
+    def perlu_sinkron(self, tabel, tahap):
+        return self._sinkron.get(tabel) != self.versi(tahap)
+
+    def sudah_sinkron(self, tabel, tahap):
+        self._sinkron[tabel] = self.versi(tahap)
+        self.diedit.discard(tabel)
+
+
+def _terisi(df, kolom):
+    return df[df[kolom].astype(str).str.strip() != ""]
+
+
+def _neraca_dari_buku_besar(store, buku_besar, periode):
+    # Saldo bersih per akun sampai periode: aset & beban di Debit, modal & pendapatan di Kredit
+    saldo = saldo_periode(store, periode)
+    if saldo.empty:
+        return pd.DataFrame([{"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
+    bersih = saldo["akhir_debit"] - saldo["akhir_kredit"]
+    return pd.DataFrame({
+        "Ref": saldo.index,
+        "Akun": [buku_besar.get(ref, {}).get("nama_akun", f"Akun {ref}") for ref in saldo.index],
+        "Debit (Rp)": bersih.clip(lower=0).to_numpy(),
+        "Kredit (Rp)": (-bersih).clip(lower=0).to_numpy()
+    })
+
+
+def _laporan(neraca, bagan_akun):
+    df_neraca = _terisi(neraca, "Akun")
+    return susun_laporan(df_neraca, klasifikasi_neraca(df_neraca, bagan_akun))
+
+
+def _hasil_neraca_saldo(neraca):
+    df_neraca_clean = _terisi(neraca, "Akun")
+    return None if df_neraca_clean.empty else susun_neraca_saldo(df_neraca_clean)
+
+
+def _labarugi(pendapatan, beban):
+    return susun_labarugi(_terisi(pendapatan, "Jenis Pendapatan"), _terisi(beban, "Jenis Beban"))
+
+
+def _neraca_lap(aktiva_lancar, aktiva_tetap, kewajiban, modal_awal, labarugi):
+    return susun_neraca_lap(
+        _terisi(aktiva_lancar, "Item"), _terisi(aktiva_tetap, "Item"), _terisi(kewajiban, "Item"),
+        modal_awal, labarugi[1]
+    )
+
+
+def _arus_kas(operasi, investasi, pendanaan):
+    df_op, df_inv, df_pend = (_terisi(df, "Aktivitas") for df in (operasi, investasi, pendanaan))
+    if df_op.empty and df_inv.empty and df_pend.empty:
+        return None
+    return susun_arus_kas(df_op, df_inv, df_pend)
+
+
+def pipeline_bumdes(store):
+    # Jurnal -> Buku Besar -> Neraca Saldo -> tabel Laporan -> Laba/Rugi, Neraca, Arus Kas.
+    # Sumber: "jurnal" (engine Buku Besar), "bagan_akun", "periode_neraca", "modal_awal",
+    # dan "tabel:<nama>" untuk tabel yang bisa diedit di session_state.
+    pl = Pipeline()
+    pl.tahap("buku_besar", ["jurnal", "bagan_akun"], lambda bb, bagan: bb.ke_dict(bagan.nama))
+    pl.tahap("neraca_saldo", ["buku_besar", "periode_neraca"],
+             lambda buku_besar, periode: _neraca_dari_buku_besar(store, buku_besar, periode))
+    pl.tahap("hasil_neraca_saldo", ["tabel:neraca_saldo"], _hasil_neraca_saldo)
+    pl.tahap("laporan", ["tabel:neraca_saldo", "bagan_akun"], _laporan)
+    pl.tahap("labarugi", ["tabel:pendapatan", "tabel:beban"], _labarugi)
+    pl.tahap("neraca", ["tabel:aktiva_lancar", "tabel:aktiva_tetap", "tabel:kewajiban", "modal_awal", "labarugi"], _neraca_lap)
+    pl.tahap("arus_kas", ["tabel:arus_kas_operasi", "tabel:arus_kas_investasi", "tabel:arus_kas_pendanaan"], _arus_kas)
+    return pl
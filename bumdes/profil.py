@@ -0,0 +1,123 @@
+import contextlib
+import datetime
+import functools
+import json
+import logging
+import logging.handlers
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+# Dipakai bersama saat profiling mati: `with` tanpa biaya selain satu pengecekan flag
+_KOSONG = contextlib.nullcontext()
+
+_log = logging.getLogger("bumdes.profil")
+_log_lock = threading.Lock()
+
+
+def pasang_log(path, maks_bytes=1_000_000, cadangan=3):
+    # Satu handler per proses: satu baris JSON per rerun, file diputar per `maks_bytes`
+    with _log_lock:
+        if not _log.handlers:
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=maks_bytes, backupCount=cadangan, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _log.addHandler(handler)
+            _log.setLevel(logging.INFO)
+            _log.propagate = False
+
+
+def memori_frame(nilai):
+    # Memori (byte, deep) setiap DataFrame di mapping, mis. session_state
+    return {
+        str(k): int(v.memory_usage(deep=True).sum())
+        for k, v in list(nilai.items()) if isinstance(v, pd.DataFrame)
+    }
+
+
+class Profiler:
+    # Waktu per bagian (tab, grid, PDF, Styler) per rerun. Saat `aktif` False, bagian() &
+    # bungkus() langsung mengembalikan no-op / fungsi aslinya.
+    def __init__(self, maks_riwayat=50):
+        self.aktif = False
+        self.riwayat = deque(maxlen=maks_riwayat)
+        self._lock = threading.Lock()
+        self._rerun = None
+        self._kedalaman = 0
+        self.nomor = 0  # jumlah rerun tercatat sejak sesi dimulai
+
+    def mulai_rerun(self, jenis):
+        if not self.aktif:
+            return
+        with self._lock:
+            self._rerun = {
+                "waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+                "jenis": jenis, "mulai": time.perf_counter(), "bagian": [],
+            }
+
+    def selesai_rerun(self, memori=None):
+        with self._lock:
+            rerun, self._rerun = self._rerun, None
+        if rerun is None:
+            return
+        rerun["total"] = time.perf_counter() - rerun.pop("mulai")
+        if memori is not None:
+            rerun["memori"] = memori
+        with self._lock:
+            self.nomor += 1
+            rerun["nomor"] = self.nomor
+            self.riwayat.append(rerun)
+        if _log.handlers:
+            _log.info(json.dumps(rerun, default=str))
+
+    def bagian(self, nama):
+        if not self.aktif:
+            return _KOSONG
+        return self._ukur(nama)
+
+    @contextlib.contextmanager
+    def _ukur(self, nama):
+        # Bagian di luar rerun terbuka (fragment, unduhan PDF) menjadi catatan tersendiri
+        with self._lock:
+            sendiri = self._rerun is None and self._kedalaman == 0
+        if sendiri:
+            self.mulai_rerun(nama)
+        with self._lock:
+            self._kedalaman += 1
+            kedalaman = self._kedalaman
+        mulai = time.perf_counter()
+        try:
+            yield
+        finally:
+            lama = time.perf_counter() - mulai
+            with self._lock:
+                self._kedalaman -= 1
+                if self._rerun is not None:
+                    self._rerun["bagian"].append({"nama": nama, "detik": lama, "kedalaman": kedalaman})
+            if sendiri:
+                self.selesai_rerun()
+
+    def bungkus(self, nama, fungsi):
+        # Untuk fungsi yang dipanggil nanti (mis. data tombol unduh PDF)
+        if not self.aktif:
+            return fungsi
+
+        @functools.wraps(fungsi)
+        def diukur(*args, **kwargs):
+            with self.bagian(nama):
+                return fungsi(*args, **kwargs)
+        return diukur
+
+    def sejak(self, nomor):
+        return [r for r in list(self.riwayat) if r["nomor"] > nomor]
+
+    def ringkasan(self, reruns):
+        # Total per nama bagian (beberapa grid/Styler bisa bernama sama) dari satu/lebih rerun
+        df = pd.DataFrame([b for r in reruns for b in r["bagian"]], columns=["nama", "detik", "kedalaman"])
+        if df.empty:
+            return pd.DataFrame(columns=["Bagian", "Kali", "ms"])
+        grup = df.groupby("nama", sort=False)["detik"].agg(["size", "sum"])
+        return pd.DataFrame({
+            "Bagian": grup.index, "Kali": grup["size"].to_numpy(), "ms": (grup["sum"] * 1000).round(1).to_numpy()
+        }).sort_values("ms", ascending=False, ignore_index=True)
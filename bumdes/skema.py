@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+# dtype ringkas untuk tabel di session_state, ditentukan dari nama kolom:
+# rupiah int64 (tanpa pembulatan float), Ref/Akun categorical, Tanggal datetime64.
+# Database, builder laporan & PDF tetap menerima teks biasa (lihat ke_teks).
+KOLOM_KATEGORI = ["Ref", "Akun"]
+KOLOM_BULAT = ["id", "versi"]
+
+
+def jenis_kolom(kolom):
+    if "(Rp)" in kolom or kolom in KOLOM_BULAT:
+        return "rupiah"
+    if kolom in KOLOM_KATEGORI:
+        return "kategori"
+    if kolom == "Tanggal":
+        return "tanggal"
+    return None
+
+
+def ke_rupiah(nilai):
+    nilai = pd.Series(nilai)
+    if pd.api.types.is_integer_dtype(nilai) and not isinstance(nilai.dtype, pd.CategoricalDtype):
+        return nilai.astype("int64")
+    return pd.to_numeric(nilai, errors="coerce").fillna(0).round().astype("int64")
+
+
+def ke_kategori(nilai):
+    nilai = pd.Series(nilai)
+    if isinstance(nilai.dtype, pd.CategoricalDtype):
+        return nilai
+    return nilai.fillna("").astype(str).astype("category")
+
+
+def ke_tanggal(nilai):
+    # ISO (2025-03-14), format Indonesia (14/03/2025), atau datetime dari Excel -> datetime64;
+    # kosong/tidak valid -> NaT
+    nilai = pd.Series(nilai)
+    if pd.api.types.is_datetime64_dtype(nilai):
+        return nilai
+    teks = nilai.fillna("").astype(str).str.strip().str.slice(0, 10)
+    iso = pd.to_datetime(teks, errors="coerce", format="%Y-%m-%d")
+    lokal = pd.to_datetime(teks, errors="coerce", format="%d/%m/%Y")
+    return iso.fillna(lokal)
+
+
+_UBAH = {"rupiah": ke_rupiah, "kategori": ke_kategori, "tanggal": ke_tanggal}
+
+
+def terapkan_skema(df):
+    # Salinan df dengan dtype ringkas; kolom yang sudah ber-dtype benar tidak dikonversi ulang
+    hasil = df.copy(deep=False)
+    for col in df.columns:
+        jenis = jenis_kolom(col)
+        if jenis:
+            hasil[col] = _UBAH[jenis](df[col])
+    return hasil
+
+
+def siapkan_kategori(df, kolom, nilai):
+    # Kategori baru harus didaftarkan sebelum nilainya bisa ditulis ke kolom categorical
+    if isinstance(df[kolom].dtype, pd.CategoricalDtype):
+        baru = pd.Index(pd.Series(nilai).astype(str).unique()).difference(df[kolom].cat.categories)
+        if len(baru):
+            df[kolom] = df[kolom].cat.add_categories(baru)
+
+
+def tulis_baris(df, label, baru, kolom):
+    # Tulis kolom `baru` (DataFrame teks, mis. dari database) ke baris `label` di df, dtype df tetap
+    baru = terapkan_skema(baru[kolom])
+    for col in kolom:
+        siapkan_kategori(df, col, baru[col])
+        df.loc[label, col] = baru[col].to_numpy()
+
+
+def teks_tanggal(nilai):
+    # datetime64 -> "YYYY-MM-DD"; NaT -> ""
+    nilai = pd.Series(nilai)
+    teks = np.datetime_as_string(nilai.to_numpy(dtype="datetime64[D]"), unit="D")
+    return pd.Series(teks, index=nilai.index).where(nilai.notna(), "")
+
+
+def nilai_teks(nilai):
+    # Satu nilai ber-skema -> bentuk teks/angka di database
+    if isinstance(nilai, pd.Timestamp):
+        return nilai.strftime("%Y-%m-%d")
+    if nilai is pd.NaT:
+        return ""
+    return nilai
+
+
+def ke_teks(df):
+    # Tanggal & kolom categorical kembali menjadi teks biasa (grid, laporan, PDF, ekspor)
+    hasil = df.copy(deep=False)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_dtype(df[col]):
+            hasil[col] = teks_tanggal(df[col])
+        elif isinstance(df[col].dtype, pd.CategoricalDtype):
+            hasil[col] = df[col].astype(str)
+    return hasil
@@ -0,0 +1,355 @@
+import os
+import pathlib
+import sqlite3
+import threading
+
+import pandas as pd
+
+KOLOM_JURNAL = ["Tanggal", "Keterangan", "Ref", "Debit (Rp)", "Kredit (Rp)"]
+
+_SKEMA = """
+CREATE TABLE IF NOT EXISTS jurnal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tanggal TEXT NOT NULL DEFAULT '',
+    periode TEXT NOT NULL DEFAULT '',
+    keterangan TEXT NOT NULL DEFAULT '',
+    ref TEXT NOT NULL DEFAULT '',
+    debit INTEGER NOT NULL DEFAULT 0,
+    kredit INTEGER NOT NULL DEFAULT 0,
+    -- Optimistic concurrency: naik setiap kali baris diubah
+    versi INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_jurnal_tanggal ON jurnal (tanggal);
+CREATE INDEX IF NOT EXISTS idx_jurnal_ref ON jurnal (ref);
+CREATE INDEX IF NOT EXISTS idx_jurnal_periode ON jurnal (periode);
+-- Indeks penutup: agregasi per periode cukup membaca indeks, tidak menyentuh tabel
+CREATE INDEX IF NOT EXISTS idx_jurnal_periode_ref ON jurnal (periode, ref, debit, kredit);
+
+-- Tutup buku: saldo kumulatif per Ref sampai akhir periode yang ditutup
+CREATE TABLE IF NOT EXISTS periode_tutup (
+    periode TEXT PRIMARY KEY,
+    ditutup_pada TEXT NOT NULL DEFAULT (datetime('now'))
+);
+CREATE TABLE IF NOT EXISTS saldo_tutup (
+    periode TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    debit INTEGER NOT NULL DEFAULT 0,
+    kredit INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (periode, ref)
+);
+
+-- Periode yang sudah ditutup (dan semua periode sebelumnya) dikunci: penulisan yang mengubah
+-- saldonya ditolak. Untuk mengubahnya, periode harus dibuka kembali dulu (buka_periode).
+DROP TRIGGER IF EXISTS trg_jurnal_tambah_tutup;
+DROP TRIGGER IF EXISTS trg_jurnal_ubah_tutup;
+DROP TRIGGER IF EXISTS trg_jurnal_hapus_tutup;
+CREATE TRIGGER IF NOT EXISTS trg_jurnal_tambah_kunci BEFORE INSERT ON jurnal
+WHEN NEW.periode != '' AND NEW.ref != ''
+    AND NEW.periode <= (SELECT MAX(periode) FROM periode_tutup)
+BEGIN
+    SELECT RAISE(ABORT, 'periode ditutup');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_jurnal_ubah_kunci BEFORE UPDATE ON jurnal
+WHEN (OLD.periode IS NOT NEW.periode OR OLD.ref IS NOT NEW.ref
+        OR OLD.debit IS NOT NEW.debit OR OLD.kredit IS NOT NEW.kredit)
+    AND ((OLD.periode != '' AND OLD.ref != '' AND OLD.periode <= (SELECT MAX(periode) FROM periode_tutup))
+        OR (NEW.periode != '' AND NEW.ref != '' AND NEW.periode <= (SELECT MAX(periode) FROM periode_tutup)))
+BEGIN
+    SELECT RAISE(ABORT, 'periode ditutup');
+END;
+CREATE TRIGGER IF NOT EXISTS trg_jurnal_hapus_kunci BEFORE DELETE ON jurnal
+WHEN OLD.periode != '' AND OLD.ref != ''
+    AND OLD.periode <= (SELECT MAX(periode) FROM periode_tutup)
+BEGIN
+    SELECT RAISE(ABORT, 'periode ditutup');
+END;
+
+CREATE TABLE IF NOT EXISTS bagan_akun (
+    ref TEXT PRIMARY KEY,
+    nama_akun TEXT NOT NULL DEFAULT '',
+    kategori TEXT NOT NULL DEFAULT ''
+);
+"""
+
+
+def normalisasi_jurnal(df):
+    # Samakan tipe data hasil AgGrid (angka bisa kembali sebagai string/float)
+    hasil = pd.DataFrame(index=df.index)
+    hasil["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
+    for col in ["Tanggal", "Keterangan", "Ref"]:
+        hasil[col] = df[col].fillna("").astype(str).str.strip()
+    for col in ["Debit (Rp)", "Kredit (Rp)"]:
+        hasil[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).round().astype("int64")
+    return hasil
+
+
+def hitung_periode(tanggal):
+    # "2025-03-14" -> "2025-03"; tanggal tidak valid -> ""
+    parsed = pd.to_datetime(tanggal, errors="coerce", format="%Y-%m-%d")
+    # Format sudah pasti YYYY-MM-DD, jadi cukup potong string (jauh lebih cepat dari strftime)
+    return tanggal.astype(str).str.slice(0, 7).where(parsed.notna(), "")
+
+
+class JurnalStore:
+    def __init__(self, path, baca_saja=False):
+        # baca_saja: buka database yang sudah ada tanpa migrasi & tanpa menulis apa pun (mis. input batch)
+        self.path = path
+        self._lock = threading.Lock()
+        if baca_saja:
+            # Tanpa file -wal semua isi ada di file utama: immutable=1 tidak membuat -wal/-shm.
+            # Bila -wal ada (aplikasi sedang memakainya), mode=ro tetap membaca isinya.
+            opsi = "mode=ro" if os.path.exists(f"{path}-wal") else "mode=ro&immutable=1"
+            self._conn = sqlite3.connect(f"{pathlib.Path(path).resolve().as_uri()}?{opsi}", uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SKEMA)
+        # Database lama belum punya kolom versi (baca_saja: dianggap versi 1)
+        kolom = {r[1] for r in self._conn.execute("PRAGMA table_info(jurnal)")}
+        self._kolom_versi = "versi"
+        if "versi" not in kolom and baca_saja:
+            self._kolom_versi = "1"
+        elif "versi" not in kolom:
+            with self._conn:
+                self._conn.execute("ALTER TABLE jurnal ADD COLUMN versi INTEGER NOT NULL DEFAULT 1")
+        # Naik setiap ada penulisan; sesi lain memakainya untuk tahu datanya perlu dimuat ulang
+        self.revisi = 0
+
+    def _naikkan_revisi(self):
+        # (dipanggil di dalam lock)
+        self.revisi += 1
+
+    def _ke_dataframe(self, rows):
+        df = pd.DataFrame(rows, columns=["id"] + KOLOM_JURNAL + ["versi"])
+        for col in ["id", "Debit (Rp)", "Kredit (Rp)", "versi"]:
+            df[col] = df[col].astype("int64")
+        return df
+
+    def _muat_id(self, ids):
+        # (dipanggil di dalam lock)
+        rows = []
+        for i in range(0, len(ids), 500):
+            potong = ids[i:i + 500]
+            rows += self._conn.execute(
+                "SELECT id, tanggal, keterangan, ref, debit, kredit, versi FROM jurnal "
+                f"WHERE id IN ({','.join('?' * len(potong))})", potong
+            ).fetchall()
+        return self._ke_dataframe(rows).set_index("id", drop=False)
+
+    def muat(self, periode=None, tanpa_tanggal=True):
+        sql = f"SELECT id, tanggal, keterangan, ref, debit, kredit, {self._kolom_versi} FROM jurnal"
+        params = ()
+        if periode is not None:
+            # Baris tanpa tanggal valid ikut (untuk grid, agar bisa dilengkapi) kecuali tanpa_tanggal=False
+            sql += " WHERE periode = ?" + (" OR periode = ''" if tanpa_tanggal else "")
+            params = (periode,)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", params).fetchall()
+        return self._ke_dataframe(rows)
+
+    def _id_berikutnya(self):
+        # AUTOINCREMENT: id yang pernah dihapus tidak dipakai ulang
+        seq = self._conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'jurnal'"
+        ).fetchone()
+        maks = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM jurnal").fetchone()[0]
+        return max(seq[0] if seq else 0, maks) + 1
+
+    def daftar_periode(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT periode FROM jurnal WHERE periode != '' ORDER BY periode"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def agregat_akun(self, periode=None):
+        # Total debit/kredit per Ref; filter periode memakai indeks (periode, ref, ...)
+        kondisi = ["ref != ''"]
+        params = []
+        if periode is not None:
+            kondisi.append("periode = ?")
+            params.append(periode)
+        sql = (
+            "SELECT ref, SUM(debit), SUM(kredit) FROM jurnal WHERE "
+            + " AND ".join(kondisi)
+            + " GROUP BY ref ORDER BY ref"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        df = pd.DataFrame(rows, columns=["Ref", "debit", "kredit"]).set_index("Ref")
+        return df.astype("int64")
+
+    def _saldo_kumulatif(self, batas, inklusif=False):
+        # Snapshot tutup buku terakhir + mutasi periode terbuka sesudahnya, s.d. `batas`
+        # (dipanggil di dalam lock)
+        op = "<=" if inklusif else "<"
+        dasar = self._conn.execute(
+            f"SELECT COALESCE(MAX(periode), '') FROM periode_tutup WHERE periode {op} ?", (batas,)
+        ).fetchone()[0]
+        rows = self._conn.execute(
+            "SELECT ref, SUM(debit), SUM(kredit) FROM ("
+            " SELECT ref, debit, kredit FROM saldo_tutup WHERE periode = ?"
+            " UNION ALL"
+            f" SELECT ref, debit, kredit FROM jurnal WHERE ref != '' AND periode > ? AND periode {op} ?"
+            ") GROUP BY ref ORDER BY ref",
+            (dasar, dasar, batas),
+        ).fetchall()
+        return dasar, rows
+
+    def saldo_sebelum(self, periode):
+        # Saldo awal `periode`: tidak perlu mengagregasi ulang jurnal sejak awal jika ada tutup buku
+        with self._lock:
+            _, rows = self._saldo_kumulatif(periode)
+        df = pd.DataFrame(rows, columns=["Ref", "debit", "kredit"]).set_index("Ref")
+        return df.astype("int64")
+
+    def tutup_periode(self, periode):
+        # Bekukan saldo kumulatif s.d. akhir `periode` menjadi snapshot per Ref
+        with self._lock, self._conn:
+            self._naikkan_revisi()
+            _, rows = self._saldo_kumulatif(periode, inklusif=True)
+            self._conn.execute("DELETE FROM saldo_tutup WHERE periode = ?", (periode,))
+            self._conn.executemany(
+                "INSERT INTO saldo_tutup (periode, ref, debit, kredit) VALUES (?, ?, ?, ?)",
+                [(periode,) + tuple(r) for r in rows],
+            )
+            self._conn.execute("INSERT OR REPLACE INTO periode_tutup (periode) VALUES (?)", (periode,))
+        return len(rows)
+
+    def buka_periode(self, periode):
+        # Membuka kembali sebuah periode juga membuka semua periode sesudahnya
+        with self._lock, self._conn:
+            self._naikkan_revisi()
+            self._conn.execute("DELETE FROM saldo_tutup WHERE periode >= ?", (periode,))
+            n = self._conn.execute("DELETE FROM periode_tutup WHERE periode >= ?", (periode,)).rowcount
+        return n
+
+    def daftar_periode_tutup(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT periode FROM periode_tutup ORDER BY periode").fetchall()
+        return [r[0] for r in rows]
+
+    def jumlah_baris(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jurnal").fetchone()[0]
+
+    def _sisipkan(self, df):
+        # (dipanggil di dalam lock & transaksi)
+        df = df.copy()
+        if "id" not in df.columns:
+            df["id"] = pd.NA
+        df = normalisasi_jurnal(df)
+        df["periode"] = hitung_periode(df["Tanggal"])
+        records = list(zip(
+            df["Tanggal"], df["periode"], df["Keterangan"], df["Ref"],
+            df["Debit (Rp)"].tolist(), df["Kredit (Rp)"].tolist(),
+        ))
+        id_awal = self._id_berikutnya()
+        df["id"] = range(id_awal, id_awal + len(df))
+        self._conn.executemany(
+            "INSERT INTO jurnal (id, tanggal, periode, keterangan, ref, debit, kredit) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(i,) + r for i, r in zip(df["id"].tolist(), records)],
+        )
+        df["versi"] = 1
+        return df[["id"] + KOLOM_JURNAL + ["versi"]].astype({"id": "int64", "versi": "int64"})
+
+    def tambah(self, df):
+        # Sisipkan banyak baris sekaligus dalam satu transaksi
+        with self._lock, self._conn:
+            self._naikkan_revisi()
+            return self._sisipkan(df)
+
+    def tambah_bertahap(self, potongan):
+        # Sisipkan DataFrame satu per satu dari iterator, semuanya dalam satu transaksi:
+        # memori dibatasi ukuran potongan, dan impor gagal di tengah tidak meninggalkan sisa
+        jumlah = 0
+        with self._lock, self._conn:
+            self._naikkan_revisi()
+            for df in potongan:
+                if not df.empty:
+                    jumlah += len(self._sisipkan(df))
+        return jumlah
+
+    def tambah_kosong(self, n=1):
+        kosong = pd.DataFrame({
+            "Tanggal": [""] * n,
+            "Keterangan": [""] * n,
+            "Ref": [""] * n,
+            "Debit (Rp)": [0] * n,
+            "Kredit (Rp)": [0] * n,
+        })
+        return self.tambah(kosong)
+
+    def ubah_sel(self, perubahan):
+        # Optimistic concurrency per baris. perubahan: {id: (versi_dibaca, {kolom: (lama, baru)})}.
+        # Versi masih sama -> semua edit diterapkan. Versi sudah naik (baris diubah pengguna lain)
+        # -> digabung per kolom: kolom yang nilainya masih `lama` tetap diterapkan, kolom yang sudah
+        # diubah orang lain menjadi konflik dan nilai di database dipertahankan.
+        # Kembalikan (baris terbaru dari database, daftar konflik).
+        ids = [int(i) for i in perubahan]
+        konflik = []
+        with self._lock, self._conn:
+            sekarang = self._muat_id(ids)
+            diubah = []
+            for id_baris, (versi, kolom_ubah) in perubahan.items():
+                if id_baris not in sekarang.index:
+                    konflik.append({"id": id_baris, "Kolom": "", "Nilai Anda": "", "Nilai Sekarang": "(baris dihapus)"})
+                    continue
+                baris = sekarang.loc[id_baris]
+                nilai = {}
+                for kolom, (lama, baru) in kolom_ubah.items():
+                    kini = baris[kolom]
+                    if baris["versi"] == versi or kini == lama or kini == baru:
+                        nilai[kolom] = baru
+                    else:
+                        konflik.append({"id": id_baris, "Kolom": kolom, "Nilai Anda": baru, "Nilai Sekarang": kini})
+                if nilai:
+                    diubah.append(baris.to_dict() | nilai)
+            if diubah:
+                df = normalisasi_jurnal(pd.DataFrame(diubah))
+                df["periode"] = hitung_periode(df["Tanggal"])
+                id_diubah = df["id"].astype("int64").tolist()
+                records = zip(
+                    df["Tanggal"], df["periode"], df["Keterangan"], df["Ref"],
+                    df["Debit (Rp)"].tolist(), df["Kredit (Rp)"].tolist(),
+                    id_diubah, sekarang.loc[id_diubah, "versi"].tolist(),
+                )
+                for record in records:
+                    # WHERE versi = ?: penulis dari proses lain di antara baca & tulis tetap terdeteksi
+                    try:
+                        n = self._conn.execute(
+                            "UPDATE jurnal SET tanggal = ?, periode = ?, keterangan = ?, ref = ?, "
+                            "debit = ?, kredit = ?, versi = versi + 1 WHERE id = ? AND versi = ?",
+                            record,
+                        ).rowcount
+                    except sqlite3.IntegrityError:
+                        # Trigger kunci: baris (lama atau baru) ada di periode yang sudah ditutup
+                        konflik.append({"id": record[6], "Kolom": "", "Nilai Anda": "", "Nilai Sekarang": "(periode ditutup)"})
+                        continue
+                    if n == 0:
+                        konflik.append({"id": record[6], "Kolom": "", "Nilai Anda": "", "Nilai Sekarang": "(diubah bersamaan)"})
+                self._naikkan_revisi()
+            hasil = self._muat_id(ids)
+        return hasil.reset_index(drop=True), konflik
+
+    def muat_bagan_akun(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT ref, nama_akun, kategori FROM bagan_akun ORDER BY ref"
+            ).fetchall()
+        return pd.DataFrame(rows, columns=["Ref", "Nama Akun", "Kategori"])
+
+    def simpan_bagan_akun(self, df):
+        # Ganti seluruh bagan akun dalam satu transaksi
+        df = df.fillna("").astype(str)
+        df = df[df["Ref"].str.strip() != ""]
+        records = list(zip(df["Ref"].str.strip(), df["Nama Akun"].str.strip(), df["Kategori"].str.strip()))
+        with self._lock, self._conn:
+            self._naikkan_revisi()
+            self._conn.execute("DELETE FROM bagan_akun")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO bagan_akun (ref, nama_akun, kategori) VALUES (?, ?, ?)",
+                records,
+            )
+        return len(records)
@@ -0,0 +1,59 @@
+import glob
+import os
+import re
+import threading
+
+from bumdes.bagan_akun import BaganAkun
+from bumdes.buku_besar import BukuBesar
+from bumdes.store import JurnalStore
+
+UNIT_UTAMA = "utama"
+
+
+def nama_unit(teks):
+    # "Unit Wisata Desa" -> "unit-wisata-desa" (dipakai di nama file & URL)
+    return re.sub(r"[^a-z0-9]+", "-", str(teks).strip().lower()).strip("-")
+
+
+def path_unit(path_utama, unit):
+    # Unit utama memakai database lama; unit lain file bersebelahan: bumdes_<unit>.db
+    if unit == UNIT_UTAMA:
+        return path_utama
+    dasar, ext = os.path.splitext(path_utama)
+    return f"{dasar}_{unit}{ext or '.db'}"
+
+
+def daftar_unit(path_utama):
+    dasar, ext = os.path.splitext(path_utama)
+    ext = ext or ".db"
+    unit = [os.path.basename(p)[len(os.path.basename(dasar)) + 1:-len(ext)] for p in glob.glob(f"{glob.escape(dasar)}_*{ext}")]
+    return [UNIT_UTAMA] + sorted(u for u in unit if u and u == nama_unit(u))
+
+
+class Workspace:
+    # Satu unit BUMDes yang dipakai bersama oleh semua sesi: store, Buku Besar & bagan akun
+    # hanya ada sekali di server, bukan satu salinan per sesi browser
+    def __init__(self, unit, path):
+        self.unit = unit
+        self.store = JurnalStore(path)
+        self._lock = threading.Lock()
+        self.bagan_akun = BaganAkun(self.store.muat_bagan_akun())
+        self.buku_besar = BukuBesar.dari_jurnal(self.store.muat())
+
+    def ubah_sel(self, perubahan):
+        # Edit sel dengan cek versi baris (lihat JurnalStore.ubah_sel); Buku Besar bersama ikut diperbarui
+        with self._lock:
+            baris, konflik = self.store.ubah_sel(perubahan)
+            self.buku_besar.perbarui(baris)
+        return baris, konflik
+
+    def muat_ulang_buku_besar(self):
+        # Setelah perubahan massal (impor): posting ulang dari jurnal, objek diganti utuh
+        with self._lock:
+            self.buku_besar = BukuBesar.dari_jurnal(self.store.muat())
+
+    def simpan_bagan_akun(self, df):
+        with self._lock:
+            jumlah = self.store.simpan_bagan_akun(df)
+            self.bagan_akun = BaganAkun(self.store.muat_bagan_akun())
+        return jumlah
@@ -1,23 +1,123 @@
+import os
+import sqlite3
+from functools import partial, wraps
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-from fpdf import FPDF
-import tempfile
-from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
+from st_aggrid import AgGrid, DataReturnMode, GridOptionsBuilder, JsCode
+
+from bumdes.baris import OperasiBaris
+from bumdes.bagan_akun import KATEGORI, KOLOM_BAGAN
+from bumdes.ekspor import FORMAT_EKSPOR, ekspor_bytes, format_tersedia
+from bumdes.format import BULAN, format_rupiah_kolom
+from bumdes.impor import impor_jurnal
+from bumdes.laporan import susun_jurnal
+from bumdes.perubahan import JS_AMBIL_EDIT, LogPerubahan, baris_terpilih, edit_baru, terapkan_edit
+from bumdes.pipeline import TABEL_LAPORAN, pipeline_bumdes
+from bumdes.profil import Profiler, memori_frame, pasang_log
+from bumdes.skema import ke_teks, nilai_teks, terapkan_skema, tulis_baris
+from bumdes.pdf import buat_pdf, buat_pdf_ak, buat_pdf_labarugi, buat_pdf_neraca, buat_pdf_neraca_lap
+from bumdes.store import KOLOM_JURNAL
+from bumdes.workspace import UNIT_UTAMA, Workspace, daftar_unit, nama_unit, path_unit
 
 # === Konfigurasi dasar ===
 st.set_page_config(page_title="Administrasi BUMDes", layout="wide")
 st.title("📘 Sistem Akuntansi BUMDes")
 
+# === Workspace per unit BUMDes (SQLite, bertahan walau server restart) ===
+# Satu workspace per unit dipakai bersama semua sesi: staf unit yang sama bekerja di buku yang sama
+PATH_UTAMA = os.environ.get("BUMDES_DB", "bumdes.db")
+
+@st.cache_resource
+def ambil_workspace(unit):
+    return Workspace(unit, path_unit(PATH_UTAMA, unit))
+
+unit = nama_unit(st.query_params.get("unit", UNIT_UTAMA)) or UNIT_UTAMA
+# Ganti unit (lewat URL/sidebar): buang semua state milik unit sebelumnya
+if st.session_state.get("unit") != unit:
+    for k in list(st.session_state.keys()):
+        del st.session_state[k]
+    st.session_state.unit = unit
+
+ws = ambil_workspace(unit)
+store = ws.store
+
+with st.sidebar:
+    st.subheader("🏢 Unit BUMDes")
+    semua_unit = daftar_unit(PATH_UTAMA)
+    unit_dipilih = st.selectbox("Unit aktif", semua_unit, index=semua_unit.index(unit), key="pilih_unit")
+    unit_baru = nama_unit(st.text_input("Unit baru", key="unit_baru", placeholder="mis. Unit Wisata"))
+    if st.button("➕ Buat / Buka Unit", key="buat_unit", disabled=not unit_baru):
+        unit_dipilih = unit_baru
+    if unit_dipilih != unit:
+        st.query_params["unit"] = unit_dipilih
+        st.rerun()
+
+# === Profiling per rerun (opsional; saat mati hanya satu pengecekan flag per bagian) ===
+if "profiler" not in st.session_state:
+    st.session_state.profiler = Profiler()
+prof = st.session_state.profiler
+prof.aktif = st.sidebar.toggle("⏱️ Profiling", key="profil_aktif")
+if prof.aktif:
+    pasang_log(os.environ.get("BUMDES_PROFIL_LOG", "bumdes_profil.log"))
+prof.mulai_rerun("app")
+
+def diukur(nama):
+    # Dipasang di bawah @st.fragment agar rerun fragment saja juga terukur
+    def pasang(fungsi):
+        @wraps(fungsi)
+        def bungkus(*args, **kwargs):
+            with prof.bagian(nama):
+                return fungsi(*args, **kwargs)
+        return bungkus
+    return pasang
+
 # === Inisialisasi data awal ===
-if "data" not in st.session_state:
-    st.session_state.data = pd.DataFrame([
-        {"Tanggal": "", "Keterangan": "", "Ref": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}
-    ])
+# Tabel di session_state memakai dtype ringkas (bumdes.skema): rupiah int64, Ref/Akun categorical,
+# Tanggal datetime64; grid, laporan & PDF menerima salinan teksnya (ke_teks).
+# Jurnal (st.session_state.data) baru dimuat di tab Jurnal Umum, hanya partisi periode yang dipilih.
+
+# Pipeline Jurnal -> Buku Besar -> Neraca Saldo -> Laporan: tiap tahap di-cache per versi inputnya
+if "pipeline" not in st.session_state:
+    st.session_state.pipeline = pipeline_bumdes(store)
+
+def segarkan_buku_besar():
+    # Engine diperbarui in-place, jadi sumber "jurnal" ditandai berubah secara eksplisit
+    pl = st.session_state.pipeline
+    pl.sumber("bagan_akun", ws.bagan_akun)
+    pl.sumber("jurnal", ws.buku_besar)
+    pl.tandai("jurnal")
+    st.session_state.buku_besar = pl.ambil("buku_besar")
+
+def ikuti_workspace():
+    # Revisi store naik = ada penulisan (bisa dari sesi lain): muat ulang partisi jurnal
+    # yang tampil & hitung ulang turunan Buku Besar (engine-nya sendiri sudah dibagi bersama)
+    if st.session_state.get("revisi_ws") != store.revisi:
+        st.session_state.revisi_ws = store.revisi
+        st.session_state.jurnal_basi = True
+        segarkan_buku_besar()
+
+def tulis_sendiri(fungsi, *args):
+    # Penulisan dari sesi ini tidak perlu memuat ulang partisi, kecuali ada penulisan lain di antaranya
+    sebelum = store.revisi
+    hasil = fungsi(*args)
+    if st.session_state.get("revisi_ws") == sebelum and store.revisi - sebelum <= 1:
+        st.session_state.revisi_ws = store.revisi
+    return hasil
+
+ikuti_workspace()
+
+# Periode Neraca Saldo (juga periode Laporan Keuangan): default periode jurnal terakhir
+if "tahun_neraca" not in st.session_state:
+    periode_awal = (store.daftar_periode() or [pd.Timestamp.today().strftime("%Y-%m")])[-1]
+    st.session_state.tahun_neraca = int(periode_awal[:4])
+    st.session_state.bulan_neraca = (periode_awal[5:], BULAN[periode_awal[5:]])
 
 if "neraca_saldo" not in st.session_state:
-    st.session_state.neraca_saldo = pd.DataFrame([
+    st.session_state.neraca_saldo = terapkan_skema(pd.DataFrame([
         {"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}  # ← UBAH INI!
-    ])
+    ]))
 
 if "pendapatan" not in st.session_state:
     st.session_state.pendapatan = pd.DataFrame([
@@ -65,20 +165,116 @@ if "arus_kas_pendanaan" not in st.session_state:
         {"Aktivitas": "", "Jumlah (Rp)": 0}
     ])
 
-# === Fungsi format rupiah ===
-def format_rupiah(x):
-    try:
-        if x < 0:
-            return f"({abs(x):,.0f})".replace(",", ".")
-        return f"{x:,.0f}".replace(",", ".")
-    except Exception:
-        return x
+# Status per grid (sesi & nomor edit terakhir) dan riwayat edit sel
+if "status_grid" not in st.session_state:
+    st.session_state.status_grid = {}
+
+if "log_edit" not in st.session_state:
+    st.session_state.log_edit = LogPerubahan()
+
+# Operasi baris massal (tambah/hapus/urungkan) dan baris terpilih per tabel
+if "operasi_baris" not in st.session_state:
+    st.session_state.operasi_baris = OperasiBaris()
+
+if "baris_terpilih" not in st.session_state:
+    st.session_state.baris_terpilih = {}
+
+# === Unit tampilan (fragment) & dependensi datanya ===
+# Setiap tab/sub-tab adalah @st.fragment(key=...): widget di dalamnya hanya menjalankan ulang
+# unit itu, bukan seluruh app. Unit yang datanya dibaca unit lain ikut menjalankan ulang unit
+# hilirnya (urutan daftar = urutan eksekusi). "riwayat" selalu ikut agar log edit tetap segar.
+HILIR = {
+    "jurnal": ["buku_besar", "neraca_saldo", "laporan"],  # baris jurnal -> Buku Besar -> Neraca Saldo -> Laporan
+    "neraca_saldo": ["laporan"],  # tabel Neraca Saldo -> tabel Laporan Keuangan
+    "labarugi": ["neraca_lap"],   # laba bersih -> Laporan Neraca
+}
+
+def jalankan_ulang(unit, *_):
+    # Hanya dari callback widget (st.rerun dengan kunci fragment tidak sah di badan script)
+    st.rerun([unit] + HILIR.get(unit, []) + ["riwayat"] + (["profil"] if prof.aktif else []))
+
+def _operasi_baris(unit, fungsi, tabel, nama, *args):
+    fungsi(tabel, nama, *args)
+    st.session_state.pipeline.diedit.add(nama)
+    jalankan_ulang(unit)
+
+# === Pipeline laporan ===
+# Tabel yang bisa diedit ikut menjadi sumber pipeline ("tabel:<nama>")
+def pipeline():
+    # Pasok objek terbaru dari session_state; tahap baru dihitung saat diambil dan hanya bila inputnya berubah
+    pl = st.session_state.pipeline
+    pl.sumber("jurnal", ws.buku_besar)
+    pl.sumber("bagan_akun", ws.bagan_akun)
+    pl.sumber("modal_awal", st.session_state.modal_data["modal_awal"])
+    for nama in ["neraca_saldo"] + TABEL_LAPORAN:
+        pl.sumber(f"tabel:{nama}", st.session_state[nama])
+    return pl
+
+def sinkronkan(nama_state, tahap, isi, paksa=False):
+    # Salin hasil tahap ke tabel yang bisa diedit bila tahapnya berubah sejak salinan terakhir.
+    # Tabel yang sudah diedit manual tidak ditimpa kecuali paksa (tombol Reload, bisa di-urungkan).
+    pl = st.session_state.pipeline
+    if not paksa and (nama_state in pl.diedit or not pl.perlu_sinkron(nama_state, tahap)):
+        return False
+    st.session_state.operasi_baris.ganti(st.session_state, nama_state, terapkan_skema(isi), catat=paksa)
+    pl.sumber(f"tabel:{nama_state}", st.session_state[nama_state])
+    pl.sudah_sinkron(nama_state, tahap)
+    return True
+
+def sinkronkan_laporan(paksa=False):
+    # Tabel Laporan Keuangan & modal awal dari klasifikasi Neraca Saldo
+    pl = pipeline()
+    laporan = pl.ambil("laporan")
+    for nama_tabel in TABEL_LAPORAN:
+        sinkronkan(nama_tabel, "laporan", laporan[nama_tabel], paksa)
+    if paksa or ("modal_data" not in pl.diedit and pl.perlu_sinkron("modal_data", "laporan")):
+        st.session_state.modal_data = dict(laporan["modal_data"])
+        st.session_state.modal_awal_input = st.session_state.modal_data["modal_awal"]
+        pl.sudah_sinkron("modal_data", "laporan")
+
+def muat_ulang_laporan():
+    sinkronkan_laporan(paksa=True)
+    jalankan_ulang("laporan")
+
+def muat_ulang_neraca_saldo():
+    pl = pipeline()
+    sinkronkan("neraca_saldo", "neraca_saldo", pl.ambil("neraca_saldo"), paksa=True)
+    jalankan_ulang("neraca_saldo")
 
 # === Fungsi AgGrid ===
-def create_aggrid(df, key_suffix, height=400):
+def tampilkan_grid(df, grid_options, key, height=400, unit=None):
+    # Grid hanya mengirim daftar edit sel & baris terpilih (DataReturnMode.CUSTOM), bukan seluruh
+    # isi tabel; yang dikembalikan hanya edit yang belum diterapkan pada rerun sebelumnya
+    # Salinan dangkal berisi teks: AgGrid menambah kolom id baris ke DataFrame yang diberikan
+    # dan mengubah kolom datetime per sel lewat isoformat()
+    with prof.bagian(f"grid {key}"):
+        grid_response = AgGrid(
+            ke_teks(df),
+            gridOptions=grid_options,
+            update_on=["cellValueChanged", "selectionChanged"],
+            data_return_mode=DataReturnMode.CUSTOM,
+            custom_jscode_for_grid_return=JsCode(JS_AMBIL_EDIT),
+            fit_columns_on_grid_load=True,
+            allow_unsafe_jscode=True,
+            enable_enterprise_modules=False,
+            theme="streamlit",
+            height=height,
+            key=key,
+            callback=partial(jalankan_ulang, unit) if unit else None
+        )
+    return edit_baru(grid_response, st.session_state.status_grid.setdefault(key, {})), baris_terpilih(grid_response)
+
+def create_aggrid(df, key_suffix, height=400, kolom_pilihan=None, unit=None):
     gb = GridOptionsBuilder.from_dataframe(df)
     gb.configure_default_column(editable=True, resizable=True)
     gb.configure_grid_options(stopEditingWhenCellsLoseFocus=False)
+    # Baris dipilih lewat checkbox grid untuk dihapus massal (tanpa widget per baris)
+    gb.configure_selection("multiple", use_checkbox=True, header_checkbox=True)
+
+    # Dropdown untuk kolom dengan pilihan tetap (mis. Akun, Kategori)
+    for col, pilihan in (kolom_pilihan or {}).items():
+        if pilihan:
+            gb.configure_column(col, editable=True, cellEditor="agSelectCellEditor", cellEditorParams={"values": pilihan})
     
     for col in df.columns:
         if "(Rp)" in col:
@@ -86,20 +282,104 @@ def create_aggrid(df, key_suffix, height=400):
     
     grid_options = gb.build()
     
-    grid_response = AgGrid(
-        df,
-        gridOptions=grid_options,
-        update_mode=GridUpdateMode.VALUE_CHANGED,
-        fit_columns_on_grid_load=True,
-        allow_unsafe_jscode=True,
-        enable_enterprise_modules=False,
-        theme="streamlit",
-        height=height,
-        key=f"aggrid_{key_suffix}",
-        reload_data=False
+    return tampilkan_grid(df, grid_options, f"aggrid_{key_suffix}", height, unit)
+
+def edit_tabel(nama_state, key_suffix, height=400, kolom_pilihan=None, unit=None):
+    # Edit sel diterapkan langsung ke st.session_state[nama_state] (tanpa equals/copy seluruh tabel)
+    df = st.session_state[nama_state]
+    versi = st.session_state.operasi_baris.versi.get(nama_state, 0)
+    edit, pilih = create_aggrid(df, f"{key_suffix}_v{versi}", height, kolom_pilihan, unit)
+    label = {str(i): idx for i, idx in enumerate(df.index)}
+    ditolak = []
+    perubahan = terapkan_edit(df, edit, label, ditolak)
+    if ditolak:
+        # Nilai lama dipertahankan; grid dipasang ulang pada rerun berikutnya agar menampilkannya lagi
+        ops = st.session_state.operasi_baris
+        ops.versi[nama_state] = versi + 1
+        st.warning("⚠️ Edit ditolak, nilai lama dipertahankan: "
+                   + "; ".join(f"{kolom} = {nilai!r} ({pesan})" for _, kolom, nilai, pesan in ditolak))
+    st.session_state.log_edit.catat(nama_state, perubahan)
+    if perubahan:
+        # Diedit in-place: objeknya sama, jadi versi sumbernya dinaikkan manual
+        st.session_state.pipeline.tandai(f"tabel:{nama_state}")
+        st.session_state.pipeline.diedit.add(nama_state)
+    st.session_state.baris_terpilih[nama_state] = [label[p] for p in pilih if p in label]
+    return df
+
+def kontrol_baris(nama_state, kolom_isi, key, unit):
+    # Tambah/hapus baris massal & urungkan; dijalankan lewat on_click sebelum rerun berikutnya
+    ops = st.session_state.operasi_baris
+    terpilih = st.session_state.baris_terpilih.get(nama_state, [])
+    col_jumlah, col_tambah = st.columns([1, 2])
+    with col_jumlah:
+        jumlah = st.number_input("Jumlah baris", min_value=1, max_value=100, value=1, key=f"baris_jumlah_{key}", label_visibility="collapsed")
+    with col_tambah:
+        st.button(f"➕ Tambah {jumlah} Baris", key=f"baris_tambah_{key}", use_container_width=True,
+                  on_click=_operasi_baris, args=(unit, ops.tambah, st.session_state, nama_state, jumlah))
+    col_hapus, col_kosong, col_urungkan = st.columns(3)
+    with col_hapus:
+        st.button(f"🗑️ Hapus Terpilih ({len(terpilih)})", key=f"baris_hapus_{key}", use_container_width=True,
+                  on_click=_operasi_baris, args=(unit, ops.hapus, st.session_state, nama_state, terpilih), disabled=not terpilih)
+    with col_kosong:
+        st.button("🧹 Hapus Kosong", key=f"baris_kosong_{key}", use_container_width=True,
+                  on_click=_operasi_baris, args=(unit, ops.hapus_kosong, st.session_state, nama_state, kolom_isi))
+    with col_urungkan:
+        st.button("↩️ Urungkan", key=f"baris_urungkan_{key}", use_container_width=True,
+                  on_click=_operasi_baris, args=(unit, ops.urungkan, st.session_state, nama_state),
+                  disabled=not ops.bisa_urungkan(st.session_state, nama_state))
+
+# === Fungsi ekspor data (CSV/Parquet/Excel) ===
+def tombol_ekspor(df, nama_file, key, nama_sheet="Data"):
+    # Seperti PDF, file baru dibuat saat tombol diklik
+    col_format, col_tombol = st.columns([1, 2])
+    with col_format:
+        format_ekspor = st.selectbox("Format", format_tersedia(), key=f"format_{key}", label_visibility="collapsed")
+    ekstensi, mime = FORMAT_EKSPOR[format_ekspor]
+    with col_tombol:
+        st.download_button(
+            f"📤 Ekspor {format_ekspor}",
+            data=partial(ekspor_bytes, df, format_ekspor, nama_sheet),
+            file_name=f"{nama_file}.{ekstensi}",
+            mime=mime,
+            on_click="ignore",
+            key=f"ekspor_{key}",
+            use_container_width=True
+        )
+
+# === Fungsi tampilan laporan ===
+# Di atas batas ini Styler terlalu berat; laporan ditampilkan sebagai teks terformat biasa
+BATAS_STYLER = 5000
+
+@diukur("tabel laporan (Styler)")
+def tampilkan_laporan(df, kolom_angka, kolom_kiri=None, hide_index=True):
+    # Kolom "Tebal" dari builder laporan (jika ada) dipakai sebagai mask, lalu disembunyikan
+    if "Tebal" in df.columns:
+        tebal = df["Tebal"].to_numpy(dtype=bool)
+        df_tampil = df.drop(columns="Tebal")
+    else:
+        tebal = np.zeros(len(df), dtype=bool)
+        df_tampil = df
+
+    # Angka diformat sekali per kolom (ter-vektorisasi), bukan per sel oleh Styler
+    df_tampil = df_tampil.copy()
+    for col in kolom_angka:
+        df_tampil[col] = format_rupiah_kolom(df_tampil[col]).astype(str)
+    rata_kanan = {col: st.column_config.TextColumn(alignment="right") for col in kolom_angka}
+
+    if len(df_tampil) > BATAS_STYLER:
+        st.dataframe(df_tampil, use_container_width=True, hide_index=hide_index, column_config=rata_kanan)
+        return
+
+    gaya = pd.DataFrame(
+        np.broadcast_to(np.where(tebal, "font-weight: bold", "")[:, None], df_tampil.shape),
+        index=df_tampil.index,
+        columns=df_tampil.columns
     )
-    
-    return pd.DataFrame(grid_response["data"])
+    styler = df_tampil.style.apply(lambda _: gaya, axis=None)
+    if kolom_kiri:
+        styler = styler.set_properties(**{'text-align': 'left'}, subset=kolom_kiri)
+        styler = styler.set_properties(**{'text-align': 'right'}, subset=kolom_angka)
+    st.dataframe(styler, use_container_width=True, hide_index=hide_index, column_config=rata_kanan)
 
 # === Styling ===
 st.markdown("""
@@ -132,114 +412,205 @@ tab1, tab2, tab3, tab4 = st.tabs([
 # ========================================
 # TAB 1: JURNAL UMUM
 # ========================================
-with tab1:
+@st.fragment(key="jurnal")
+@diukur("tab Jurnal Umum")
+def tab_jurnal_umum():
     st.header("🧾 Jurnal Umum")
     st.info("💡 Tekan Enter sekali untuk menyimpan perubahan otomatis.")
+    ikuti_workspace()
+
+    # Sesi hanya memegang satu periode (partisi) jurnal, default periode terakhir; jurnal lengkap
+    # tidak pernah disalin ke sesi (Buku Besar & saldo dibaca dari workspace bersama).
+    # "" = baris tanpa tanggal valid (yang juga ikut di setiap periode agar bisa dilengkapi)
+    periode_jurnal = st.selectbox(
+        "Tampilkan Periode",
+        options=store.daftar_periode()[::-1] or [""],
+        format_func=lambda p: f"{BULAN[p[5:]]} {p[:4]}" if p else "Belum bertanggal",
+        key="periode_jurnal"
+    )
+    periode_tutup = store.daftar_periode_tutup()
+    if periode_jurnal and periode_tutup and periode_jurnal <= periode_tutup[-1]:
+        st.caption("🔒 Periode ini sudah ditutup: perubahan Tanggal/Ref/Debit/Kredit ditolak sampai dibuka kembali di tab ⚖️ Neraca Saldo.")
+    ganti_periode = st.session_state.get("periode_jurnal_aktif") != periode_jurnal
+    if ganti_periode or st.session_state.pop("jurnal_basi", False):
+        st.session_state.data = terapkan_skema(store.muat(periode_jurnal))
+        if st.session_state.data.empty:
+            st.session_state.data = terapkan_skema(tulis_sendiri(store.tambah_kosong, 1))
+    if ganti_periode:
+        st.session_state.periode_jurnal_aktif = periode_jurnal
+        st.session_state.halaman_jurnal = 1
+
+    # Impor massal dari CSV/Excel: dibaca & divalidasi per chunk, ditulis dalam satu transaksi
+    with st.expander("📂 Impor Jurnal dari CSV/Excel"):
+        st.caption("Kolom: Tanggal (YYYY-MM-DD atau DD/MM/YYYY), Keterangan, Ref, Debit (Rp), Kredit (Rp)")
+        file_impor = st.file_uploader("Pilih file", type=["csv", "xlsx"], key="file_impor_jurnal")
+        cek_bagan = st.checkbox("Tolak Ref yang tidak ada di Bagan Akun", value=False, key="impor_cek_bagan",
+                                disabled=not ws.bagan_akun.nama)
+        if file_impor is not None and st.button("📥 Impor", key="impor_jurnal"):
+            try:
+                hasil_impor = impor_jurnal(
+                    store, file_impor, file_impor.name,
+                    refs_dikenal=ws.bagan_akun.nama.keys() if cek_bagan else None
+                )
+            except (ValueError, ImportError) as e:
+                st.error(f"❌ Impor gagal: {e}")
+            except sqlite3.IntegrityError:
+                # Periode ditutup sesi lain di tengah impor: trigger kunci membatalkan seluruh transaksi
+                st.error("❌ Impor gagal: sebagian baris jatuh di periode yang baru saja ditutup. Tidak ada baris yang disimpan; coba impor lagi.")
+            else:
+                # Jurnal & Buku Besar dimuat ulang sekali setelah impor
+                ws.muat_ulang_buku_besar()
+                segarkan_buku_besar()
+                st.session_state.periode_jurnal_aktif = None
+                st.session_state.hasil_impor = hasil_impor
+                st.rerun()
+        if "hasil_impor" in st.session_state:
+            hasil_impor = st.session_state.hasil_impor
+            st.success(f"✅ {hasil_impor['diterima']:,} baris diimpor, {hasil_impor['ditolak']:,} baris ditolak.")
+            if hasil_impor["ditolak"]:
+                st.dataframe(hasil_impor["contoh_ditolak"], hide_index=True, use_container_width=True)
+
+    # Grid hanya menerima satu halaman; data lengkap tetap di server (session_state)
+    col_ukuran, col_halaman = st.columns(2)
+    with col_ukuran:
+        ukuran_halaman = st.selectbox("Baris per halaman", [50, 100, 250, 500], index=1, key="ukuran_halaman_jurnal")
+    jumlah_halaman = max(1, -(-len(st.session_state.data) // ukuran_halaman))
 
     # Tombol tambah baris untuk Jurnal Umum
     if st.button("➕ Tambah Baris Jurnal", key="tambah_jurnal"):
-        new_row = pd.DataFrame([{"Tanggal": "", "Keterangan": "", "Ref": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-        st.session_state.data = pd.concat([st.session_state.data, new_row], ignore_index=True)
+        # Hanya baris baru yang dikonversi ke skema; tabel sesi cukup ditambah satu baris
+        new_row = terapkan_skema(tulis_sendiri(store.tambah_kosong, 1))
+        st.session_state.operasi_baris.tambah(st.session_state, "data", isi=new_row, catat=False)
+        # Langsung ke halaman terakhir, tempat baris baru berada
+        st.session_state.halaman_jurnal = -(-len(st.session_state.data) // ukuran_halaman)
         st.rerun()
 
-    gb = GridOptionsBuilder.from_dataframe(st.session_state.data)
+    if st.session_state.get("halaman_jurnal", 1) > jumlah_halaman:
+        st.session_state.halaman_jurnal = jumlah_halaman
+    with col_halaman:
+        halaman = st.number_input(f"Halaman (dari {jumlah_halaman})", min_value=1, max_value=jumlah_halaman, step=1, key="halaman_jurnal")
+    awal = (halaman - 1) * ukuran_halaman
+    data_halaman = ke_teks(st.session_state.data.iloc[awal:awal + ukuran_halaman])
+    st.caption(f"Baris {awal + 1}–{awal + len(data_halaman)} dari {len(st.session_state.data):,}")
+
+    gb = GridOptionsBuilder.from_dataframe(data_halaman)
     gb.configure_default_column(editable=True, resizable=True)
     gb.configure_grid_options(stopEditingWhenCellsLoseFocus=False)
+    gb.configure_column("id", hide=True, editable=False)
+    gb.configure_column("versi", hide=True, editable=False)
     gb.configure_column("Tanggal", header_name="Tanggal (YYYY-MM-DD)")
     gb.configure_column("Keterangan", header_name="Keterangan")
     gb.configure_column("Ref", header_name="Ref (contoh: 101)")
     gb.configure_column("Debit (Rp)", type=["numericColumn"], valueFormatter="value ? value.toLocaleString() : ''")
     gb.configure_column("Kredit (Rp)", type=["numericColumn"], valueFormatter="value ? value.toLocaleString() : ''")
 
-    grid_options = gb.build()
-
-    grid_response = AgGrid(
-        st.session_state.data,
-        gridOptions=grid_options,
-        update_mode=GridUpdateMode.VALUE_CHANGED,
-        fit_columns_on_grid_load=True,
-        allow_unsafe_jscode=True,
-        enable_enterprise_modules=False,
-        theme="streamlit",
-        height=320,
-        key="aggrid_jurnal",
-        reload_data=False
-    )
+    # Node grid diberi id = id baris jurnal agar edit selalu menunjuk baris yang benar
+    gb.configure_grid_options(getRowId=JsCode("function(params) { return String(params.data.id); }"))
 
-    new_df = pd.DataFrame(grid_response["data"])
-    if not new_df.equals(st.session_state.data):
-        st.session_state.data = new_df.copy()
+    grid_options = gb.build()
 
-    df_clean = new_df[new_df["Keterangan"].astype(str).str.strip() != ""]
+    kunci_grid = f"aggrid_jurnal_{periode_jurnal}_{halaman}_{ukuran_halaman}_v{st.session_state.get('versi_grid_jurnal', 0)}"
+    edit, _ = tampilkan_grid(data_halaman, grid_options, kunci_grid, height=320, unit="jurnal")
+    ditolak = []
+    perubahan = terapkan_edit(st.session_state.data, edit, dict(zip(data_halaman["id"].astype(str), data_halaman.index)), ditolak)
+    if edit:
+        st.session_state.edit_ditolak_jurnal = ditolak
+        if ditolak:
+            # Nilai lama dipertahankan; grid dipasang ulang pada rerun berikutnya agar menampilkannya lagi
+            st.session_state.versi_grid_jurnal = st.session_state.get("versi_grid_jurnal", 0) + 1
+    # Simpan ke database hanya sel yang berubah, dengan cek versi baris (optimistic concurrency)
+    if perubahan:
+        st.session_state.log_edit.catat("jurnal", perubahan)
+        data = st.session_state.data
+        kumpulan = {}
+        for idx, kolom, lama, baru in perubahan:
+            _, kolom_ubah = kumpulan.setdefault(int(data.at[idx, "id"]), (int(data.at[idx, "versi"]), {}))
+            # Nilai dikirim dalam bentuk database (Tanggal sebagai teks)
+            kolom_ubah[kolom] = (kolom_ubah.get(kolom, (nilai_teks(lama),))[0], nilai_teks(baru))
+        baris_terbaru, st.session_state.konflik_jurnal = tulis_sendiri(ws.ubah_sel, kumpulan)
+        # Nilai & versi dari database: hasil gabungan dengan edit pengguna lain, atau nilai yang menang saat konflik
+        label = pd.Series(data.index, index=data["id"]).reindex(baris_terbaru["id"]).to_numpy()
+        tulis_baris(data, label, baris_terbaru, KOLOM_JURNAL + ["versi"])
+        if st.session_state.konflik_jurnal:
+            # Grid masih menampilkan nilai yang ditolak: pasang ulang agar nilai database yang tampil
+            st.session_state.versi_grid_jurnal = st.session_state.get("versi_grid_jurnal", 0) + 1
+        segarkan_buku_besar()
+    if st.session_state.get("konflik_jurnal"):
+        st.warning(f"⚠️ {len(st.session_state.konflik_jurnal)} edit tidak tersimpan (bentrok dengan pengguna lain atau periode sudah ditutup); nilai di database dipertahankan.")
+        st.dataframe(pd.DataFrame(st.session_state.konflik_jurnal).astype(str), hide_index=True, use_container_width=True)
+    if st.session_state.get("edit_ditolak_jurnal"):
+        st.warning("⚠️ Edit berikut ditolak dan nilai lama dipertahankan. Format tanggal: YYYY-MM-DD atau DD/MM/YYYY; Debit/Kredit: angka tanpa titik ribuan.")
+        st.dataframe(pd.DataFrame(st.session_state.edit_ditolak_jurnal, columns=["Baris", "Kolom", "Nilai", "Alasan"]).astype(str),
+                     hide_index=True, use_container_width=True)
+
+    data_jurnal = st.session_state.data
+    df_clean = ke_teks(data_jurnal[data_jurnal["Keterangan"].astype(str).str.strip() != ""][KOLOM_JURNAL])
 
     if not df_clean.empty:
-        total_debit = df_clean["Debit (Rp)"].sum()
-        total_kredit = df_clean["Kredit (Rp)"].sum()
-
-        total_row = pd.DataFrame({
-            "Tanggal": [""],
-            "Keterangan": ["TOTAL"],
-            "Ref": [""],
-            "Debit (Rp)": [total_debit],
-            "Kredit (Rp)": [total_kredit],
-        })
-        df_final = pd.concat([df_clean, total_row], ignore_index=True)
+        df_final = susun_jurnal(df_clean)
 
         st.write("### 📊 Hasil Jurnal")
         df_final_display = df_final.copy()
         df_final_display.index = range(1, len(df_final_display) + 1)
         df_final_display.index.name = "No"
         
-        st.dataframe(df_final_display.style.format({
-            "Debit (Rp)": format_rupiah,
-            "Kredit (Rp)": format_rupiah
-        }))
-
-        def buat_pdf(df):
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-            pdf.cell(200, 10, txt="Jurnal Umum BUMDes", ln=True, align="C")
-            pdf.ln(8)
-
-            col_width = 190 / len(df.columns)
-            for col in df.columns:
-                pdf.cell(col_width, 10, col, border=1, align="C")
-            pdf.ln()
-
-            pdf.set_font("Arial", size=10)
-            for _, row in df.iterrows():
-                for item in row:
-                    pdf.cell(col_width, 8, str(item), border=1, align="C")
-                pdf.ln()
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                pdf.output(tmp.name)
-                tmp.seek(0)
-                return tmp.read()
-
-        pdf_data = buat_pdf(df_final)
+        tampilkan_laporan(df_final_display, ["Debit (Rp)", "Kredit (Rp)"], hide_index=False)
+
+        # PDF baru dibuat saat tombol diklik, bukan di setiap rerun; nama file sama dengan bumdes.engine
+        nama_file_jurnal = f"jurnal_umum_{periode_jurnal[5:]}_{periode_jurnal[:4]}" if periode_jurnal else "jurnal_umum"
         st.download_button(
             "📥 Download PDF",
-            data=pdf_data,
-            file_name="jurnal_umum.pdf",
+            data=prof.bungkus("pdf jurnal", partial(buat_pdf, df_clean)),
+            file_name=f"{nama_file_jurnal}.pdf",
             mime="application/pdf",
+            on_click="ignore",
             use_container_width=True
         )
+        tombol_ekspor(df_clean, nama_file_jurnal, "jurnal", "Jurnal Umum")
     else:
         st.warning("Belum ada data valid di tabel.")
 
+with tab1:
+    tab_jurnal_umum()
+
 # ========================================
 # TAB 2: BUKU BESAR
 # ========================================
-with tab2:
+@st.fragment(key="buku_besar")
+@diukur("tab Buku Besar")
+def tab_buku_besar():
     st.header("📚 Buku Besar")
-    st.info("Fitur ini sedang dalam pengembangan 🚧")
+    st.info("💡 Buku Besar diposting otomatis dari Jurnal Umum berdasarkan kolom Ref.")
+
+    bb = ws.buku_besar
+    df_ringkasan = bb.ringkasan(ws.bagan_akun.nama)
+
+    if not df_ringkasan.empty:
+        st.write("### 📊 Ringkasan Saldo Akun")
+        tampilkan_laporan(df_ringkasan, ["Debit (Rp)", "Kredit (Rp)", "Saldo (Rp)"])
+
+        pilihan_akun = {
+            f"{ref} - {data['nama_akun']}": ref for ref, data in st.session_state.buku_besar.items()
+        }
+        akun_bb = pilihan_akun[st.selectbox("Pilih Akun", options=list(pilihan_akun), key="akun_buku_besar")]
+
+        st.write(f"### 📒 Mutasi Akun {akun_bb}")
+        df_mutasi = bb.mutasi(akun_bb)
+        df_mutasi.index = range(1, len(df_mutasi) + 1)
+        df_mutasi.index.name = "No"
+        tampilkan_laporan(df_mutasi, ["Debit (Rp)", "Kredit (Rp)", "Saldo (Rp)"], hide_index=False)
+    else:
+        st.warning("Belum ada transaksi dengan Ref di Jurnal Umum.")
+
+with tab2:
+    tab_buku_besar()
 
 # ========================================
 # TAB 3: NERACA SALDO (REVISI LENGKAP)
 # ========================================
-with tab3:
+@st.fragment(key="neraca_saldo")
+@diukur("tab Neraca Saldo")
+def tab_neraca_saldo():
     st.header("💵 Neraca Saldo BUMDes")
     
     # --- Selector Periode ---
@@ -262,7 +633,9 @@ with tab3:
                 ("10", "Oktober"), ("11", "November"), ("12", "Desember")
             ],
             format_func=lambda x: x[1],
-            key="bulan_neraca"
+            key="bulan_neraca",
+            on_change=jalankan_ulang,
+            args=("neraca_saldo",)
         )[0]
     
     with col2:
@@ -270,94 +643,75 @@ with tab3:
             "Tahun", 
             min_value=2000, 
             max_value=2100, 
-            value=2025,
             step=1,
-            key="tahun_neraca"
+            key="tahun_neraca",
+            on_change=jalankan_ulang,
+            args=("neraca_saldo",)
         )
     
     st.subheader(f"Periode: {bulan_dict[bulan_neraca]} {tahun_neraca}")
     
-    st.info("💡 Masukkan data saldo akhir dari setiap akun di Buku Besar. Klik 'Tambah Baris' untuk menambah data baru.")
+    st.info("💡 Tabel terisi otomatis dari saldo akhir setiap akun di Buku Besar. Anda tetap bisa mengedit atau menambah baris.")
 
-    # Counter untuk force refresh
-    if "neraca_refresh_counter" not in st.session_state:
-        st.session_state.neraca_refresh_counter = 0
-    
     # --- FITUR BARU: Auto-populate dari Buku Besar ---
-    if st.button("🔄 Ambil Data dari Buku Besar", key="load_from_bukubesar"):
-        if "buku_besar" in st.session_state and st.session_state.buku_besar:
-            # Clear data lama (tanpa menghapus data yang sudah di-edit manual)
-            # Hanya tambahkan akun yang belum ada
-            
-            existing_akun = set(st.session_state.neraca_saldo["Akun"].astype(str).str.strip().tolist())
-            
-            for akun_no, akun_data in st.session_state.buku_besar.items():
-                nama_akun = akun_data.get("nama_akun", f"Akun {akun_no}")
-                
-                # Hanya tambahkan jika akun belum ada
-                if nama_akun not in existing_akun:
-                    saldo_debit = akun_data.get("debit", 0)
-                    saldo_kredit = akun_data.get("kredit", 0)
-                    
-                    # Tentukan posisi (Debit atau Kredit)
-                    # Aset dan Beban di Debit, Modal dan Pendapatan di Kredit
-                    if saldo_debit > saldo_kredit:
-                        new_row = pd.DataFrame([{
-                            "Ref": akun_no,
-                            "Akun": nama_akun,
-                            "Debit (Rp)": saldo_debit - saldo_kredit,
-                            "Kredit (Rp)": 0
-                        }])
-                    else:
-                        new_row = pd.DataFrame([{
-                            "Ref": akun_no,
-                            "Akun": nama_akun,
-                            "Debit (Rp)": 0,
-                            "Kredit (Rp)": saldo_kredit - saldo_debit
-                        }])
-                    
-                    st.session_state.neraca_saldo = pd.concat([st.session_state.neraca_saldo, new_row], ignore_index=True)
-            
-            st.session_state.neraca_refresh_counter += 1
-            st.success("✅ Data berhasil diambil dari Buku Besar!")
-            st.rerun()
-        else:
-            st.warning("⚠️ Belum ada data di Buku Besar. Silakan isi Jurnal Umum dan cek Buku Besar terlebih dahulu.")
-    
-    # Tombol kontrol
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        if st.button("➕ Tambah 1 Baris", key="tambah_neraca_1", use_container_width=True):
-            new_row = pd.DataFrame([{"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-            st.session_state.neraca_saldo = pd.concat([st.session_state.neraca_saldo, new_row], ignore_index=True)
-            st.session_state.neraca_refresh_counter += 1
+    periode_neraca = f"{tahun_neraca}-{bulan_neraca}"
+    periode_tutup = store.daftar_periode_tutup()
+    tutup_sebelumnya = [p for p in periode_tutup if p < periode_neraca]
+    if tutup_sebelumnya:
+        p = tutup_sebelumnya[-1]
+        st.caption(f"Saldo akun = saldo tutup buku {BULAN[p[5:]]} {p[:4]} + mutasi periode terbuka sampai periode terpilih.")
+    else:
+        st.caption("Saldo akun = saldo awal (akumulasi periode sebelumnya) + mutasi periode terpilih.")
+
+    # --- Tutup Buku: bekukan saldo periode ini sebagai saldo awal periode berikutnya ---
+    col_tutup1, col_tutup2 = st.columns(2)
+    with col_tutup1:
+        if periode_neraca in periode_tutup:
+            st.success(f"🔒 Periode {bulan_dict[bulan_neraca]} {tahun_neraca} sudah ditutup.")
+        elif st.button("🔒 Tutup Buku Periode Ini", key="tutup_periode", use_container_width=True):
+            jumlah_akun = store.tutup_periode(periode_neraca)
+            st.success(f"✅ Periode ditutup: saldo {jumlah_akun} akun dibekukan.")
             st.rerun()
-    
-    with col2:
-        if st.button("➕➕ Tambah 5 Baris", key="tambah_neraca_5", use_container_width=True):
-            new_rows = pd.DataFrame([
-                {"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0},
-                {"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0},
-                {"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0},
-                {"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0},
-                {"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}
-            ])
-            st.session_state.neraca_saldo = pd.concat([st.session_state.neraca_saldo, new_rows], ignore_index=True)
-            st.session_state.neraca_refresh_counter += 1
+    with col_tutup2:
+        if periode_neraca in periode_tutup and st.button("🔓 Buka Kembali", key="buka_periode", use_container_width=True):
+            store.buka_periode(periode_neraca)
             st.rerun()
-    
-    with col3:
-        if st.button("🗑️ Hapus Kosong", key="hapus_neraca_kosong", use_container_width=True):
-            st.session_state.neraca_saldo = st.session_state.neraca_saldo[
-                st.session_state.neraca_saldo["Akun"].astype(str).str.strip() != ""
-            ].reset_index(drop=True)
-            
-            if len(st.session_state.neraca_saldo) == 0:
-                st.session_state.neraca_saldo = pd.DataFrame([
-                    {"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}
-                ])
-            st.session_state.neraca_refresh_counter += 1
+    if periode_tutup:
+        st.caption("Jurnal di periode yang sudah ditutup dan sebelumnya dikunci: perubahan saldonya ditolak sampai periode dibuka kembali.")
+
+    # Tabel mengikuti Buku Besar otomatis selama belum diedit manual
+    pl = pipeline()
+    pl.sumber("periode_neraca", periode_neraca)
+    sinkronkan("neraca_saldo", "neraca_saldo", pl.ambil("neraca_saldo"))
+    if "neraca_saldo" in pl.diedit and pl.perlu_sinkron("neraca_saldo", "neraca_saldo"):
+        st.caption("✏️ Tabel sudah diedit manual dan tidak diperbarui otomatis dari Buku Besar.")
+    st.button("🔄 Ambil Data dari Buku Besar", key="load_from_bukubesar", on_click=muat_ulang_neraca_saldo)
+
+    # --- Bagan Akun (Chart of Accounts) ---
+    with st.expander("📒 Bagan Akun", expanded=False):
+        st.caption(
+            "Kategori kosong = otomatis dari nomor Ref: "
+            "100-119 Aktiva Lancar, 120-199 Aktiva Tetap, 200-299 Kewajiban, "
+            "300-399 Modal, 400-499 Pendapatan, 500-599 Beban."
+        )
+        df_bagan = ws.bagan_akun.ke_dataframe()
+        if df_bagan.empty:
+            df_bagan = pd.DataFrame([{"Ref": "", "Nama Akun": "", "Kategori": ""}])
+        if "bagan_refresh" not in st.session_state:
+            st.session_state.bagan_refresh = 0
+
+        if "bagan_akun_draft" not in st.session_state:
+            st.session_state.bagan_akun_draft = df_bagan[KOLOM_BAGAN].copy()
+        edit_tabel("bagan_akun_draft", f"bagan_{st.session_state.bagan_refresh}", height=220,
+                   kolom_pilihan={"Kategori": [""] + KATEGORI}, unit="neraca_saldo")
+        kontrol_baris("bagan_akun_draft", "Ref", "bagan", "neraca_saldo")
+
+        if st.button("💾 Simpan Bagan Akun", key="simpan_bagan", use_container_width=True):
+            ws.simpan_bagan_akun(st.session_state.bagan_akun_draft)
+            del st.session_state.bagan_akun_draft
+            segarkan_buku_besar()
+            st.session_state.bagan_refresh += 1
+            st.success("✅ Bagan akun disimpan!")
             st.rerun()
 
     # Info counter
@@ -365,302 +719,67 @@ with tab3:
     filled_rows = len(st.session_state.neraca_saldo[st.session_state.neraca_saldo["Akun"].astype(str).str.strip() != ""])
     st.caption(f"📊 Total Baris: {total_rows} | Terisi: {filled_rows} | Kosong: {total_rows - filled_rows}")
 
-    # --- Sistem Penghapusan dengan Checkbox ---
-    df_terisi = st.session_state.neraca_saldo[st.session_state.neraca_saldo["Akun"].astype(str).str.strip() != ""]
-    
-    if len(df_terisi) > 0:
-        with st.expander("🗑️ Hapus Baris Tertentu", expanded=False):
-            st.write("**Pilih baris yang ingin dihapus:**")
-            
-            rows_to_delete = []
-            
-            for idx in df_terisi.index:
-                row = df_terisi.loc[idx]
-                col_check, col_info = st.columns([1, 9])
-                
-                with col_check:
-                    if st.checkbox("", key=f"check_del_{idx}_{st.session_state.neraca_refresh_counter}"):
-                        rows_to_delete.append(idx)
-                
-                with col_info:
-                    st.text(f"Ref: {row['Ref']} | {row['Akun']} | Debit: {format_rupiah(row['Debit (Rp)'])} | Kredit: {format_rupiah(row['Kredit (Rp)'])}")
-            
-            if rows_to_delete:
-                if st.button(f"🗑️ Hapus {len(rows_to_delete)} Baris", key="confirm_delete", use_container_width=True):
-                    st.session_state.neraca_saldo = st.session_state.neraca_saldo.drop(rows_to_delete).reset_index(drop=True)
-                    
-                    if len(st.session_state.neraca_saldo) == 0:
-                        st.session_state.neraca_saldo = pd.DataFrame([
-                            {"Ref": "", "Akun": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}
-                        ])
-                    
-                    st.session_state.neraca_refresh_counter += 1
-                    st.success("✅ Baris berhasil dihapus!")
-                    st.rerun()
-
     st.markdown("---")
 
-    # --- AgGrid dengan Dropdown Akun dari Buku Besar ---
-    aggrid_key = f"neraca_{st.session_state.neraca_refresh_counter}"
-    
-    # Ambil daftar akun dari Buku Besar (SAFE)
-    daftar_akun_values = []
+    # --- AgGrid dengan Dropdown Akun dari Bagan Akun & Buku Besar ---
+    # Ambil daftar akun dari Bagan Akun lalu Buku Besar (SAFE, tanpa duplikat)
+    daftar_akun_values = list(ws.bagan_akun.daftar_nama())
     
     if "buku_besar" in st.session_state and st.session_state.buku_besar:
         if isinstance(st.session_state.buku_besar, dict):
             for akun_no, akun_data in st.session_state.buku_besar.items():
                 if isinstance(akun_data, dict) and "nama_akun" in akun_data:
                     daftar_akun_values.append(akun_data["nama_akun"])
+    daftar_akun_values = list(dict.fromkeys(daftar_akun_values))
     
-    gb = GridOptionsBuilder.from_dataframe(st.session_state.neraca_saldo)
-    gb.configure_default_column(editable=True, resizable=True)
-    gb.configure_grid_options(stopEditingWhenCellsLoseFocus=False)
-    
-    # Dropdown untuk kolom Akun (dari Buku Besar)
-    if daftar_akun_values:
-        gb.configure_column(
-            "Akun",
-            editable=True,
-            cellEditor="agSelectCellEditor",
-            cellEditorParams={
-                "values": daftar_akun_values
-            }
-        )
-    
-    # Konfigurasi kolom angka
-    for col in st.session_state.neraca_saldo.columns:
-        if "(Rp)" in col:
-            gb.configure_column(col, type=["numericColumn"], valueFormatter="value ? value.toLocaleString() : ''")
-    
-    grid_options = gb.build()
-    
-    grid_response = AgGrid(
-        st.session_state.neraca_saldo,
-        gridOptions=grid_options,
-        update_mode=GridUpdateMode.VALUE_CHANGED,
-        fit_columns_on_grid_load=True,
-        allow_unsafe_jscode=True,
-        enable_enterprise_modules=False,
-        theme="streamlit",
-        height=300,
-        key=aggrid_key,
-        reload_data=True
-    )
-    
-    new_neraca = pd.DataFrame(grid_response["data"])
-    if not new_neraca.equals(st.session_state.neraca_saldo):
-        st.session_state.neraca_saldo = new_neraca.copy()
+    edit_tabel("neraca_saldo", "neraca", height=300, kolom_pilihan={"Akun": daftar_akun_values}, unit="neraca_saldo")
+    kontrol_baris("neraca_saldo", "Akun", "neraca", "neraca_saldo")
 
-    # Filter data valid
-    df_neraca_clean = new_neraca[new_neraca["Akun"].astype(str).str.strip() != ""]
+    df_neraca_final = pipeline().ambil("hasil_neraca_saldo")
 
-    if not df_neraca_clean.empty:
-        total_debit = df_neraca_clean["Debit (Rp)"].sum()
-        total_kredit = df_neraca_clean["Kredit (Rp)"].sum()
-
-        total_row = pd.DataFrame({
-            "Ref": [""],
-            "Akun": ["Jumlah"],
-            "Debit (Rp)": [total_debit],
-            "Kredit (Rp)": [total_kredit]
-        })
-
-        df_neraca_final = pd.concat([df_neraca_clean, total_row], ignore_index=True)
-        df_neraca_final.index = range(1, len(df_neraca_final) + 1)
-        df_neraca_final.index.name = "No"
+    if df_neraca_final is not None:
 
         st.write("### 📊 Hasil Neraca Saldo")
-        st.dataframe(
-            df_neraca_final.style.format({
-                "Debit (Rp)": format_rupiah,
-                "Kredit (Rp)": format_rupiah,
-            }).apply(lambda x: ['font-weight: bold' if i == len(df_neraca_final) else '' for i in range(len(x))], axis=0),
-            use_container_width=True
-        )
+        tampilkan_laporan(df_neraca_final, ["Debit (Rp)", "Kredit (Rp)"], hide_index=False)
 
         # PDF Export
-        def buat_pdf_neraca(df, bulan, tahun):
-            pdf = FPDF()
-            pdf.add_page()
-            
-            pdf.set_font("Arial", 'B', 14)
-            pdf.cell(0, 10, txt="Neraca Saldo BUMDes", ln=True, align="C")
-            pdf.set_font("Arial", '', 12)
-            pdf.cell(0, 8, txt=f"Periode: {bulan_dict[bulan]} {tahun}", ln=True, align="C")
-            pdf.ln(5)
-
-            pdf.set_font("Arial", 'B', 10)
-            col_widths = [15, 25, 70, 40, 40]
-            headers = ["No", "Ref", "Akun", "Debit (Rp)", "Kredit (Rp)"]
-            
-            for i, header in enumerate(headers):
-                pdf.cell(col_widths[i], 10, header, border=1, align="C")
-            pdf.ln()
-
-            pdf.set_font("Arial", '', 9)
-            for idx, row in df.iterrows():
-                pdf.cell(col_widths[0], 8, str(idx), border=1, align="C")
-                pdf.cell(col_widths[1], 8, str(row["Ref"]), border=1, align="C")
-                
-                akun = str(row["Akun"])
-                if len(akun) > 35:
-                    akun = akun[:32] + "..."
-                pdf.cell(col_widths[2], 8, akun, border=1, align="L")
-                
-                debit_val = row["Debit (Rp)"]
-                debit_text = format_rupiah(debit_val) if isinstance(debit_val, (int, float)) and debit_val != 0 else "-"
-                pdf.cell(col_widths[3], 8, debit_text, border=1, align="R")
-                
-                kredit_val = row["Kredit (Rp)"]
-                kredit_text = format_rupiah(kredit_val) if isinstance(kredit_val, (int, float)) and kredit_val != 0 else "-"
-                pdf.cell(col_widths[4], 8, kredit_text, border=1, align="R")
-                
-                pdf.ln()
-
-            pdf.ln(5)
-            pdf.set_font("Arial", 'I', 8)
-            pdf.cell(0, 5, txt="Dicetak dari Sistem Akuntansi BUMDes", ln=True, align="C")
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                pdf.output(tmp.name)
-                tmp.seek(0)
-                return tmp.read()
-
-        pdf_neraca = buat_pdf_neraca(df_neraca_final, bulan_neraca, tahun_neraca)
         st.download_button(
             "📥 Download PDF Neraca Saldo",
-            data=pdf_neraca,
+            data=prof.bungkus("pdf neraca saldo", partial(buat_pdf_neraca, df_neraca_final, bulan_neraca, tahun_neraca)),
             file_name=f"neraca_saldo_{bulan_neraca}_{tahun_neraca}.pdf",
             mime="application/pdf",
+            on_click="ignore",
             use_container_width=True
         )
+        tombol_ekspor(df_neraca_final, f"neraca_saldo_{bulan_neraca}_{tahun_neraca}", "neraca_saldo", "Neraca Saldo")
     else:
         st.warning("⚠️ Belum ada data valid di tabel Neraca Saldo.")
+
+with tab3:
+    tab_neraca_saldo()
 # ========================================
 # TAB 4: LAPORAN KEUANGAN (LENGKAP & DIPERBAIKI)
 # ========================================
-with tab4:
+@st.fragment(key="laporan")
+@diukur("tab Laporan Keuangan")
+def tab_laporan():
     st.header("📊 Laporan Keuangan BUMDes")
     
-    # --- Selector Periode ---
-    col1, col2 = st.columns(2)
-    
-    bulan_dict = {
-        "01": "Januari", "02": "Februari", "03": "Maret",
-        "04": "April", "05": "Mei", "06": "Juni",
-        "07": "Juli", "08": "Agustus", "09": "September",
-        "10": "Oktober", "11": "November", "12": "Desember"
-    }
-    
-    with col1:
-        bulan_laporan = st.selectbox(
-            "Pilih Bulan", 
-            options=[
-                ("01", "Januari"), ("02", "Februari"), ("03", "Maret"),
-                ("04", "April"), ("05", "Mei"), ("06", "Juni"),
-                ("07", "Juli"), ("08", "Agustus"), ("09", "September"),
-                ("10", "Oktober"), ("11", "November"), ("12", "Desember")
-            ],
-            format_func=lambda x: x[1],
-            key="bulan_laporan"
-        )[0]
-    
-    with col2:
-        tahun_laporan = st.number_input(
-            "Tahun", 
-            min_value=2000, 
-            max_value=2100, 
-            value=2025,
-            step=1,
-            key="tahun_laporan"
-        )
-    
+    # Periode mengikuti Neraca Saldo: semua tabel laporan diturunkan dari Neraca Saldo periode itu
+    bulan_laporan = st.session_state.bulan_neraca[0]
+    tahun_laporan = st.session_state.tahun_neraca
+    bulan_dict = BULAN
+
     st.subheader(f"Periode: {bulan_dict[bulan_laporan]} {tahun_laporan}")
+    st.caption("Periode dipilih di tab ⚖️ Neraca Saldo.")
     
     st.info("💡 Data otomatis diambil dari Neraca Saldo, namun Anda tetap bisa mengedit manual di tabel yang tersedia.")
 
-    # Counter refresh
-    if "laporan_refresh" not in st.session_state:
-        st.session_state.laporan_refresh = 0
-    
-    # Inisialisasi laba_bersih di session_state
-    if "laba_bersih" not in st.session_state:
-        st.session_state.laba_bersih = 0
-
     # ========================================
     # AUTO-LOAD DARI NERACA SALDO (LENGKAP)
     # ========================================
-    if "pendapatan_loaded" not in st.session_state:
-        st.session_state.pendapatan_loaded = False
-    
-    if not st.session_state.pendapatan_loaded:
-        df_neraca = st.session_state.neraca_saldo[
-            st.session_state.neraca_saldo["Akun"].astype(str).str.strip() != ""
-        ]
-        
-        # Clear data lama
-        st.session_state.pendapatan = pd.DataFrame([{"Jenis Pendapatan": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-        st.session_state.beban = pd.DataFrame([{"Jenis Beban": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-        st.session_state.aktiva_lancar = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-        st.session_state.aktiva_tetap = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-        st.session_state.kewajiban = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-        st.session_state.modal_data = {"modal_awal": 0}
-        st.session_state.arus_kas_operasi = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-        st.session_state.arus_kas_investasi = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-        st.session_state.arus_kas_pendanaan = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-        
-        # Auto-populate dari Neraca Saldo
-        for _, row in df_neraca.iterrows():
-            nama_akun = str(row["Akun"]).lower()
-            debit = row["Debit (Rp)"] if pd.notna(row["Debit (Rp)"]) else 0
-            kredit = row["Kredit (Rp)"] if pd.notna(row["Kredit (Rp)"]) else 0
-            
-            # Pendapatan
-            if "pendapatan" in nama_akun or "penjualan" in nama_akun or "penerimaan" in nama_akun:
-                new_row = pd.DataFrame([{"Jenis Pendapatan": row["Akun"], "Debit (Rp)": debit, "Kredit (Rp)": kredit}])
-                st.session_state.pendapatan = pd.concat([st.session_state.pendapatan, new_row], ignore_index=True)
-                # Arus Kas Operasi (Penerimaan)
-                if kredit > 0:
-                    new_row_ak = pd.DataFrame([{"Aktivitas": row["Akun"], "Jumlah (Rp)": kredit}])
-                    st.session_state.arus_kas_operasi = pd.concat([st.session_state.arus_kas_operasi, new_row_ak], ignore_index=True)
-            
-            # Beban
-            elif "beban" in nama_akun or "biaya" in nama_akun or "gaji" in nama_akun or "sewa" in nama_akun or "pembayaran" in nama_akun:
-                new_row = pd.DataFrame([{"Jenis Beban": row["Akun"], "Debit (Rp)": debit, "Kredit (Rp)": kredit}])
-                st.session_state.beban = pd.concat([st.session_state.beban, new_row], ignore_index=True)
-                # Arus Kas Operasi (Pembayaran)
-                if debit > 0:
-                    new_row_ak = pd.DataFrame([{"Aktivitas": row["Akun"], "Jumlah (Rp)": -debit}])
-                    st.session_state.arus_kas_operasi = pd.concat([st.session_state.arus_kas_operasi, new_row_ak], ignore_index=True)
-            
-            # Aktiva Lancar
-            elif "kas" in nama_akun or "perlengkapan" in nama_akun or "piutang" in nama_akun:
-                new_row = pd.DataFrame([{"Item": row["Akun"], "Jumlah (Rp)": debit}])
-                st.session_state.aktiva_lancar = pd.concat([st.session_state.aktiva_lancar, new_row], ignore_index=True)
-            
-            # Aktiva Tetap
-            elif "peralatan" in nama_akun or "gedung" in nama_akun or "kendaraan" in nama_akun:
-                new_row = pd.DataFrame([{"Item": row["Akun"], "Jumlah (Rp)": debit}])
-                st.session_state.aktiva_tetap = pd.concat([st.session_state.aktiva_tetap, new_row], ignore_index=True)
-                # Arus Kas Investasi (Pembelian Aset)
-                if debit > 0:
-                    new_row_ak = pd.DataFrame([{"Aktivitas": f"Pembelian {row['Akun']}", "Jumlah (Rp)": -debit}])
-                    st.session_state.arus_kas_investasi = pd.concat([st.session_state.arus_kas_investasi, new_row_ak], ignore_index=True)
-            
-            # Modal
-            elif "modal" in nama_akun:
-                st.session_state.modal_data["modal_awal"] = kredit
-                # Arus Kas Pendanaan (Setoran Modal)
-                if kredit > 0:
-                    new_row_ak = pd.DataFrame([{"Aktivitas": "Setoran Modal", "Jumlah (Rp)": kredit}])
-                    st.session_state.arus_kas_pendanaan = pd.concat([st.session_state.arus_kas_pendanaan, new_row_ak], ignore_index=True)
-            
-            # Kewajiban
-            elif "hutang" in nama_akun or "utang" in nama_akun:
-                new_row = pd.DataFrame([{"Item": row["Akun"], "Jumlah (Rp)": kredit}])
-                st.session_state.kewajiban = pd.concat([st.session_state.kewajiban, new_row], ignore_index=True)
-        
-        st.session_state.pendapatan_loaded = True
+    # Tabel yang belum diedit manual mengikuti Neraca Saldo setiap kali tabel itu berubah
+    sinkronkan_laporan()
 
     # === SUB-TABS ===
     subtab1, subtab2, subtab3 = st.tabs([
@@ -672,16 +791,15 @@ with tab4:
     # ========================================
     # SUB-TAB 1: LAPORAN LABA/RUGI (FIXED)
     # ========================================
-    with subtab1:
+    @st.fragment(key="labarugi")
+    @diukur("sub-tab Laba/Rugi")
+    def subtab_labarugi():
         st.markdown("### 📈 Laporan Laba/Rugi")
         st.markdown(f"**BUMDes - {bulan_dict[bulan_laporan]} {tahun_laporan}**")
         st.markdown("---")
         
         # Tombol reload
-        if st.button("🔄 Reload dari Neraca Saldo", key="reload_labarugi"):
-            st.session_state.pendapatan_loaded = False
-            st.session_state.laporan_refresh += 1
-            st.rerun()
+        st.button("🔄 Reload dari Neraca Saldo", key="reload_labarugi", on_click=muat_ulang_laporan)
         
         st.info("💡 Tabel Pendapatan dan Beban menggunakan format Debit & Kredit seperti di Neraca Saldo.")
         
@@ -691,281 +809,61 @@ with tab4:
         with col1:
             st.write("#### Input Pendapatan:")
             
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("➕ Tambah", key="tambah_pendapatan", use_container_width=True):
-                    new_row = pd.DataFrame([{"Jenis Pendapatan": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-                    st.session_state.pendapatan = pd.concat([st.session_state.pendapatan, new_row], ignore_index=True)
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
-            
-            with col_btn2:
-                if st.button("🗑️ Hapus Kosong", key="hapus_pendapatan_kosong", use_container_width=True):
-                    st.session_state.pendapatan = st.session_state.pendapatan[
-                        st.session_state.pendapatan["Jenis Pendapatan"].astype(str).str.strip() != ""
-                    ].reset_index(drop=True)
-                    if len(st.session_state.pendapatan) == 0:
-                        st.session_state.pendapatan = pd.DataFrame([{"Jenis Pendapatan": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
+            edit_tabel("pendapatan", "pendapatan", height=250, unit="labarugi")
             
-            new_pendapatan = create_aggrid(st.session_state.pendapatan, f"pendapatan_{st.session_state.laporan_refresh}", height=250)
-            if not new_pendapatan.equals(st.session_state.pendapatan):
-                st.session_state.pendapatan = new_pendapatan.copy()
-            
-            # Hapus Tertentu
-            df_pend_terisi = st.session_state.pendapatan[
-                st.session_state.pendapatan["Jenis Pendapatan"].astype(str).str.strip() != ""
-            ]
-            
-            if len(df_pend_terisi) > 0:
-                with st.expander("🗑️ Hapus Pendapatan Tertentu", expanded=False):
-                    rows_del = []
-                    for idx in df_pend_terisi.index:
-                        row = df_pend_terisi.loc[idx]
-                        col_chk, col_txt = st.columns([1, 9])
-                        with col_chk:
-                            if st.checkbox("", key=f"chk_p_{idx}_{st.session_state.laporan_refresh}"):
-                                rows_del.append(idx)
-                        with col_txt:
-                            st.text(f"{row['Jenis Pendapatan']}: D: {format_rupiah(row['Debit (Rp)'])} | K: {format_rupiah(row['Kredit (Rp)'])}")
-                    
-                    if rows_del and st.button(f"🗑️ Hapus {len(rows_del)} Item", key="del_pend"):
-                        st.session_state.pendapatan = st.session_state.pendapatan.drop(rows_del).reset_index(drop=True)
-                        if len(st.session_state.pendapatan) == 0:
-                            st.session_state.pendapatan = pd.DataFrame([{"Jenis Pendapatan": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-                        st.session_state.laporan_refresh += 1
-                        st.rerun()
+            kontrol_baris("pendapatan", "Jenis Pendapatan", "pendapatan", "labarugi")
 
         with col2:
             st.write("#### Input Beban-Beban:")
             
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("➕ Tambah", key="tambah_beban", use_container_width=True):
-                    new_row = pd.DataFrame([{"Jenis Beban": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-                    st.session_state.beban = pd.concat([st.session_state.beban, new_row], ignore_index=True)
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
-            
-            with col_btn2:
-                if st.button("🗑️ Hapus Kosong", key="hapus_beban_kosong", use_container_width=True):
-                    st.session_state.beban = st.session_state.beban[
-                        st.session_state.beban["Jenis Beban"].astype(str).str.strip() != ""
-                    ].reset_index(drop=True)
-                    if len(st.session_state.beban) == 0:
-                        st.session_state.beban = pd.DataFrame([{"Jenis Beban": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
+            edit_tabel("beban", "beban", height=250, unit="labarugi")
             
-            new_beban = create_aggrid(st.session_state.beban, f"beban_{st.session_state.laporan_refresh}", height=250)
-            if not new_beban.equals(st.session_state.beban):
-                st.session_state.beban = new_beban.copy()
-            
-            # Hapus Tertentu
-            df_beban_terisi = st.session_state.beban[
-                st.session_state.beban["Jenis Beban"].astype(str).str.strip() != ""
-            ]
-            
-            if len(df_beban_terisi) > 0:
-                with st.expander("🗑️ Hapus Beban Tertentu", expanded=False):
-                    rows_del = []
-                    for idx in df_beban_terisi.index:
-                        row = df_beban_terisi.loc[idx]
-                        col_chk, col_txt = st.columns([1, 9])
-                        with col_chk:
-                            if st.checkbox("", key=f"chk_b_{idx}_{st.session_state.laporan_refresh}"):
-                                rows_del.append(idx)
-                        with col_txt:
-                            st.text(f"{row['Jenis Beban']}: D: {format_rupiah(row['Debit (Rp)'])} | K: {format_rupiah(row['Kredit (Rp)'])}")
-                    
-                    if rows_del and st.button(f"🗑️ Hapus {len(rows_del)} Item", key="del_beban"):
-                        st.session_state.beban = st.session_state.beban.drop(rows_del).reset_index(drop=True)
-                        if len(st.session_state.beban) == 0:
-                            st.session_state.beban = pd.DataFrame([{"Jenis Beban": "", "Debit (Rp)": 0, "Kredit (Rp)": 0}])
-                        st.session_state.laporan_refresh += 1
-                        st.rerun()
+            kontrol_baris("beban", "Jenis Beban", "beban", "labarugi")
 
         st.markdown("---")
 
-        # Hitung dan SIMPAN laba_bersih di session_state
-        df_pendapatan_clean = new_pendapatan[new_pendapatan["Jenis Pendapatan"].astype(str).str.strip() != ""]
-        df_beban_clean = new_beban[new_beban["Jenis Beban"].astype(str).str.strip() != ""]
-
-        # Total Pendapatan = (Kredit - Debit)
-        total_pendapatan_debit = df_pendapatan_clean["Debit (Rp)"].sum() if not df_pendapatan_clean.empty else 0
-        total_pendapatan_kredit = df_pendapatan_clean["Kredit (Rp)"].sum() if not df_pendapatan_clean.empty else 0
-        total_pendapatan = total_pendapatan_kredit - total_pendapatan_debit
-        
-        # Total Beban = (Debit - Kredit)
-        total_beban_debit = df_beban_clean["Debit (Rp)"].sum() if not df_beban_clean.empty else 0
-        total_beban_kredit = df_beban_clean["Kredit (Rp)"].sum() if not df_beban_clean.empty else 0
-        total_beban = total_beban_debit - total_beban_kredit
-        
-        # Laba Bersih = Total Pendapatan - Total Beban
-        st.session_state.laba_bersih = total_pendapatan - total_beban
+        # Laba bersih ikut dipakai tahap "neraca" di pipeline
+        df_labarugi, _ = pipeline().ambil("labarugi")
 
         # ✅ SELALU TAMPILKAN (HAPUS IF)
         st.write("### 📊 Hasil Laporan Laba/Rugi")
         
-        result_data = []
-        result_data.append({"Keterangan": "Pendapatan:", "Debit": "", "Kredit": ""})
-        
-        if not df_pendapatan_clean.empty:
-            for idx, row in df_pendapatan_clean.iterrows():
-                debit_val = row["Debit (Rp)"] if row["Debit (Rp)"] != 0 else ""
-                kredit_val = row["Kredit (Rp)"] if row["Kredit (Rp)"] != 0 else ""
-                result_data.append({
-                    "Keterangan": f"  {idx+1}. {row['Jenis Pendapatan']}", 
-                    "Debit": debit_val,
-                    "Kredit": kredit_val
-                })
-        
-        result_data.append({"Keterangan": "", "Debit": "", "Kredit": ""})
-        if total_pendapatan >= 0:
-            result_data.append({"Keterangan": "Total Pendapatan", "Debit": "", "Kredit": total_pendapatan})
-        else:
-            result_data.append({"Keterangan": "Total Pendapatan", "Debit": abs(total_pendapatan), "Kredit": ""})
-        
-        result_data.append({"Keterangan": "", "Debit": "", "Kredit": ""})
-        result_data.append({"Keterangan": "Beban-Beban:", "Debit": "", "Kredit": ""})
-        
-        if not df_beban_clean.empty:
-            for idx, row in df_beban_clean.iterrows():
-                debit_val = row["Debit (Rp)"] if row["Debit (Rp)"] != 0 else ""
-                kredit_val = row["Kredit (Rp)"] if row["Kredit (Rp)"] != 0 else ""
-                result_data.append({
-                    "Keterangan": f"  {idx+1}. {row['Jenis Beban']}", 
-                    "Debit": debit_val,
-                    "Kredit": kredit_val
-                })
-        
-        result_data.append({"Keterangan": "", "Debit": "", "Kredit": ""})
-        if total_beban >= 0:
-            result_data.append({"Keterangan": "Total Beban", "Debit": total_beban, "Kredit": ""})
-        else:
-            result_data.append({"Keterangan": "Total Beban", "Debit": "", "Kredit": abs(total_beban)})
-        
-        result_data.append({"Keterangan": "", "Debit": "", "Kredit": ""})
-        
-        if st.session_state.laba_bersih >= 0:
-            result_data.append({"Keterangan": "Laba Bersih", "Debit": "", "Kredit": st.session_state.laba_bersih})
-        else:
-            result_data.append({"Keterangan": "Rugi Bersih", "Debit": abs(st.session_state.laba_bersih), "Kredit": ""})
-
-        df_labarugi = pd.DataFrame(result_data)
-        
-        st.dataframe(
-            df_labarugi.style.format({
-                "Debit": lambda x: format_rupiah(x) if isinstance(x, (int, float)) else x,
-                "Kredit": lambda x: format_rupiah(x) if isinstance(x, (int, float)) else x
-            })
-            .apply(lambda x: ['font-weight: bold' if i < len(df_labarugi) and ('Total' in str(df_labarugi.iloc[i]['Keterangan']) or 'Laba' in str(df_labarugi.iloc[i]['Keterangan']) or 'Rugi' in str(df_labarugi.iloc[i]['Keterangan'])) else '' for i in range(len(x))], axis=0)
-            .set_properties(**{'text-align': 'left'}, subset=['Keterangan'])
-            .set_properties(**{'text-align': 'right'}, subset=['Debit', 'Kredit']),
-            use_container_width=True,
-            hide_index=True
-        )
+        tampilkan_laporan(df_labarugi, ["Debit", "Kredit"], kolom_kiri=["Keterangan"])
         
         # ✅ PDF Export Laba/Rugi (FIXED - TAMPILKAN SEMUA NILAI)
-        try:
-            def buat_pdf_labarugi(df, bulan, tahun):
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", 'B', 14)
-                pdf.cell(0, 10, txt="Laporan Laba/Rugi", ln=True, align="C")
-                pdf.set_font("Arial", '', 12)
-                pdf.cell(0, 8, txt="BUMDes", ln=True, align="C")
-                pdf.cell(0, 8, txt=f"Periode: {bulan_dict[bulan]} {tahun}", ln=True, align="C")
-                pdf.ln(5)
-                pdf.set_font("Arial", 'B', 10)
-                pdf.cell(90, 10, "Keterangan", border=1, align="C")
-                pdf.cell(45, 10, "Debit (Rp)", border=1, align="C")
-                pdf.cell(45, 10, "Kredit (Rp)", border=1, align="C")
-                pdf.ln()
-                pdf.set_font("Arial", '', 9)
-                
-                for idx in range(len(df)):
-                    row = df.iloc[idx]
-                    is_bold = 'Total' in str(row['Keterangan']) or 'Laba' in str(row['Keterangan']) or 'Rugi' in str(row['Keterangan'])
-                    if is_bold:
-                        pdf.set_font("Arial", 'B', 9)
-                    
-                    ket = str(row["Keterangan"])[:40] + "..." if len(str(row["Keterangan"])) > 43 else str(row["Keterangan"])
-                    pdf.cell(90, 8, ket, border=1, align="L")
-                    
-                    # ✅ FIX: Tampilkan SEMUA nilai (termasuk yang di Total)
-                    debit_val = row["Debit"]
-                    if isinstance(debit_val, (int, float)) and debit_val != 0:
-                        debit_text = format_rupiah(float(debit_val))
-                    elif pd.notna(debit_val) and str(debit_val).strip() != "":
-                        try:
-                            debit_text = format_rupiah(float(debit_val))
-                        except:
-                            debit_text = ""
-                    else:
-                        debit_text = ""
-                    pdf.cell(45, 8, debit_text, border=1, align="R")
-                    
-                    kredit_val = row["Kredit"]
-                    if isinstance(kredit_val, (int, float)) and kredit_val != 0:
-                        kredit_text = format_rupiah(float(kredit_val))
-                    elif pd.notna(kredit_val) and str(kredit_val).strip() != "":
-                        try:
-                            kredit_text = format_rupiah(float(kredit_val))
-                        except:
-                            kredit_text = ""
-                    else:
-                        kredit_text = ""
-                    pdf.cell(45, 8, kredit_text, border=1, align="R")
-                    
-                    pdf.ln()
-                    
-                    if is_bold:
-                        pdf.set_font("Arial", '', 9)
-                
-                pdf.ln(5)
-                pdf.set_font("Arial", 'I', 8)
-                pdf.cell(0, 5, txt="Dicetak dari Sistem Akuntansi BUMDes", ln=True, align="C")
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                    pdf.output(tmp.name)
-                    tmp.seek(0)
-                    return tmp.read()
-
-            pdf_labarugi = buat_pdf_labarugi(df_labarugi, bulan_laporan, tahun_laporan)
-            
-            st.download_button(
-                "📥 Download PDF Laba/Rugi",
-                data=pdf_labarugi,
-                file_name=f"laporan_labarugi_{bulan_laporan}_{tahun_laporan}.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
-        except Exception as e:
-            st.error(f"❌ Error membuat PDF: {str(e)}")
-            st.info("💡 Silakan screenshot hasil laporan di atas sebagai alternatif.")
+        st.download_button(
+            "📥 Download PDF Laba/Rugi",
+            data=prof.bungkus("pdf laba/rugi", partial(buat_pdf_labarugi, df_labarugi, bulan_laporan, tahun_laporan)),
+            file_name=f"laporan_labarugi_{bulan_laporan}_{tahun_laporan}.pdf",
+            mime="application/pdf",
+            on_click="ignore",
+            use_container_width=True
+        )
+        tombol_ekspor(df_labarugi, f"laporan_labarugi_{bulan_laporan}_{tahun_laporan}", "labarugi", "Laba Rugi")
+
+    with subtab1:
+        subtab_labarugi()
     
     # ========================================
     # SUB-TAB 2: LAPORAN NERACA (FIXED COMPLETELY)
     # ========================================
-    with subtab2:
+    @st.fragment(key="neraca_lap")
+    @diukur("sub-tab Neraca")
+    def subtab_neraca():
         st.markdown("### 🏦 Laporan Neraca")
         st.markdown(f"**BUMDes - {bulan_dict[bulan_laporan]} {tahun_laporan}**")
         st.markdown("---")
         
         # Tombol reload
-        if st.button("🔄 Reload dari Neraca Saldo", key="reload_neraca"):
-            st.session_state.pendapatan_loaded = False
-            st.session_state.laporan_refresh += 1
-            st.rerun()
+        st.button("🔄 Reload dari Neraca Saldo", key="reload_neraca", on_click=muat_ulang_laporan)
         
         # Input Modal
         modal_awal = st.number_input(
             "Modal Awal (Rp)", 
-            value=st.session_state.modal_data.get("modal_awal", 0), 
             step=100000,
-            key="modal_awal_input"
+            key="modal_awal_input",
+            on_change=st.session_state.pipeline.diedit.add,
+            args=("modal_data",)
         )
         st.session_state.modal_data["modal_awal"] = modal_awal
         
@@ -976,504 +874,132 @@ with tab4:
         
         with col1:
             st.write("#### Aktiva Lancar:")
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("➕ Tambah", key="tambah_aktiva_lancar", use_container_width=True):
-                    new_row = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                    st.session_state.aktiva_lancar = pd.concat([st.session_state.aktiva_lancar, new_row], ignore_index=True)
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
-            with col_btn2:
-                if st.button("🗑️ Hapus Kosong", key="hapus_lancar_kosong", use_container_width=True):
-                    st.session_state.aktiva_lancar = st.session_state.aktiva_lancar[
-                        st.session_state.aktiva_lancar["Item"].astype(str).str.strip() != ""
-                    ].reset_index(drop=True)
-                    if len(st.session_state.aktiva_lancar) == 0:
-                        st.session_state.aktiva_lancar = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
-            
-            new_aktiva_lancar = create_aggrid(st.session_state.aktiva_lancar, f"lancar_{st.session_state.laporan_refresh}", height=180)
-            if not new_aktiva_lancar.equals(st.session_state.aktiva_lancar):
-                st.session_state.aktiva_lancar = new_aktiva_lancar.copy()
+            edit_tabel("aktiva_lancar", "lancar", height=180, unit="neraca_lap")
             
-            # Hapus Tertentu Aktiva Lancar
-            df_lancar_terisi = st.session_state.aktiva_lancar[
-                st.session_state.aktiva_lancar["Item"].astype(str).str.strip() != ""
-            ]
-            if len(df_lancar_terisi) > 0:
-                with st.expander("🗑️ Hapus Aktiva Lancar Tertentu", expanded=False):
-                    rows_del = []
-                    for idx in df_lancar_terisi.index:
-                        row = df_lancar_terisi.loc[idx]
-                        col_chk, col_txt = st.columns([1, 9])
-                        with col_chk:
-                            if st.checkbox("", key=f"chk_al_{idx}_{st.session_state.laporan_refresh}"):
-                                rows_del.append(idx)
-                        with col_txt:
-                            st.text(f"{row['Item']}: {format_rupiah(row['Jumlah (Rp)'])}")
-                    
-                    if rows_del and st.button(f"🗑️ Hapus {len(rows_del)} Item", key="del_lancar"):
-                        st.session_state.aktiva_lancar = st.session_state.aktiva_lancar.drop(rows_del).reset_index(drop=True)
-                        if len(st.session_state.aktiva_lancar) == 0:
-                            st.session_state.aktiva_lancar = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                        st.session_state.laporan_refresh += 1
-                        st.rerun()
+            kontrol_baris("aktiva_lancar", "Item", "aktiva_lancar", "neraca_lap")
 
             st.write("#### Aktiva Tetap:")
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("➕ Tambah", key="tambah_aktiva_tetap", use_container_width=True):
-                    new_row = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                    st.session_state.aktiva_tetap = pd.concat([st.session_state.aktiva_tetap, new_row], ignore_index=True)
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
-            with col_btn2:
-                if st.button("🗑️ Hapus Kosong", key="hapus_tetap_kosong", use_container_width=True):
-                    st.session_state.aktiva_tetap = st.session_state.aktiva_tetap[
-                        st.session_state.aktiva_tetap["Item"].astype(str).str.strip() != ""
-                    ].reset_index(drop=True)
-                    if len(st.session_state.aktiva_tetap) == 0:
-                        st.session_state.aktiva_tetap = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
-            
-            new_aktiva_tetap = create_aggrid(st.session_state.aktiva_tetap, f"tetap_{st.session_state.laporan_refresh}", height=180)
-            if not new_aktiva_tetap.equals(st.session_state.aktiva_tetap):
-                st.session_state.aktiva_tetap = new_aktiva_tetap.copy()
+            edit_tabel("aktiva_tetap", "tetap", height=180, unit="neraca_lap")
             
-            # Hapus Tertentu Aktiva Tetap
-            df_tetap_terisi = st.session_state.aktiva_tetap[
-                st.session_state.aktiva_tetap["Item"].astype(str).str.strip() != ""
-            ]
-            if len(df_tetap_terisi) > 0:
-                with st.expander("🗑️ Hapus Aktiva Tetap Tertentu", expanded=False):
-                    rows_del = []
-                    for idx in df_tetap_terisi.index:
-                        row = df_tetap_terisi.loc[idx]
-                        col_chk, col_txt = st.columns([1, 9])
-                        with col_chk:
-                            if st.checkbox("", key=f"chk_at_{idx}_{st.session_state.laporan_refresh}"):
-                                rows_del.append(idx)
-                        with col_txt:
-                            st.text(f"{row['Item']}: {format_rupiah(row['Jumlah (Rp)'])}")
-                    
-                    if rows_del and st.button(f"🗑️ Hapus {len(rows_del)} Item", key="del_tetap"):
-                        st.session_state.aktiva_tetap = st.session_state.aktiva_tetap.drop(rows_del).reset_index(drop=True)
-                        if len(st.session_state.aktiva_tetap) == 0:
-                            st.session_state.aktiva_tetap = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                        st.session_state.laporan_refresh += 1
-                        st.rerun()
+            kontrol_baris("aktiva_tetap", "Item", "aktiva_tetap", "neraca_lap")
 
         with col2:
             st.write("#### Kewajiban:")
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("➕ Tambah", key="tambah_kewajiban", use_container_width=True):
-                    new_row = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                    st.session_state.kewajiban = pd.concat([st.session_state.kewajiban, new_row], ignore_index=True)
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
-            with col_btn2:
-                if st.button("🗑️ Hapus Kosong", key="hapus_kewajiban_kosong", use_container_width=True):
-                    st.session_state.kewajiban = st.session_state.kewajiban[
-                        st.session_state.kewajiban["Item"].astype(str).str.strip() != ""
-                    ].reset_index(drop=True)
-                    if len(st.session_state.kewajiban) == 0:
-                        st.session_state.kewajiban = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                    st.session_state.laporan_refresh += 1
-                    st.rerun()
+            edit_tabel("kewajiban", "kewajiban", height=180, unit="neraca_lap")
             
-            new_kewajiban = create_aggrid(st.session_state.kewajiban, f"kewajiban_{st.session_state.laporan_refresh}", height=180)
-            if not new_kewajiban.equals(st.session_state.kewajiban):
-                st.session_state.kewajiban = new_kewajiban.copy()
-            
-            # Hapus Tertentu Kewajiban
-            df_kewajiban_terisi = st.session_state.kewajiban[
-                st.session_state.kewajiban["Item"].astype(str).str.strip() != ""
-            ]
-            if len(df_kewajiban_terisi) > 0:
-                with st.expander("🗑️ Hapus Kewajiban Tertentu", expanded=False):
-                    rows_del = []
-                    for idx in df_kewajiban_terisi.index:
-                        row = df_kewajiban_terisi.loc[idx]
-                        col_chk, col_txt = st.columns([1, 9])
-                        with col_chk:
-                            if st.checkbox("", key=f"chk_k_{idx}_{st.session_state.laporan_refresh}"):
-                                rows_del.append(idx)
-                        with col_txt:
-                            st.text(f"{row['Item']}: {format_rupiah(row['Jumlah (Rp)'])}")
-                    
-                    if rows_del and st.button(f"🗑️ Hapus {len(rows_del)} Item", key="del_kewajiban"):
-                        st.session_state.kewajiban = st.session_state.kewajiban.drop(rows_del).reset_index(drop=True)
-                        if len(st.session_state.kewajiban) == 0:
-                            st.session_state.kewajiban = pd.DataFrame([{"Item": "", "Jumlah (Rp)": 0}])
-                        st.session_state.laporan_refresh += 1
-                        st.rerun()
+            kontrol_baris("kewajiban", "Item", "kewajiban", "neraca_lap")
 
         st.markdown("---")
 
-        # Hitung totals
-        df_aktiva_lancar_clean = new_aktiva_lancar[new_aktiva_lancar["Item"].astype(str).str.strip() != ""]
-        df_aktiva_tetap_clean = new_aktiva_tetap[new_aktiva_tetap["Item"].astype(str).str.strip() != ""]
-        df_kewajiban_clean = new_kewajiban[new_kewajiban["Item"].astype(str).str.strip() != ""]
-
-        total_aktiva_lancar = df_aktiva_lancar_clean["Jumlah (Rp)"].sum() if not df_aktiva_lancar_clean.empty else 0
-        total_aktiva_tetap = df_aktiva_tetap_clean["Jumlah (Rp)"].sum() if not df_aktiva_tetap_clean.empty else 0
-        total_aktiva = total_aktiva_lancar + total_aktiva_tetap
-        
-        total_kewajiban = df_kewajiban_clean["Jumlah (Rp)"].sum() if not df_kewajiban_clean.empty else 0
-        
-        modal_akhir = modal_awal + st.session_state.laba_bersih
-        total_passiva = total_kewajiban + modal_akhir
-        
-        total_aktiva = 0 if pd.isna(total_aktiva) else float(total_aktiva)
-        total_passiva = 0 if pd.isna(total_passiva) else float(total_passiva)
-
         # Hasil Neraca
         st.write("### 📊 Hasil Laporan Neraca")
         
-        neraca_data = []
-        neraca_data.append({"Aktiva": "Aktiva", "Jumlah1": "", "Passiva": "Passiva", "Jumlah2": ""})
-        neraca_data.append({"Aktiva": "", "Jumlah1": "", "Passiva": "", "Jumlah2": ""})
-        neraca_data.append({"Aktiva": "Aktiva Lancar:", "Jumlah1": "", "Passiva": "Kewajiban:", "Jumlah2": ""})
-        
-        max_rows = max(len(df_aktiva_lancar_clean), len(df_kewajiban_clean)) if not df_aktiva_lancar_clean.empty or not df_kewajiban_clean.empty else 0
-        for i in range(max_rows):
-            aktiva_item = df_aktiva_lancar_clean.iloc[i]["Item"] if i < len(df_aktiva_lancar_clean) else ""
-            aktiva_val = df_aktiva_lancar_clean.iloc[i]["Jumlah (Rp)"] if i < len(df_aktiva_lancar_clean) else ""
-            kewajiban_item = df_kewajiban_clean.iloc[i]["Item"] if i < len(df_kewajiban_clean) else ""
-            kewajiban_val = df_kewajiban_clean.iloc[i]["Jumlah (Rp)"] if i < len(df_kewajiban_clean) else ""
-            
-            neraca_data.append({
-                "Aktiva": f"  {aktiva_item}",
-                "Jumlah1": aktiva_val,
-                "Passiva": f"  {kewajiban_item}",
-                "Jumlah2": kewajiban_val
-            })
-        
-        neraca_data.append({"Aktiva": "", "Jumlah1": "", "Passiva": "", "Jumlah2": ""})
-        neraca_data.append({"Aktiva": "Jml aktiva lancar", "Jumlah1": total_aktiva_lancar, "Passiva": "Ekuitas:", "Jumlah2": ""})
-        neraca_data.append({"Aktiva": "", "Jumlah1": "", "Passiva": "  Modal", "Jumlah2": modal_awal})
-        neraca_data.append({"Aktiva": "Aktiva Tetap:", "Jumlah1": "", "Passiva": "  Laba", "Jumlah2": st.session_state.laba_bersih})
+        df_neraca_lap = pipeline().ambil("neraca")
         
-        for idx, row in df_aktiva_tetap_clean.iterrows():
-            neraca_data.append({
-                "Aktiva": f"  {row['Item']}",
-                "Jumlah1": row["Jumlah (Rp)"],
-                "Passiva": "",
-                "Jumlah2": ""
-            })
-        
-        neraca_data.append({"Aktiva": "", "Jumlah1": "", "Passiva": "", "Jumlah2": ""})
-        neraca_data.append({"Aktiva": "Jml Aktiva", "Jumlah1": total_aktiva, "Passiva": "Jml Kewajiban & Ekuitas", "Jumlah2": total_passiva})
-        
-        df_neraca_lap = pd.DataFrame(neraca_data)
-        
-        st.dataframe(
-            df_neraca_lap.style.format({
-                "Jumlah1": lambda x: format_rupiah(x) if isinstance(x, (int, float)) else x,
-                "Jumlah2": lambda x: format_rupiah(x) if isinstance(x, (int, float)) else x
-            })
-            .apply(lambda x: ['font-weight: bold' if i < len(df_neraca_lap) and ('Jml' in str(df_neraca_lap.iloc[i].get('Aktiva', '')) or 'Jml' in str(df_neraca_lap.iloc[i].get('Passiva', ''))) else '' for i in range(len(x))], axis=0)
-            .set_properties(**{'text-align': 'left'}, subset=['Aktiva', 'Passiva'])
-            .set_properties(**{'text-align': 'right'}, subset=['Jumlah1', 'Jumlah2']),
-            use_container_width=True,
-            hide_index=True
-        )
+        tampilkan_laporan(df_neraca_lap, ["Jumlah1", "Jumlah2"], kolom_kiri=["Aktiva", "Passiva"])
         
         # ✅ PDF Export Neraca (FIXED - TAMPILKAN SEMUA NILAI)
-        try:
-            def buat_pdf_neraca_lap(df, bulan, tahun):
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", 'B', 14)
-                pdf.cell(0, 10, txt="Laporan Neraca", ln=True, align="C")
-                pdf.set_font("Arial", '', 12)
-                pdf.cell(0, 8, txt="BUMDes", ln=True, align="C")
-                pdf.cell(0, 8, txt=f"Periode: {bulan_dict[bulan]} {tahun}", ln=True, align="C")
-                pdf.ln(5)
-                pdf.set_font("Arial", 'B', 10)
-                
-                col_widths = [60, 30, 60, 30]
-                headers = ["Aktiva", "Jumlah (Rp)", "Passiva", "Jumlah (Rp)"]
-                
-                for i, header in enumerate(headers):
-                    pdf.cell(col_widths[i], 10, header, border=1, align="C")
-                pdf.ln()
-                
-                pdf.set_font("Arial", '', 9)
-                for idx in range(len(df)):
-                    row = df.iloc[idx]
-                    is_bold = 'Jml' in str(row.get('Aktiva', '')) or 'Jml' in str(row.get('Passiva', ''))
-                    if is_bold:
-                        pdf.set_font("Arial", 'B', 9)
-                    
-                    # Kolom 1: Aktiva
-                    aktiva_text = str(row["Aktiva"])[:28] + "..." if len(str(row["Aktiva"])) > 30 else str(row["Aktiva"])
-                    pdf.cell(col_widths[0], 8, aktiva_text, border=1, align="L")
-                    
-                    # Kolom 2: Jumlah Aktiva (✅ FIXED - TAMPILKAN SEMUA)
-                    jumlah1_val = row["Jumlah1"]
-                    if isinstance(jumlah1_val, (int, float)) and jumlah1_val != 0:
-                        jumlah1_text = format_rupiah(float(jumlah1_val))
-                    elif pd.notna(jumlah1_val) and str(jumlah1_val).strip() != "":
-                        try:
-                            jumlah1_text = format_rupiah(float(jumlah1_val))
-                        except:
-                            jumlah1_text = ""
-                    else:
-                        jumlah1_text = ""
-                    pdf.cell(col_widths[1], 8, jumlah1_text, border=1, align="R")
-                    
-                    # Kolom 3: Passiva
-                    passiva_text = str(row["Passiva"])[:28] + "..." if len(str(row["Passiva"])) > 30 else str(row["Passiva"])
-                    pdf.cell(col_widths[2], 8, passiva_text, border=1, align="L")
-                    
-                    # Kolom 4: Jumlah Passiva (✅ FIXED - TAMPILKAN SEMUA)
-                    jumlah2_val = row["Jumlah2"]
-                    if isinstance(jumlah2_val, (int, float)) and jumlah2_val != 0:
-                        jumlah2_text = format_rupiah(float(jumlah2_val))
-                    elif pd.notna(jumlah2_val) and str(jumlah2_val).strip() != "":
-                        try:
-                            jumlah2_text = format_rupiah(float(jumlah2_val))
-                        except:
-                            jumlah2_text = ""
-                    else:
-                        jumlah2_text = ""
-                    pdf.cell(col_widths[3], 8, jumlah2_text, border=1, align="R")
-                    
-                    pdf.ln()
-                    
-                    if is_bold:
-                        pdf.set_font("Arial", '', 9)
-                
-                pdf.ln(5)
-                pdf.set_font("Arial", 'I', 8)
-                pdf.cell(0, 5, txt="Dicetak dari Sistem Akuntansi BUMDes", ln=True, align="C")
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                    pdf.output(tmp.name)
-                    tmp.seek(0)
-                    return tmp.read()
-
-            pdf_neraca = buat_pdf_neraca_lap(df_neraca_lap, bulan_laporan, tahun_laporan)
-            
-            st.download_button(
-                "📥 Download PDF Neraca",
-                data=pdf_neraca,
-                file_name=f"laporan_neraca_{bulan_laporan}_{tahun_laporan}.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
-        except Exception as e:
-            st.error(f"❌ Error membuat PDF: {str(e)}")
-            st.info("💡 Silakan screenshot hasil laporan di atas sebagai alternatif.")
+        st.download_button(
+            "📥 Download PDF Neraca",
+            data=prof.bungkus("pdf neraca", partial(buat_pdf_neraca_lap, df_neraca_lap, bulan_laporan, tahun_laporan)),
+            file_name=f"laporan_neraca_{bulan_laporan}_{tahun_laporan}.pdf",
+            mime="application/pdf",
+            on_click="ignore",
+            use_container_width=True
+        )
+        tombol_ekspor(df_neraca_lap, f"laporan_neraca_{bulan_laporan}_{tahun_laporan}", "neraca_lap", "Neraca")
+
+    with subtab2:
+        subtab_neraca()
     
     # ========================================
     # SUB-TAB 3: ARUS KAS (DENGAN RELOAD)
     # ========================================
-    with subtab3:
+    @st.fragment(key="arus_kas")
+    @diukur("sub-tab Arus Kas")
+    def subtab_arus_kas():
         st.markdown("### 💸 Laporan Arus Kas")
         st.markdown(f"**BUMDes - {bulan_dict[bulan_laporan]} {tahun_laporan}**")
         st.markdown("---")
         
         # ✅ TOMBOL RELOAD (SEPERTI SUB-TAB LAINNYA)
-        if st.button("🔄 Reload dari Neraca Saldo", key="reload_aruskas"):
-            st.session_state.pendapatan_loaded = False
-            st.session_state.laporan_refresh += 1
-            st.rerun()
+        st.button("🔄 Reload dari Neraca Saldo", key="reload_aruskas", on_click=muat_ulang_laporan)
         
         st.info("💡 Input manual untuk aktivitas arus kas.")
         
-        if "arus_kas_refresh" not in st.session_state:
-            st.session_state.arus_kas_refresh = 0
-        
         col1, col2, col3 = st.columns(3)
         
         with col1:
             st.write("#### Operasi:")
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("➕ Tambah", key="add_op", use_container_width=True):
-                    st.session_state.arus_kas_operasi = pd.concat([st.session_state.arus_kas_operasi, pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])], ignore_index=True)
-                    st.session_state.arus_kas_refresh += 1
-                    st.rerun()
-            with col_btn2:
-                if st.button("🗑️ Hapus Kosong", key="del_op_empty", use_container_width=True):
-                    st.session_state.arus_kas_operasi = st.session_state.arus_kas_operasi[
-                        st.session_state.arus_kas_operasi["Aktivitas"].astype(str).str.strip() != ""
-                    ].reset_index(drop=True)
-                    if len(st.session_state.arus_kas_operasi) == 0:
-                        st.session_state.arus_kas_operasi = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-                    st.session_state.arus_kas_refresh += 1
-                    st.rerun()
-            
-            new_arus_operasi = create_aggrid(st.session_state.arus_kas_operasi, f"op_{st.session_state.arus_kas_refresh}", height=200)
-            if not new_arus_operasi.equals(st.session_state.arus_kas_operasi):
-                st.session_state.arus_kas_operasi = new_arus_operasi.copy()
+            edit_tabel("arus_kas_operasi", "op", height=200, unit="arus_kas")
             
-            # Hapus Tertentu Operasi
-            df_op_terisi = st.session_state.arus_kas_operasi[
-                st.session_state.arus_kas_operasi["Aktivitas"].astype(str).str.strip() != ""
-            ]
-            if len(df_op_terisi) > 0:
-                with st.expander("🗑️ Hapus Item Tertentu", expanded=False):
-                    rows_del = []
-                    for idx in df_op_terisi.index:
-                        row = df_op_terisi.loc[idx]
-                        if st.checkbox(f"{row['Aktivitas']}: {format_rupiah(row['Jumlah (Rp)'])}", key=f"chk_op_{idx}_{st.session_state.arus_kas_refresh}"):
-                            rows_del.append(idx)
-                    if rows_del and st.button(f"🗑️ Hapus {len(rows_del)} Item", key="del_op"):
-                        st.session_state.arus_kas_operasi = st.session_state.arus_kas_operasi.drop(rows_del).reset_index(drop=True)
-                        if len(st.session_state.arus_kas_operasi) == 0:
-                            st.session_state.arus_kas_operasi = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-                        st.session_state.arus_kas_refresh += 1
-                        st.rerun()
+            kontrol_baris("arus_kas_operasi", "Aktivitas", "arus_kas_operasi", "arus_kas")
 
         with col2:
             st.write("#### Investasi:")
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("➕ Tambah", key="add_inv", use_container_width=True):
-                    st.session_state.arus_kas_investasi = pd.concat([st.session_state.arus_kas_investasi, pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])], ignore_index=True)
-                    st.session_state.arus_kas_refresh += 1
-                    st.rerun()
-            with col_btn2:
-                if st.button("🗑️ Hapus Kosong", key="del_inv_empty", use_container_width=True):
-                    st.session_state.arus_kas_investasi = st.session_state.arus_kas_investasi[
-                        st.session_state.arus_kas_investasi["Aktivitas"].astype(str).str.strip() != ""
-                    ].reset_index(drop=True)
-                    if len(st.session_state.arus_kas_investasi) == 0:
-                        st.session_state.arus_kas_investasi = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-                    st.session_state.arus_kas_refresh += 1
-                    st.rerun()
+            edit_tabel("arus_kas_investasi", "inv", height=200, unit="arus_kas")
             
-            new_arus_investasi = create_aggrid(st.session_state.arus_kas_investasi, f"inv_{st.session_state.arus_kas_refresh}", height=200)
-            if not new_arus_investasi.equals(st.session_state.arus_kas_investasi):
-                st.session_state.arus_kas_investasi = new_arus_investasi.copy()
-            
-            # Hapus Tertentu Investasi
-            df_inv_terisi = st.session_state.arus_kas_investasi[
-                st.session_state.arus_kas_investasi["Aktivitas"].astype(str).str.strip() != ""
-            ]
-            if len(df_inv_terisi) > 0:
-                with st.expander("🗑️ Hapus Item Tertentu", expanded=False):
-                    rows_del = []
-                    for idx in df_inv_terisi.index:
-                        row = df_inv_terisi.loc[idx]
-                        if st.checkbox(f"{row['Aktivitas']}: {format_rupiah(row['Jumlah (Rp)'])}", key=f"chk_inv_{idx}_{st.session_state.arus_kas_refresh}"):
-                            rows_del.append(idx)
-                    if rows_del and st.button(f"🗑️ Hapus {len(rows_del)} Item", key="del_inv"):
-                        st.session_state.arus_kas_investasi = st.session_state.arus_kas_investasi.drop(rows_del).reset_index(drop=True)
-                        if len(st.session_state.arus_kas_investasi) == 0:
-                            st.session_state.arus_kas_investasi = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-                        st.session_state.arus_kas_refresh += 1
-                        st.rerun()
+            kontrol_baris("arus_kas_investasi", "Aktivitas", "arus_kas_investasi", "arus_kas")
 
         with col3:
             st.write("#### Pendanaan:")
-            col_btn1, col_btn2 = st.columns(2)
-            with col_btn1:
-                if st.button("➕ Tambah", key="add_pend", use_container_width=True):
-                    st.session_state.arus_kas_pendanaan = pd.concat([st.session_state.arus_kas_pendanaan, pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])], ignore_index=True)
-                    st.session_state.arus_kas_refresh += 1
-                    st.rerun()
-            with col_btn2:
-                if st.button("🗑️ Hapus Kosong", key="del_pend_empty", use_container_width=True):
-                    st.session_state.arus_kas_pendanaan = st.session_state.arus_kas_pendanaan[
-                        st.session_state.arus_kas_pendanaan["Aktivitas"].astype(str).str.strip() != ""
-                    ].reset_index(drop=True)
-                    if len(st.session_state.arus_kas_pendanaan) == 0:
-                        st.session_state.arus_kas_pendanaan = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-                    st.session_state.arus_kas_refresh += 1
-                    st.rerun()
-            
-            new_arus_pendanaan = create_aggrid(st.session_state.arus_kas_pendanaan, f"pend_{st.session_state.arus_kas_refresh}", height=200)
-            if not new_arus_pendanaan.equals(st.session_state.arus_kas_pendanaan):
-                st.session_state.arus_kas_pendanaan = new_arus_pendanaan.copy()
+            edit_tabel("arus_kas_pendanaan", "pend", height=200, unit="arus_kas")
             
-            # Hapus Tertentu Pendanaan
-            df_pend_terisi = st.session_state.arus_kas_pendanaan[
-                st.session_state.arus_kas_pendanaan["Aktivitas"].astype(str).str.strip() != ""
-            ]
-            if len(df_pend_terisi) > 0:
-                with st.expander("🗑️ Hapus Item Tertentu", expanded=False):
-                    rows_del = []
-                    for idx in df_pend_terisi.index:
-                        row = df_pend_terisi.loc[idx]
-                        if st.checkbox(f"{row['Aktivitas']}: {format_rupiah(row['Jumlah (Rp)'])}", key=f"chk_pend_{idx}_{st.session_state.arus_kas_refresh}"):
-                            rows_del.append(idx)
-                    if rows_del and st.button(f"🗑️ Hapus {len(rows_del)} Item", key="del_pend"):
-                        st.session_state.arus_kas_pendanaan = st.session_state.arus_kas_pendanaan.drop(rows_del).reset_index(drop=True)
-                        if len(st.session_state.arus_kas_pendanaan) == 0:
-                            st.session_state.arus_kas_pendanaan = pd.DataFrame([{"Aktivitas": "", "Jumlah (Rp)": 0}])
-                        st.session_state.arus_kas_refresh += 1
-                        st.rerun()
+            kontrol_baris("arus_kas_pendanaan", "Aktivitas", "arus_kas_pendanaan", "arus_kas")
 
         st.markdown("---")
 
         # Hasil Arus Kas
-        df_op = new_arus_operasi[new_arus_operasi["Aktivitas"].astype(str).str.strip() != ""]
-        df_inv = new_arus_investasi[new_arus_investasi["Aktivitas"].astype(str).str.strip() != ""]
-        df_pend = new_arus_pendanaan[new_arus_pendanaan["Aktivitas"].astype(str).str.strip() != ""]
+        df_ak = pipeline().ambil("arus_kas")
 
-        if not df_op.empty or not df_inv.empty or not df_pend.empty:
+        if df_ak is not None:
             st.write("### 📊 Hasil Arus Kas")
-            arus_data = []
-            arus_data.append({"Aktivitas": "Arus Kas Operasi:", "Jumlah": ""})
-            for _, r in df_op.iterrows():
-                arus_data.append({"Aktivitas": f"  {r['Aktivitas']}", "Jumlah": r["Jumlah (Rp)"]})
-            arus_data.append({"Aktivitas": "", "Jumlah": ""})
-            arus_data.append({"Aktivitas": "Arus Kas Investasi:", "Jumlah": ""})
-            for _, r in df_inv.iterrows():
-                arus_data.append({"Aktivitas": f"  {r['Aktivitas']}", "Jumlah": r["Jumlah (Rp)"]})
-            arus_data.append({"Aktivitas": "", "Jumlah": ""})
-            arus_data.append({"Aktivitas": "Arus Kas Pendanaan:", "Jumlah": ""})
-            for _, r in df_pend.iterrows():
-                arus_data.append({"Aktivitas": f"  {r['Aktivitas']}", "Jumlah": r["Jumlah (Rp)"]})
-            
-            df_ak = pd.DataFrame(arus_data)
-            st.dataframe(
-                df_ak.style.format({"Jumlah": lambda x: format_rupiah(x) if isinstance(x, (int, float)) else x})
-                .apply(lambda x: ['font-weight: bold' if i < len(df_ak) and 'Arus Kas' in str(df_ak.iloc[i]['Aktivitas']) else '' for i in range(len(x))], axis=0)
-                .set_properties(**{'text-align': 'left'}, subset=['Aktivitas'])
-                .set_properties(**{'text-align': 'right'}, subset=['Jumlah']),
-                use_container_width=True,
-                hide_index=True
-            )
+            tampilkan_laporan(df_ak, ["Jumlah"], kolom_kiri=["Aktivitas"])
             
             # PDF
-            def buat_pdf_ak(df, b, t):
-                pdf = FPDF()
-                pdf.add_page()
-                pdf.set_font("Arial", 'B', 14)
-                pdf.cell(0, 10, "Laporan Arus Kas", ln=True, align="C")
-                pdf.set_font("Arial", '', 12)
-                pdf.cell(0, 8, "BUMDes", ln=True, align="C")
-                pdf.cell(0, 8, f"Periode: {bulan_dict[b]} {t}", ln=True, align="C")
-                pdf.ln(5)
-                pdf.set_font("Arial", 'B', 10)
-                pdf.cell(120, 10, "Aktivitas", border=1, align="C")
-                pdf.cell(60, 10, "Jumlah (Rp)", border=1, align="C")
-                pdf.ln()
-                pdf.set_font("Arial", '', 9)
-                for i in range(len(df)):
-                    r = df.iloc[i]
-                    is_bold = 'Arus Kas' in str(r['Aktivitas'])
-                    if is_bold:
-                        pdf.set_font("Arial", 'B', 9)
-                    pdf.cell(120, 8, str(r["Aktivitas"])[:47], border=1, align="L")
-                    pdf.cell(60, 8, format_rupiah(r["Jumlah"]) if isinstance(r["Jumlah"], (int, float)) else "", border=1, align="R")
-                    pdf.ln()
-                    if is_bold:
-                        pdf.set_font("Arial", '', 9)
-                pdf.ln(5)
-                pdf.set_font("Arial", 'I', 8)
-                pdf.cell(0, 5, "Dicetak dari Sistem Akuntansi BUMDes", ln=True, align="C")
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                    pdf.output(tmp.name)
-                    tmp.seek(0)
-                    return tmp.read()
-            
-            st.download_button("📥 Download PDF Arus Kas", buat_pdf_ak(df_ak, bulan_laporan, tahun_laporan), f"arus_kas_{bulan_laporan}_{tahun_laporan}.pdf", "application/pdf", use_container_width=True)
+            st.download_button("📥 Download PDF Arus Kas", prof.bungkus("pdf arus kas", partial(buat_pdf_ak, df_ak, bulan_laporan, tahun_laporan)), f"arus_kas_{bulan_laporan}_{tahun_laporan}.pdf", "application/pdf", on_click="ignore", use_container_width=True)
+            tombol_ekspor(df_ak, f"arus_kas_{bulan_laporan}_{tahun_laporan}", "arus_kas", "Arus Kas")
+
+    with subtab3:
+        subtab_arus_kas()
+
+with tab4:
+    tab_laporan()
+
+# === Riwayat edit sel (semua tabel) ===
+@st.fragment(key="riwayat")
+@diukur("riwayat edit")
+def riwayat_edit():
+    if len(st.session_state.log_edit):
+        with st.expander(f"📝 Riwayat Perubahan ({len(st.session_state.log_edit)} edit terakhir)"):
+            st.dataframe(st.session_state.log_edit.ke_dataframe(), hide_index=True, use_container_width=True)
+
+riwayat_edit()
+
+# === Panel profiling (sidebar) ===
+@st.fragment(key="profil")
+def panel_profil():
+    if not prof.aktif:
+        return
+    # Memori DataFrame di session_state sesi ini (Buku Besar & bagan akun ada di workspace bersama)
+    memori = memori_frame(st.session_state)
+    prof.selesai_rerun(memori)
+    baru = prof.sejak(st.session_state.get("profil_dilihat", 0))
+    if baru:
+        st.session_state.profil_dilihat = baru[-1]["nomor"]
+        st.session_state.profil_terakhir = baru
+    terakhir = st.session_state.get("profil_terakhir", [])
+    st.subheader("⏱️ Profiling")
+    if terakhir:
+        st.caption(f"Rerun terakhir: {', '.join(r['jenis'] for r in terakhir)} — {sum(r['total'] for r in terakhir) * 1000:,.0f} ms")
+        st.dataframe(prof.ringkasan(terakhir), hide_index=True, use_container_width=True)
+    st.caption(f"Memori frame sesi: {sum(memori.values()) / 1024 ** 2:,.1f} MB")
+    df_memori = pd.DataFrame({"Frame": list(memori), "KB": [round(b / 1024) for b in memori.values()]})
+    st.dataframe(df_memori.sort_values("KB", ascending=False), hide_index=True, use_container_width=True)
+    with st.expander("Riwayat rerun"):
+        st.dataframe(pd.DataFrame([
+            {"Waktu": r["waktu"], "Jenis": r["jenis"], "ms": round(r["total"] * 1000, 1)} for r in reversed(prof.riwayat)
+        ]), hide_index=True, use_container_width=True)
+
+with st.sidebar:
+    panel_profil()
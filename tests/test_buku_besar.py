@@ -0,0 +1,68 @@
+import pandas as pd
+
+from bumdes.buku_besar import BukuBesar
+from bumdes.store import JurnalStore
+
+ANGKA = ["debit", "kredit", "jumlah"]
+
+
+def _store(tmp_path):
+    store = JurnalStore(str(tmp_path / "bumdes.db"))
+    store.tambah(pd.DataFrame({
+        "Tanggal": ["2025-01-02", "2025-01-03", "2025-01-04", "2025-01-05"],
+        "Keterangan": ["Kas", "Modal", "Kas", "Beban"],
+        "Ref": ["101", "301", "101", "501"],
+        "Debit (Rp)": [1000, 0, 250, 400],
+        "Kredit (Rp)": [0, 1000, 0, 0],
+    }))
+    return store
+
+
+def _ubah(store, bb, id_baris, kolom):
+    versi = int(store.muat().set_index("id").at[id_baris, "versi"])
+    baris, konflik = store.ubah_sel({id_baris: (versi, kolom)})
+    assert not konflik
+    bb.perbarui(baris)
+
+
+def _cocok(store, bb):
+    # Hasil inkremental harus sama dengan posting ulang dari seluruh jurnal
+    penuh = BukuBesar.dari_jurnal(store.muat())
+    pd.testing.assert_frame_equal(bb.saldo[ANGKA], penuh.saldo[ANGKA], check_dtype=False)
+    assert sorted(bb._baris.index) == sorted(penuh._baris.index)
+
+
+def test_perbarui_ref_dikosongkan(tmp_path):
+    store = _store(tmp_path)
+    bb = BukuBesar.dari_jurnal(store.muat())
+    _ubah(store, bb, 4, {"Ref": ("501", "")})
+    _cocok(store, bb)
+    assert "501" not in bb.saldo.index
+
+
+def test_perbarui_ref_diganti(tmp_path):
+    store = _store(tmp_path)
+    bb = BukuBesar.dari_jurnal(store.muat())
+    _ubah(store, bb, 3, {"Ref": ("101", "102")})
+    _cocok(store, bb)
+    assert bb.saldo.at["101", "debit"] == 1000
+    assert bb.saldo.at["102", "debit"] == 250
+
+
+def test_perbarui_baris_dihapus(tmp_path):
+    store = _store(tmp_path)
+    bb = BukuBesar.dari_jurnal(store.muat())
+    with store._conn:
+        store._conn.execute("DELETE FROM jurnal WHERE id IN (1, 3)")
+    bb.perbarui(dihapus=[1, 3])
+    _cocok(store, bb)
+    assert "101" not in bb.saldo.index
+
+
+def test_ringkasan_nama_dari_bagan_akun(tmp_path):
+    bb = BukuBesar.dari_jurnal(_store(tmp_path).muat())
+    akun = bb.ringkasan({"101": "Kas Tunai", "301": ""}).set_index("Ref")["Akun"]
+    assert akun["101"] == "Kas Tunai"
+    # Ref tanpa nama di bagan akun memakai Keterangan jurnal
+    assert akun["301"] == "Modal"
+    assert akun["501"] == "Beban"